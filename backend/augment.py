@@ -0,0 +1,164 @@
+import numpy as np
+
+# Batched landmark augmentation and near-duplicate removal. Every variant of a sample is
+# generated in one set of array operations instead of one rotation matrix per Python loop
+# iteration, so thousands of variants take milliseconds.
+
+# MediaPipe hand topology: each finger's base joint (MCP, CMC for the thumb) and the three
+# joints that move with it.
+FINGER_BASES = np.array([1, 5, 9, 13, 17])
+FINGER_JOINTS = np.array([[2, 3, 4], [6, 7, 8], [10, 11, 12], [14, 15, 16], [18, 19, 20]])
+
+DEDUPE_BLOCK = 1024
+
+
+def _rotation_z(angles):
+    cos, sin = np.cos(angles), np.sin(angles)
+    rot = np.zeros(angles.shape + (3, 3), dtype=np.float32)
+    rot[..., 0, 0] = cos
+    rot[..., 0, 1] = -sin
+    rot[..., 1, 0] = sin
+    rot[..., 1, 1] = cos
+    rot[..., 2, 2] = 1.0
+    return rot
+
+
+def _rotation_xy(tilt_x, tilt_y):
+    cx, sx = np.cos(tilt_x), np.sin(tilt_x)
+    cy, sy = np.cos(tilt_y), np.sin(tilt_y)
+    rx = np.zeros(tilt_x.shape + (3, 3), dtype=np.float32)
+    rx[..., 0, 0] = 1.0
+    rx[..., 1, 1] = cx
+    rx[..., 1, 2] = -sx
+    rx[..., 2, 1] = sx
+    rx[..., 2, 2] = cx
+    ry = np.zeros(tilt_y.shape + (3, 3), dtype=np.float32)
+    ry[..., 0, 0] = cy
+    ry[..., 0, 2] = sy
+    ry[..., 1, 1] = 1.0
+    ry[..., 2, 0] = -sy
+    ry[..., 2, 2] = cy
+    return ry @ rx
+
+
+def augment_landmarks(
+    landmarks,
+    count,
+    seed=None,
+    max_rotation=0.20,
+    scale_range=(0.90, 1.12),
+    noise=0.014,
+    max_tilt=0.0,
+    finger_jitter=0.0,
+):
+    # Returns a (count, 63) float32 array: the original sample first, then count - 1 variants.
+    # A count below 1 is treated as 1, the original alone.
+    #   max_rotation   in-plane rotation range (radians, +/-)
+    #   max_tilt       out-of-plane rotation about x and y (radians, +/-); 0 keeps it 2D
+    #   finger_jitter  per-finger rotation about its base joint (radians, +/-); 0 disables
+    rng = np.random.default_rng(seed)
+    base = np.asarray(landmarks, dtype=np.float32).reshape(21, 3)
+    n = max(1, int(count)) - 1
+
+    points = np.broadcast_to(base, (n, 21, 3)).copy()
+
+    if finger_jitter > 0:
+        angles = rng.uniform(-finger_jitter, finger_jitter, (n, len(FINGER_BASES))).astype(np.float32)
+        origin = points[:, FINGER_BASES][:, :, None, :]
+        relative = points[:, FINGER_JOINTS] - origin
+        moved = np.einsum("nfij,nfkj->nfki", _rotation_z(angles), relative)
+        points[:, FINGER_JOINTS] = moved + origin
+
+    rot = _rotation_z(rng.uniform(-max_rotation, max_rotation, n).astype(np.float32))
+    if max_tilt > 0:
+        tilt = rng.uniform(-max_tilt, max_tilt, (2, n)).astype(np.float32)
+        rot = rot @ _rotation_xy(tilt[0], tilt[1])
+    scale = rng.uniform(scale_range[0], scale_range[1], (n, 1, 1)).astype(np.float32)
+
+    points = np.matmul(points, np.swapaxes(rot, 1, 2)) * scale
+    points += rng.normal(0.0, noise, points.shape).astype(np.float32)
+
+    out = np.empty((n + 1, 63), dtype=np.float32)
+    out[0] = base.reshape(-1)
+    out[1:] = points.reshape(n, 63)
+    return out
+
+
+def pairwise_sq_distances(a, b):
+    # Squared Euclidean distances via |a|^2 + |b|^2 - 2ab, one matrix product per call.
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    d = np.einsum("ij,ij->i", a, a)[:, None] + np.einsum("ij,ij->i", b, b)[None, :] - 2.0 * (a @ b.T)
+    np.maximum(d, 0.0, out=d)
+    return d
+
+
+def dedupe_mask(samples, min_distance, reference=None, block=DEDUPE_BLOCK):
+    # Greedy novelty filter: sample i is kept if it is at least `min_distance` away from every
+    # reference sample and every earlier kept sample. Same result as checking one sample at a
+    # time, but distances are computed block by block with matrix products, and the
+    # sequential pass only visits samples that actually have a close neighbour.
+    samples = np.asarray(samples, dtype=np.float32)
+    keep = np.ones(len(samples), dtype=bool)
+    if len(samples) == 0:
+        return keep
+    threshold = float(min_distance) ** 2
+    kept = np.empty((0, samples.shape[1]), dtype=np.float32)
+    if reference is not None and len(reference):
+        kept = np.asarray(reference, dtype=np.float32).reshape(-1, samples.shape[1])
+
+    for start in range(0, len(samples), block):
+        chunk = samples[start : start + block]
+        chunk_keep = np.ones(len(chunk), dtype=bool)
+        for kstart in range(0, len(kept), block):
+            near = pairwise_sq_distances(chunk, kept[kstart : kstart + block]) < threshold
+            chunk_keep &= ~near.any(axis=1)
+
+        close = np.triu(pairwise_sq_distances(chunk, chunk) < threshold, k=1)
+        for idx in np.flatnonzero(close.any(axis=1)):
+            if chunk_keep[idx]:
+                chunk_keep[close[idx]] = False
+
+        keep[start : start + len(chunk)] = chunk_keep
+        kept = np.concatenate([kept, chunk[chunk_keep]])
+    return keep
+
+
+def dedupe(samples, min_distance, reference=None):
+    samples = np.asarray(samples, dtype=np.float32)
+    return samples[dedupe_mask(samples, min_distance, reference)]
+
+
+class NoveltyBuffer:
+    # The same novelty rule for live recording, one sample at a time. Kept samples are rows of
+    # a preallocated (capacity, dim) matrix with their squared norms alongside, and distances
+    # are |a|^2 + |b|^2 - 2ab written into a preallocated vector, so checking a frame does not
+    # allocate anything that grows with the session.
+    def __init__(self, capacity, dim, min_distance):
+        capacity = max(1, int(capacity))
+        self.samples = np.empty((capacity, int(dim)), dtype=np.float32)
+        self.count = 0
+        self.threshold = float(min_distance) ** 2
+        self._norms = np.empty(capacity, dtype=np.float32)
+        self._dist = np.empty(capacity, dtype=np.float32)
+
+    def add(self, sample):
+        # Returns the stored row (a view into `samples`), or None if the sample was too close
+        # to one already kept or the buffer is full.
+        count = self.count
+        if count >= len(self.samples):
+            return None
+        sample = np.asarray(sample, dtype=np.float32)
+        norm = float(sample @ sample)
+        if count:
+            dist = self._dist[:count]
+            np.dot(self.samples[:count], sample, out=dist)
+            dist *= -2.0
+            dist += self._norms[:count]
+            dist += norm
+            if dist.min() < self.threshold:
+                return None
+        self.samples[count] = sample
+        self._norms[count] = norm
+        self.count = count + 1
+        return self.samples[count]
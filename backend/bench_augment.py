@@ -0,0 +1,72 @@
+import time
+
+import numpy as np
+
+from augment import augment_landmarks, dedupe_mask
+
+
+def _loop_augment(landmarks, count):
+    # The previous per-sample implementation, kept here as the baseline.
+    base = np.array(landmarks, dtype=np.float32).reshape(-1, 3)
+    augmented = [base.flatten().tolist()]
+    for _ in range(max(1, count - 1)):
+        angle = np.random.uniform(-0.20, 0.20)
+        scale = np.random.uniform(0.90, 1.12)
+        noise = np.random.normal(0.0, 0.014, base.shape)
+        rot = np.array(
+            [[np.cos(angle), -np.sin(angle), 0.0], [np.sin(angle), np.cos(angle), 0.0], [0.0, 0.0, 1.0]],
+            dtype=np.float32,
+        )
+        augmented.append(((base @ rot.T) * scale + noise).flatten().tolist())
+    return augmented
+
+
+def _loop_dedupe(samples, min_distance):
+    kept = []
+    for sample in samples:
+        if any(np.linalg.norm(np.asarray(existing) - np.asarray(sample)) < min_distance for existing in kept):
+            continue
+        kept.append(sample)
+    return kept
+
+
+def check_counts(base):
+    # The original comes first and is followed by exactly count - 1 variants.
+    for count in (1, 2, 5):
+        for options in ({}, {"max_tilt": 0.25, "finger_jitter": 0.15}):
+            variants = augment_landmarks(base, count, seed=1, **options)
+            assert variants.shape == (count, 63), (count, options, variants.shape)
+            assert np.array_equal(variants[0], base.astype(np.float32)), (count, options)
+    print("augment_landmarks returns count rows for count = 1, 2, 5")
+
+
+def _ms(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000.0, result
+
+
+def main():
+    base = np.random.default_rng(0).normal(0.0, 0.3, 63)
+    check_counts(base)
+    for count in (100, 1000, 5000):
+        loop_ms, variants = _ms(lambda: _loop_augment(base, count))
+        batch_ms, _ = _ms(lambda: augment_landmarks(base, count, seed=1))
+        full_ms, batch = _ms(lambda: augment_landmarks(base, count, seed=1, max_tilt=0.25, finger_jitter=0.15))
+        print(
+            f"augment n={count:5d}: loop {loop_ms:8.1f} ms  batched {batch_ms:6.1f} ms  "
+            f"batched+3d+fingers {full_ms:6.1f} ms"
+        )
+
+        # The quadratic loop baseline is only run where it finishes in reasonable time.
+        if count <= 1000:
+            loop_ms, kept = _ms(lambda: _loop_dedupe(variants, 0.015))
+            loop_text = f"loop {loop_ms:8.1f} ms ({len(kept)} kept)"
+        else:
+            loop_text = "loop skipped"
+        batch_ms, mask = _ms(lambda: dedupe_mask(batch, 0.015))
+        print(f"dedupe  n={count:5d}: {loop_text}  batched {batch_ms:6.1f} ms ({int(mask.sum())} kept)")
+
+
+if __name__ == "__main__":
+    main()
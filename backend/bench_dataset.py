@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from dataset import TrainingDataset
+
+# Times what a registry save does to the training dataset (dataset.py), against the per-sample
+# Python lists it replaces: renaming a gesture, removing one, writing the dataset to disk and
+# hashing it for the model's dataset signature.
+# The dataset's rename includes its save, which only rewrites the label table.
+
+CLASSES = 8
+
+
+def _labels(samples):
+    return [f"gesture_{idx % CLASSES}" for idx in range(samples)]
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000.0
+
+
+def _lists(X, labels, tmp):
+    data = X.tolist()
+    state = {"labels": list(labels)}
+
+    def rename():
+        state["labels"] = ["renamed" if str(label).strip().lower() == "gesture_0" else label for label in state["labels"]]
+
+    def remove():
+        kept = [(s, label) for s, label in zip(data, state["labels"]) if str(label).strip().lower() != "gesture_1"]
+        state["samples"] = [s for s, _ in kept]
+        state["labels"] = [label for _, label in kept]
+
+    def save():
+        with open(os.path.join(tmp, "training_dataset.json"), "w", encoding="utf-8") as f:
+            json.dump({"samples": state["samples"], "labels": state["labels"]}, f, indent=2)
+
+    def signature():
+        payload = {"samples": state["samples"], "labels": [str(label).strip().lower() for label in state["labels"]]}
+        hashlib.sha256(json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")).hexdigest()
+
+    return [_timed(rename), _timed(remove), _timed(save), _timed(signature)]
+
+
+def _dataset(X, labels, tmp):
+    dataset = TrainingDataset(X.shape[1])
+    for label in sorted(set(labels)):
+        dataset.append(X[[idx for idx, other in enumerate(labels) if other == label]], label)
+    path = os.path.join(tmp, "training_dataset")
+    dataset.save(path)
+
+    def rename_and_save():
+        dataset.relabel(lambda label: "renamed" if label == "gesture_0" else label)
+        dataset.save(path)
+
+    return [
+        _timed(rename_and_save),
+        _timed(lambda: dataset.remove(lambda label: label == "gesture_1")),
+        _timed(lambda: dataset.save(path)),
+        _timed(dataset.signature),
+    ]
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print("times in ms:         rename    remove      save  signature")
+    for samples in (10_000, 100_000):
+        X = rng.normal(0.0, 0.3, (samples, 63)).astype(np.float32)
+        labels = _labels(samples)
+        with tempfile.TemporaryDirectory() as tmp:
+            old = _lists(X, labels, tmp)
+            new = _dataset(X, labels, tmp)
+        for name, times in (("lists", old), ("dataset", new)):
+            print(f"{samples:7d} {name:8s}  " + "".join(f"{ms:10.1f}" for ms in times))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import itertools
+import time
+
+import numpy as np
+
+from augment import augment_landmarks
+from engine import GestureModel, HandTracker
+from features import FEATURE_SETS, extract_features
+
+# Compares the classifier feature sets (features.py) on synthetic hands. Every gesture is
+# recorded a few times with the right hand held upright, then used as recorded and augmented
+# the way uploads are; the test hands are rolled, tilted and half of them are left hands.
+# Reports the fitted sample count, accuracy and time per one-hand query for each combination,
+# and how much of that query is spent converting the hand to the feature set.
+
+GESTURES = {
+    # Flexion per finger (thumb, index, middle, ring, pinky), 0 = straight, 1 = fully bent.
+    "open": (0.0, 0.0, 0.0, 0.0, 0.0),
+    "fist": (0.8, 1.0, 1.0, 1.0, 1.0),
+    "point": (0.8, 0.0, 1.0, 1.0, 1.0),
+    "peace": (0.8, 0.0, 0.0, 1.0, 1.0),
+    "thumb": (0.0, 1.0, 1.0, 1.0, 1.0),
+    "three": (0.8, 0.0, 0.0, 0.0, 1.0),
+}
+RECORDED = 5
+AUGMENTED = 40
+TEST_PER_GESTURE = 200
+
+# Right hand, palm facing +z: base joints and segment lengths of each finger.
+_BASES = np.array([[0.15, 0.25, 0.0], [0.45, 0.2, 0.0], [0.48, 0.0, 0.0], [0.45, -0.18, 0.0], [0.4, -0.33, 0.0]])
+_DIRECTIONS = np.array([[0.6, 0.8, 0.0], [1.0, 0.05, 0.0], [1.0, 0.0, 0.0], [1.0, -0.05, 0.0], [1.0, -0.12, 0.0]])
+_LENGTHS = np.array([[0.18, 0.15, 0.12], [0.25, 0.15, 0.12], [0.28, 0.17, 0.13], [0.26, 0.16, 0.12], [0.2, 0.12, 0.1]])
+
+
+def _hand(flexion, rng):
+    points = np.zeros((21, 3))
+    for finger in range(5):
+        direction = _DIRECTIONS[finger] / np.linalg.norm(_DIRECTIONS[finger])
+        joint = _BASES[finger].copy()
+        points[1 + 4 * finger] = joint
+        bend = 0.0
+        for segment in range(3):
+            bend += (flexion[finger] + rng.normal(0.0, 0.05)) * np.pi / 3.0
+            step = direction * np.cos(bend) + np.array([0.0, 0.0, 1.0]) * np.sin(bend)
+            joint = joint + _LENGTHS[finger, segment] * step
+            points[2 + 4 * finger + segment] = joint
+    return points + rng.normal(0.0, 0.005, points.shape)
+
+
+def _rotation(roll, tilt_x, tilt_y):
+    cz, sz = np.cos(roll), np.sin(roll)
+    cx, sx = np.cos(tilt_x), np.sin(tilt_x)
+    cy, sy = np.cos(tilt_y), np.sin(tilt_y)
+    rz = np.array([[cz, -sz, 0.0], [sz, cz, 0.0], [0.0, 0.0, 1.0]])
+    rx = np.array([[1.0, 0.0, 0.0], [0.0, cx, -sx], [0.0, sx, cx]])
+    ry = np.array([[cy, 0.0, sy], [0.0, 1.0, 0.0], [-sy, 0.0, cy]])
+    return rz @ rx @ ry
+
+
+def _dataset(rng, augmented):
+    X, y = [], []
+    for label, flexion in GESTURES.items():
+        for _ in range(RECORDED):
+            landmarks = HandTracker.normalize_landmarks(_hand(flexion, rng))
+            if augmented:
+                X.extend(augment_landmarks(landmarks, AUGMENTED, seed=int(rng.integers(1 << 31))))
+                y.extend([label] * AUGMENTED)
+            else:
+                X.append(landmarks)
+                y.append(label)
+    return np.asarray(X, dtype=np.float32), y
+
+
+def _test_set(rng):
+    X, y = [], []
+    for label, flexion in GESTURES.items():
+        for _ in range(TEST_PER_GESTURE):
+            points = _hand(flexion, rng) @ _rotation(rng.uniform(-1.0, 1.0), rng.uniform(-0.5, 0.5), rng.uniform(-0.5, 0.5)).T
+            if rng.random() < 0.5:
+                # Left hand: the mirror image of a right one.
+                points[:, 0] *= -1.0
+            X.append(HandTracker.normalize_landmarks(points))
+            y.append(label)
+    return np.asarray(X, dtype=np.float32), y
+
+
+def main():
+    rng = np.random.default_rng(0)
+    datasets = {"augmented": _dataset(rng, True), "recorded": _dataset(rng, False)}
+    X_test, y_test = _test_set(rng)
+    print(f"{RECORDED} recordings per gesture, {len(X_test)} rolled, tilted or mirrored test hands")
+    for (data_name, (X, y)), feature_set in itertools.product(datasets.items(), FEATURE_SETS):
+        model = GestureModel()
+        model.train(X, y, feature_set=feature_set)
+        codes, _, _ = model.predict_codes(X_test)
+        accuracy = np.mean([model.classes[int(code)] == label for code, label in zip(codes, y_test)])
+
+        queries = 1000
+        start = time.perf_counter()
+        for idx in range(queries):
+            model.predict_codes(X_test[idx % len(X_test) : idx % len(X_test) + 1])
+        query_us = (time.perf_counter() - start) / queries * 1e6
+        start = time.perf_counter()
+        for idx in range(queries):
+            extract_features(X_test[idx % len(X_test) : idx % len(X_test) + 1], feature_set)
+        features_us = (time.perf_counter() - start) / queries * 1e6
+        print(
+            f"{feature_set:10s} {data_name:9s}: fitted {len(model.fit_samples):5d} samples   "
+            f"accuracy {accuracy:6.1%}   {query_us:7.1f} us/query ({features_us:5.1f} us features)"
+        )
+
+
+if __name__ == "__main__":
+    main()
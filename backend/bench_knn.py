@@ -0,0 +1,107 @@
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.neighbors import KNeighborsClassifier
+
+from dataset import TrainingDataset
+from engine import GestureModel
+
+# Checks the int8 nearest-neighbour index (knn_index.py) against sklearn's exact search:
+#   - on the recorded dataset (data/training_dataset, the old data/training_dataset.json, or a
+#     path given as the first argument): held-out accuracy of both and how often they predict the same class,
+#   - on synthetic data up to 200k samples: memory, time per single-hand query and recall of
+#     the exact 5 nearest neighbours.
+
+DATASET_PATH = "data/training_dataset"
+LEGACY_DATASET_PATH = "data/training_dataset.json"
+
+
+def _exact(X, codes):
+    return KNeighborsClassifier(n_neighbors=min(5, len(X)), weights="distance", algorithm="brute").fit(X, codes)
+
+
+def _parity(X, labels, rng):
+    order = rng.permutation(len(X))
+    split = max(1, len(X) // 5)
+    test, train = order[:split], order[split:]
+    classes = sorted(set(labels))
+    label_codes = np.array([classes.index(label) for label in labels])
+    model = GestureModel()
+    model.classes = classes
+    model._fit(X[train], label_codes[train])
+    exact = _exact(X[train], label_codes[train])
+
+    # Held-out samples, plus noisy copies of them so the search is not just exact matches.
+    queries = np.concatenate([X[test], X[test] + rng.normal(0.0, 0.02, X[test].shape).astype(np.float32)])
+    truth = np.concatenate([label_codes[test], label_codes[test]])
+    ours, _, _ = model._predict_features(queries)
+    theirs = exact.predict(queries)
+    print(
+        f"dataset: {len(X)} samples, {len(classes)} classes, {len(queries)} queries   "
+        f"accuracy int8 {np.mean(ours == truth):6.1%}  exact {np.mean(theirs == truth):6.1%}   "
+        f"same prediction {np.mean(ours == theirs):6.1%}"
+    )
+
+
+def _scale(samples, rng, queries=200):
+    X = rng.normal(0.0, 0.3, (samples, 63)).astype(np.float32)
+    label_codes = rng.integers(0, 8, samples)
+    model = GestureModel()
+    model._fit(X, label_codes)
+    exact = _exact(X, label_codes)
+
+    Q = X[rng.choice(samples, queries)] + rng.normal(0.0, 0.05, (queries, 63)).astype(np.float32)
+    _, ours = model.index.search(Q, 5)
+    _, theirs = exact.kneighbors(Q)
+    recall = np.mean([len(set(a) & set(b)) / 5.0 for a, b in zip(ours, theirs)])
+
+    def per_query(fn):
+        fn(Q[:1])
+        start = time.perf_counter()
+        for row in Q[:50]:
+            fn(row[None, :])
+        return (time.perf_counter() - start) / 50 * 1000
+
+    index_ms = per_query(lambda q: model.index.search(q, 5))
+    exact_ms = per_query(lambda q: exact.kneighbors(q))
+    # Python lists of floats, as the dataset used to be held: 24-byte float objects plus list slots.
+    lists_mb = samples * 63 * (24 + 8) / 1e6
+    print(
+        f"{samples:7d} samples: lists ~{lists_mb:7.1f} MB  float32 {X.nbytes / 1e6:6.1f} MB  "
+        f"int8 {model.index.nbytes / 1e6:6.1f} MB   "
+        f"query exact {exact_ms:6.2f} ms  int8 {index_ms:6.2f} ms   top-5 recall {recall:6.1%}"
+    )
+
+
+def _load_dataset(path):
+    # (samples, labels) from a dataset directory or an old JSON file, without migrating it.
+    if os.path.isdir(path):
+        dataset = TrainingDataset(63)
+        return (dataset.samples, dataset.labels()) if dataset.load(path) else None
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        return np.asarray(payload["samples"], dtype=np.float32), [str(label) for label in payload["labels"]]
+    return None
+
+
+def main():
+    rng = np.random.default_rng(0)
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    else:
+        path = DATASET_PATH if os.path.isdir(DATASET_PATH) else LEGACY_DATASET_PATH
+    loaded = _load_dataset(path)
+    if loaded is not None and len(loaded[0]):
+        _parity(*loaded, rng)
+    else:
+        print(f"No dataset at {path}; skipping the parity check")
+    for samples in (10_000, 100_000, 200_000):
+        _scale(samples, rng)
+
+
+if __name__ == "__main__":
+    main()
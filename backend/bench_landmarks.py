@@ -0,0 +1,103 @@
+import time
+import tracemalloc
+import types
+
+import numpy as np
+
+from augment import NoveltyBuffer
+from engine import GestureModel, HandTracker
+
+# Per-frame cost of the landmark path: reading MediaPipe's landmark protos, normalizing,
+# the recording novelty check and the classifier call. Landmarks are fake protos with the
+# same attribute layout, so MediaPipe is not needed.
+
+RECORDED = 40
+
+
+def _proto(points):
+    return types.SimpleNamespace(landmark=[types.SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in points])
+
+
+def _list_normalize(landmarks_list):
+    # The previous implementation, kept here as the baseline.
+    points = np.array(landmarks_list, dtype=np.float32).reshape(-1, 3)
+    points = points - points[0]
+    max_scale = np.max(np.linalg.norm(points, axis=1))
+    if max_scale > 1e-6:
+        points = points / max_scale
+    return points.flatten().tolist()
+
+
+def _list_frame(hand_lms, recorded, model):
+    landmarks_list = []
+    for lm in hand_lms.landmark:
+        landmarks_list.extend([lm.x, lm.y, lm.z])
+    landmarks = _list_normalize(landmarks_list)
+    novel = all(
+        float(np.linalg.norm(np.array(existing, dtype=np.float32) - np.array(landmarks, dtype=np.float32))) >= 0.014
+        for existing in recorded
+    )
+    if model is not None:
+        model.predict_batch([landmarks])
+    return novel
+
+
+def _array_frame(tracker, hand_lms, buffer, model):
+    landmarks = tracker._read_landmarks(hand_lms)
+    novel = buffer.add(landmarks) is not None
+    if model is not None:
+        model.predict_codes([landmarks])
+    return novel
+
+
+def _measure(fn, frames):
+    for _ in range(50):
+        fn()
+    start = time.perf_counter()
+    for _ in range(frames):
+        fn()
+    us = (time.perf_counter() - start) / frames * 1e6
+
+    # Peak traced memory above the steady state during one frame: what each frame allocates
+    # and frees again.
+    tracemalloc.start()
+    peaks = []
+    for _ in range(200):
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    return us, float(np.median(peaks))
+
+
+def main(frames=3000):
+    rng = np.random.default_rng(0)
+    hand_lms = _proto(rng.random((21, 3)))
+    tracker = HandTracker.__new__(HandTracker)
+    tracker._points = np.empty((21, 3), dtype=np.float32)
+
+    recorded = [HandTracker.normalize_landmarks(rng.random((21, 3))) for _ in range(RECORDED)]
+    recorded_lists = [sample.tolist() for sample in recorded]
+    # The benchmark frame itself is kept once up front, so every timed frame runs the full
+    # distance check against RECORDED + 1 rows and is rejected as a duplicate.
+    buffer = NoveltyBuffer(RECORDED + 2, 63, 0.014)
+    for sample in recorded:
+        buffer.add(sample)
+    buffer.add(tracker._read_landmarks(hand_lms))
+
+    model = GestureModel()
+    X = rng.normal(0.0, 0.3, (600, 63)).astype(np.float32)
+    model.train(X, [f"g{idx % 6}" for idx in range(len(X))])
+
+    for name, with_model in (("landmarks + novelty", None), ("with classifier", model)):
+        list_us, list_bytes = _measure(lambda: _list_frame(hand_lms, recorded_lists, with_model), frames)
+        array_us, array_bytes = _measure(lambda: _array_frame(tracker, hand_lms, buffer, with_model), frames)
+        print(
+            f"{name:20s}: lists {list_us:8.1f} us {list_bytes / 1024:7.1f} KiB/frame   "
+            f"arrays {array_us:8.1f} us {array_bytes / 1024:7.1f} KiB/frame"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+from sklearn.neighbors import KNeighborsClassifier
+
+from engine import GestureModel
+
+
+def _dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main(samples=50000, classes=8):
+    rng = np.random.default_rng(7)
+    X = rng.normal(0.0, 0.3, (samples, 63)).astype(np.float32)
+    y = [f"gesture_{i % classes}" for i in range(samples)]
+
+    model = GestureModel()
+    model.train(X, y)
+
+    # The pickle format stored an estimator fitted on float64 Python lists.
+    legacy_estimator = KNeighborsClassifier(n_neighbors=5, weights="distance").fit(X.astype(np.float64), y)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "gesture_model.pkl")
+        with open(legacy_path, "wb") as f:
+            pickle.dump({"version": 2, "estimator": legacy_estimator, "metadata": {"classes": model.classes}}, f)
+        start = time.perf_counter()
+        with open(legacy_path, "rb") as f:
+            pickle.load(f)
+        legacy_load = time.perf_counter() - start
+
+        model_path = os.path.join(tmp, "gesture_model")
+        model.save(model_path)
+        start = time.perf_counter()
+        GestureModel().load(model_path)
+        new_load = time.perf_counter() - start
+
+        print(f"samples={samples} classes={classes}")
+        print(f"pickle : {os.path.getsize(legacy_path) / 1024:9.1f} KiB  load {legacy_load * 1000:8.1f} ms")
+        print(f"arrays : {_dir_size(model_path) / 1024:9.1f} KiB  load {new_load * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import time
+
+import numpy as np
+
+from motion import RESAMPLE_STEPS, LandmarkRingBuffer, MotionClassifier, dtw_batch, trajectory_features
+
+FRAME_BUDGET_MS = 1000.0 / 30.0
+
+
+def _synthetic_motion(rng, kind, frames=20, seconds=0.6):
+    hand = rng.normal(0.0, 0.05, (21, 3)).astype(np.float32)
+    hand[9] = [0.0, -0.1, 0.0]
+    times = np.linspace(0.0, seconds, frames)
+    points = []
+    for k in range(frames):
+        u = k / (frames - 1)
+        p = hand + 0.5
+        if kind == 0:
+            p[:, 0] += 0.4 * u
+        elif kind == 1:
+            p[:, 0] -= 0.4 * u
+        else:
+            p[:, 0] += 0.1 * np.cos(2 * np.pi * u)
+            p[:, 1] += 0.1 * np.sin(2 * np.pi * u)
+        points.append(p + rng.normal(0.0, 0.004, p.shape))
+    return np.array(points, dtype=np.float32), times
+
+
+def _unpruned(classifier, query):
+    everything = np.arange(len(classifier.templates))
+    return classifier._decide(everything, dtw_batch(query[None], classifier.templates))
+
+
+def check_pruning(rng, queries=300):
+    # LB_Keogh pruning must only save work: the decision has to be the one an exhaustive DTW
+    # over every template gives. The first case is a query between two templates that are
+    # almost equally close, where the farther one is the runner-up that makes it ambiguous.
+    query = np.zeros((RESAMPLE_STEPS, 3), dtype=np.float32)
+    query[:, 0] = np.linspace(0.0, 1.0, RESAMPLE_STEPS)
+    classifier = MotionClassifier()
+    classifier.set_templates(
+        [
+            {"label": "swipe_a", "points": query + np.float32([0.0, 0.10, 0.0])},
+            {"label": "swipe_b", "points": query - np.float32([0.0, 0.11, 0.0])},
+        ]
+    )
+    pruned = classifier.match_queries([query])[0]
+    assert pruned == _unpruned(classifier, query) and pruned[0] == "none", pruned
+
+    entries = [
+        {"label": f"motion_{idx % 4}", "points": rng.normal(0.0, 0.3, (RESAMPLE_STEPS, 3)).astype(np.float32)}
+        for idx in range(40)
+    ]
+    classifier.set_templates(entries)
+    for _ in range(queries):
+        base = entries[int(rng.integers(len(entries)))]["points"]
+        query = (base + rng.normal(0.0, 0.15, base.shape)).astype(np.float32)
+        pruned = classifier.match_queries([query])[0]
+        assert pruned[0] == _unpruned(classifier, query)[0], (pruned, _unpruned(classifier, query))
+    print(f"pruned and exhaustive matching agree on {queries + 1} queries")
+
+
+def main(runs=200):
+    rng = np.random.default_rng(3)
+    check_pruning(rng)
+    for per_label in (5, 20, 100):
+        entries = []
+        for kind in range(3):
+            for _ in range(per_label):
+                seconds = float(rng.uniform(0.4, 0.9))
+                points, times = _synthetic_motion(rng, kind, int(rng.integers(14, 26)), seconds)
+                entries.append({"label": f"motion_{kind}", "duration": seconds, "points": trajectory_features(points, times)})
+        classifier = MotionClassifier()
+        classifier.set_templates(entries)
+
+        buffer = LandmarkRingBuffer()
+        points, times = _synthetic_motion(rng, 2)
+        for p, t in zip(points, times):
+            buffer.push(p, 100.0 + t)
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            label = classifier.match(buffer)[0]
+        per_frame_ms = (time.perf_counter() - start) * 1000.0 / runs
+        print(
+            f"templates={len(entries):4d} match={label:<9} {per_frame_ms:6.2f} ms/frame "
+            f"({per_frame_ms / FRAME_BUDGET_MS:.1%} of a 30 fps frame)"
+        )
+
+
+if __name__ == "__main__":
+    main()
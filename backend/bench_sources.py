@@ -0,0 +1,86 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from engine import HandTracker
+from smoothing import build_smoother
+from sources import InferenceState, VideoSource
+
+
+def _write_clip(path, frames=120, size=(640, 480)):
+    import cv2
+
+    # A high nominal frame rate turns off file pacing, so each source runs as fast as it can.
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 1000, size)
+    rng = np.random.default_rng(0)
+    for _ in range(frames):
+        writer.write(rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8))
+    writer.release()
+
+
+async def _run(clip, count, seconds, workers=0):
+    sources = [
+        VideoSource(
+            f"s{idx}",
+            clip,
+            tracker_factory=lambda: HandTracker(2),
+            inference=InferenceState(build_smoother("streak")),
+            tracker_options=lambda: {"max_hands": 2},
+            workers=workers,
+        )
+        for idx in range(count)
+    ]
+    for source in sources:
+        source.start()
+
+    async def drain(source):
+        while await source.next_result() is not None:
+            pass
+
+    drains = [asyncio.create_task(drain(source)) for source in sources]
+    # Let every tracker finish loading before counting.
+    while any(source.frames_read == 0 for source in sources):
+        await asyncio.sleep(0.05)
+    start_counts = [source.frames_read for source in sources]
+    ages = []
+    deadline = asyncio.get_running_loop().time() + seconds
+    while asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.05)
+        ages.extend(source.frame_age_ms for source in sources)
+    total = sum(source.frames_read - start for source, start in zip(sources, start_counts))
+
+    for source in sources:
+        source.stop()
+    await asyncio.gather(*drains)
+    return total / seconds, float(np.median(ages))
+
+
+def main(seconds=4.0):
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = os.path.join(tmp, "bench.avi")
+        _write_clip(clip)
+        print(f"cpu cores: {os.cpu_count()}")
+        single = None
+        for count in (1, 2, 4):
+            fps, age = asyncio.run(_run(clip, count, seconds))
+            single = single or fps
+            print(
+                f"sources={count}  total {fps:7.1f} fps  per source {fps / count:6.1f} fps  "
+                f"scaling x{fps / single:.2f}  frame age {age:6.2f} ms"
+            )
+
+        # One source with detection and encoding in worker processes reading the shared-memory
+        # ring, against the single-process path above.
+        for workers in (1, 2, 4):
+            fps, age = asyncio.run(_run(clip, 1, seconds, workers))
+            print(
+                f"workers={workers}  total {fps:7.1f} fps  vs single process x{fps / single:.2f}  "
+                f"frame age {age:6.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 4.0)
@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = ("mediapipe", "sklearn", "cv2", "pyautogui")
+
+_PROBE = f"""
+import sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+print(f"{{elapsed * 1000.0:.1f}}|{{','.join(loaded)}}")
+"""
+
+
+def _measure_once():
+    # Fresh interpreter per run so nothing is already cached in sys.modules.
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    ).stdout.strip().splitlines()[-1]
+    elapsed_ms, loaded = out.split("|")
+    return float(elapsed_ms), loaded
+
+
+def _measure_module(name):
+    probe = f"import time; s = time.perf_counter(); import {name}; print((time.perf_counter() - s) * 1000.0)"
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main(runs=5):
+    timings = []
+    loaded = ""
+    for _ in range(runs):
+        elapsed_ms, loaded = _measure_once()
+        timings.append(elapsed_ms)
+    timings.sort()
+    print(f"import main: best {timings[0]:.1f} ms, median {timings[len(timings) // 2]:.1f} ms over {runs} runs")
+    print(f"heavy modules imported eagerly: {loaded or 'none'}")
+    for name in HEAVY_MODULES:
+        try:
+            print(f"  deferred {name:<10} {_measure_module(name):8.1f} ms")
+        except subprocess.CalledProcessError:
+            print(f"  deferred {name:<10}   (not importable here)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import threading
+import time
+
+# Latest-frame capture. A camera driver queues frames, and cap.read() returns the oldest one:
+# when hand detection is slower than the camera, every processed frame is already stale.
+# LatestFrameCapture drains the device on its own thread and keeps only the newest frame and
+# the time it was captured. The consumer always gets the latest frame; the ones it never got
+# to are counted as `frames_skipped`.
+#
+# Camera settings come from the `camera` entry of config/runtime.json. A driver may ignore
+# or round any of them, so the values it actually uses are read back into `actual`.
+
+DEFAULT_CAPTURE_SETTINGS = {
+    "width": 640,
+    "height": 480,
+    "fps": 30,
+    # MJPG lets USB webcams deliver 640x480 and above at full frame rate; "" keeps the driver's format.
+    "fourcc": "MJPG",
+    "buffer_size": 1,
+}
+
+
+def capture_settings(payload):
+    # Validated copy of a `camera` settings dict; missing or invalid values use the defaults.
+    payload = payload if isinstance(payload, dict) else {}
+    settings = dict(DEFAULT_CAPTURE_SETTINGS)
+    for key in ("width", "height", "fps", "buffer_size"):
+        try:
+            settings[key] = int(payload.get(key, settings[key]))
+        except (TypeError, ValueError):
+            pass
+    settings["width"] = max(0, min(3840, settings["width"]))
+    settings["height"] = max(0, min(2160, settings["height"]))
+    settings["fps"] = max(0, min(120, settings["fps"]))
+    settings["buffer_size"] = max(0, min(10, settings["buffer_size"]))
+    fourcc = str(payload.get("fourcc", settings["fourcc"]) or "").strip().upper()
+    settings["fourcc"] = fourcc if len(fourcc) == 4 else ""
+    return settings
+
+
+def _fourcc_name(code):
+    code = int(code)
+    return "".join(chr((code >> (8 * idx)) & 0xFF) for idx in range(4)).strip("\x00 ")
+
+
+class LatestFrameCapture:
+    def __init__(self, uri, settings=None, loop_video=True):
+        self.uri = uri
+        self.is_file = isinstance(uri, str) and "://" not in uri
+        self.settings = capture_settings(settings)
+        self.loop_video = bool(loop_video)
+        # While idle the device is only drained (grab without decode); read() gets nothing new.
+        self.idle = False
+        self.frames_captured = 0
+        self.frames_skipped = 0
+        self.actual = {}
+        self.error = ""
+        self.ended = False
+
+        self._cap = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._cond = threading.Condition()
+        self._frame = None
+        self._captured_at = 0.0
+        self._seq = 0
+        self._read_seq = 0
+        self._frame_interval = 0.0
+
+    def open(self):
+        self._open_device()
+        self._start()
+
+    def _open_device(self):
+        import cv2
+
+        cap = cv2.VideoCapture(self.uri)
+        if not cap.isOpened():
+            cap.release()
+            raise RuntimeError(f"Could not open source {self.uri!r}")
+        if self.is_file:
+            # Files are paced at their own frame rate so they behave like a live camera.
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            self._frame_interval = 1.0 / fps if fps and fps > 0 else 0.0
+        else:
+            self._apply_settings(cap, cv2)
+        self.actual = {
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": round(float(cap.get(cv2.CAP_PROP_FPS)), 1),
+            "fourcc": _fourcc_name(cap.get(cv2.CAP_PROP_FOURCC)),
+        }
+        self._cap = cap
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name=f"capture-{self.uri}", daemon=True)
+        self._thread.start()
+
+    def _apply_settings(self, cap, cv2):
+        settings = self.settings
+        # V4L2 negotiates the resolution per pixel format, so the format goes first.
+        if settings["fourcc"]:
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*settings["fourcc"]))
+        if settings["width"] and settings["height"]:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, settings["width"])
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, settings["height"])
+        if settings["fps"]:
+            cap.set(cv2.CAP_PROP_FPS, settings["fps"])
+        if settings["buffer_size"]:
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, settings["buffer_size"])
+
+    def read(self, timeout=0.5):
+        # Blocks until a frame newer than the last one returned is available. Returns
+        # (frame, captured_at) with captured_at on the time.perf_counter() clock, or None on
+        # timeout and after the capture has ended.
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > self._read_seq or self.ended, timeout)
+            if self._seq == self._read_seq:
+                return None
+            self._read_seq = self._seq
+            return self._frame, self._captured_at
+
+    def _decode(self, cap):
+        return cap.read()
+
+    def _store(self, frame, captured_at):
+        with self._cond:
+            if self._seq > self._read_seq:
+                self.frames_skipped += 1
+            self._frame = frame
+            self._captured_at = captured_at
+            self._seq += 1
+            self._cond.notify_all()
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+
+    def _run(self):
+        import cv2
+
+        cap = self._cap
+        next_frame_at = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                if self.idle:
+                    ret, frame = cap.grab(), None
+                else:
+                    ret, frame = self._decode(cap)
+                captured_at = time.perf_counter()
+                if not ret:
+                    if self.is_file and self.loop_video and self.frames_captured:
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    if self.is_file:
+                        break
+                    time.sleep(0.05)
+                    continue
+
+                self.frames_captured += 1
+                if frame is not None:
+                    self._store(frame, captured_at)
+
+                if self._frame_interval:
+                    next_frame_at += self._frame_interval
+                    delay = next_frame_at - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        next_frame_at = time.perf_counter()
+        except Exception as e:
+            self.error = str(e)
+            print(f">>> Capture of {self.uri!r} stopped: {e}")
+        finally:
+            cap.release()
+            with self._cond:
+                self.ended = True
+                self._cond.notify_all()
@@ -1,9 +1,9 @@
-import pyautogui
 import subprocess
 import sys
 import time
 
-pyautogui.FAILSAFE = True 
+from input_backends import NullBackend, open_backend
+
 last_action_time = 0
 cooldown = 1.5 
 
@@ -19,6 +19,72 @@ ACTION_MAP = {
 SUPPORTED_ACTIONS = set(list(ACTION_MAP.keys()) + ["ZOOM_IN", "ZOOM_OUT", "LOCK_SCREEN"])
 
 
+# Requested backend name (see input_backends.py) and the backend opened for it. Opening is
+# deferred to warm_up() or the first action: the backends need a display or /dev/uinput.
+backend_name = "auto"
+_backend = None
+# Why the requested backend did not open. The null backend stands in for it until
+# set_backend() is called again, so gestures do not retry every backend each time they fire.
+backend_error = ""
+
+# Dispatch latency per action key, in milliseconds: time spent in _perform_action.
+action_latency = {}
+
+
+def _gui():
+    global _backend, backend_error
+    if _backend is None:
+        try:
+            _backend = open_backend(backend_name)
+            print(f">>> Input backend: {_backend.name}")
+        except Exception as e:
+            backend_error = str(e)
+            _backend = NullBackend()
+            print(f">>> Input backend '{backend_name}' unavailable, actions are not sent: {e}")
+    return _backend
+
+
+def set_backend(name):
+    # Closes the current backend; the new one is opened on next use. Latency stats start over.
+    global backend_name, _backend, backend_error
+    backend_name = str(name or "auto").strip().lower()
+    backend_error = ""
+    action_latency.clear()
+    if _backend is not None:
+        try:
+            _backend.close()
+        except Exception as e:
+            print(f">>> Closing input backend failed: {e}")
+        _backend = None
+
+
+def warm_up():
+    # Raises if the requested backend could not be opened, so a settings change can be
+    # rejected; actions keep going to the null backend either way.
+    _gui()
+    if backend_error:
+        raise RuntimeError(backend_error)
+
+
+def input_status():
+    return {
+        "requested": backend_name,
+        "backend": _backend.name if _backend is not None else "",
+        "error": backend_error,
+        "latency_ms": action_latency,
+    }
+
+
+def _record_latency(action_key, elapsed_ms):
+    stats = action_latency.get(action_key)
+    if stats is None:
+        stats = action_latency[action_key] = {"count": 0, "last": 0.0, "mean": 0.0, "max": 0.0}
+    stats["count"] += 1
+    stats["last"] = round(elapsed_ms, 3)
+    stats["mean"] = round(stats["mean"] + (elapsed_ms - stats["mean"]) / stats["count"], 3)
+    stats["max"] = round(max(stats["max"], elapsed_ms), 3)
+
+
 def _osascript(script: str):
     result = subprocess.run(
         ["osascript", "-e", script],
@@ -54,23 +120,23 @@ def _mac_step_volume(delta: int):
 def _press_zoom_in():
     # Explicit '+' key chord: Shift + '='.
     if sys.platform == "darwin":
-        pyautogui.hotkey("command", "shift", "=")
+        _gui().hotkey("command", "shift", "=")
     else:
-        pyautogui.hotkey("ctrl", "shift", "=")
+        _gui().hotkey("ctrl", "shift", "=")
 
 def _press_zoom_out():
     if sys.platform == "darwin":
-        pyautogui.hotkey("command", "-")
+        _gui().hotkey("command", "-")
     else:
-        pyautogui.hotkey("ctrl", "-")
+        _gui().hotkey("ctrl", "-")
 
 def _lock_screen():
     if sys.platform == "darwin":
-        pyautogui.hotkey("ctrl", "command", "q")
+        _gui().hotkey("ctrl", "command", "q")
     elif sys.platform.startswith("win"):
-        pyautogui.hotkey("win", "l")
+        _gui().hotkey("win", "l")
     else:
-        pyautogui.hotkey("ctrl", "alt", "l")
+        _gui().hotkey("ctrl", "alt", "l")
 
 def _perform_action(action_key):
     if sys.platform == "darwin":
@@ -86,7 +152,7 @@ def _perform_action(action_key):
 
     pyautogui_key = ACTION_MAP.get(action_key)
     if pyautogui_key:
-        pyautogui.press(pyautogui_key)
+        _gui().press(pyautogui_key)
         return True
 
     if action_key == "ZOOM_IN":
@@ -104,17 +170,32 @@ def _perform_action(action_key):
     return False
 
 def execute_action(gesture_name, current_mappings):
-    global last_action_time
     gesture_key = gesture_name.strip().lower()
-    
+    execute_mapped_action(gesture_key, current_mappings.get(gesture_key))
+
+
+def execute_mapped_action(gesture_key, mapped_action_key):
+    # The live feed resolves the action through the compiled gesture table, so no mapping
+    # lookup is needed here. Returns True if the action ran (False during the cooldown).
+    global last_action_time
+
     if gesture_key == "none" or (time.time() - last_action_time < cooldown):
-        return
+        return False
 
-    mapped_action_key = current_mappings.get(gesture_key)
     if not mapped_action_key or mapped_action_key.upper() == "NONE":
-        return
+        return False
 
     action_key = mapped_action_key.upper()
-    if _perform_action(action_key):
+    start = time.perf_counter()
+    try:
+        performed = _perform_action(action_key)
+    except Exception:
+        # The cooldown still applies, so a failing action is not retried on every frame.
+        last_action_time = time.time()
+        raise
+    if performed:
+        _record_latency(action_key, (time.perf_counter() - start) * 1000.0)
         print(f">>> EXECUTING: {gesture_key} -> {action_key}")
         last_action_time = time.time()
+        return True
+    return False
@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from storage import atomic_write
+
+# The recorded training samples. Samples are one float32 matrix, and every row's label is an
+# int32 code into a small label table. The registry works on labels, not samples, so its
+# operations touch the table instead of walking the samples:
+#   - renaming a gesture rewrites its table entry, whatever its sample count,
+#   - removing labels flags table entries and masks the matrix with them once,
+#   - per-label counts are a bincount of the codes.
+#
+# On disk it is a directory like the model's: samples.npy, labels.npy (the codes) and
+# dataset.json with the label table. Only the files that changed since the last save are
+# written, so a rename rewrites the small JSON file and nothing else.
+#
+# `python bench_dataset.py` times registry operations against the per-sample lists this
+# replaces.
+
+DATASET_FORMAT_VERSION = 1
+DATASET_METADATA_FILE = "dataset.json"
+DATASET_SAMPLES_FILE = "samples.npy"
+DATASET_LABELS_FILE = "labels.npy"
+_ALL_FILES = (DATASET_SAMPLES_FILE, DATASET_LABELS_FILE, DATASET_METADATA_FILE)
+
+
+def _label(value):
+    return str(value).strip().lower()
+
+
+class TrainingDataset:
+    def __init__(self, dim):
+        self.dim = int(dim)
+        self.samples = np.empty((0, self.dim), dtype=np.float32)
+        self.codes = np.empty(0, dtype=np.int32)
+        # Labels present in the dataset; entries without samples are dropped as they empty.
+        self.table = []
+        self._signature = None
+        # (old signature, signature) when this dataset was converted from the legacy JSON
+        # file, so a model trained on it can be restamped; see _migrate_legacy().
+        self.migrated_signature = None
+        # Files that differ from what is on disk.
+        self._dirty = set(_ALL_FILES)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _changed(self, *files):
+        self._signature = None
+        self._dirty.update(files)
+
+    def _set(self, samples, codes, table):
+        self.samples = samples
+        self.codes = codes
+        self.table = table
+        self._changed(*_ALL_FILES)
+
+    def append(self, samples, label):
+        # Adds a batch of (n, dim) samples under one label.
+        rows = np.asarray(samples, dtype=np.float32).reshape(-1, self.dim)
+        if not len(rows):
+            return
+        label = _label(label)
+        if label not in self.table:
+            self.table.append(label)
+            self._changed(DATASET_METADATA_FILE)
+        code = self.table.index(label)
+        self.samples = np.concatenate([self.samples, rows])
+        self.codes = np.concatenate([self.codes, np.full(len(rows), code, dtype=np.int32)])
+        self._changed(DATASET_SAMPLES_FILE, DATASET_LABELS_FILE)
+
+    def clear(self):
+        if len(self):
+            self._set(np.empty((0, self.dim), dtype=np.float32), np.empty(0, dtype=np.int32), [])
+
+    def counts(self):
+        # {label: sample count}.
+        counts = np.bincount(self.codes, minlength=len(self.table))
+        return {label: int(count) for label, count in zip(self.table, counts)}
+
+    def labels(self):
+        # One label string per sample, for code that takes plain label lists (training, reports).
+        if not len(self):
+            return []
+        return np.asarray(self.table, dtype=object)[self.codes].tolist()
+
+    def samples_for(self, label):
+        label = _label(label)
+        if label not in self.table:
+            return self.samples[:0]
+        return self.samples[self.codes == self.table.index(label)]
+
+    def remove(self, predicate):
+        # Drops the samples of every label for which predicate(label) is true; returns how
+        # many were dropped.
+        drop = np.array([bool(predicate(label)) for label in self.table], dtype=bool)
+        if not drop.any():
+            return 0
+        keep = ~drop[self.codes]
+        removed = len(keep) - int(np.count_nonzero(keep))
+        # Kept table entries are renumbered in order, so codes stay dense.
+        remap = (np.cumsum(~drop) - 1).astype(np.int32)
+        self._set(
+            self.samples[keep],
+            remap[self.codes[keep]],
+            [label for label, dropped in zip(self.table, drop) if not dropped],
+        )
+        return removed
+
+    def relabel(self, rename):
+        # Renames every label to rename(label); returns how many samples changed label.
+        new_table = [_label(rename(label)) for label in self.table]
+        changed = np.array([new != old for new, old in zip(new_table, self.table)], dtype=bool)
+        if not changed.any():
+            return 0
+        relabeled = int(np.bincount(self.codes, minlength=len(self.table))[changed].sum())
+        merged = list(dict.fromkeys(new_table))
+        if len(merged) == len(new_table):
+            self.table = new_table
+            self._changed(DATASET_METADATA_FILE)
+        else:
+            # Two labels renamed onto one share a code from now on: the only case where a
+            # rename rewrites the per-sample codes.
+            remap = np.array([merged.index(label) for label in new_table], dtype=np.int32)
+            self.codes = remap[self.codes]
+            self.table = merged
+            self._changed(DATASET_LABELS_FILE, DATASET_METADATA_FILE)
+        return relabeled
+
+    def signature(self):
+        # Content hash of the samples and their labels. It does not depend on the order of
+        # the table, and it is cached until the dataset changes.
+        if self._signature is None:
+            sorted_table = sorted(self.table)
+            rank = np.array([sorted_table.index(label) for label in self.table], dtype=np.int32)
+            digest = hashlib.sha256()
+            digest.update(json.dumps(sorted_table).encode("utf-8"))
+            digest.update(np.ascontiguousarray(self.samples))
+            digest.update(np.ascontiguousarray(rank[self.codes]))
+            self._signature = digest.hexdigest()
+        return self._signature
+
+    def save(self, path):
+        if not self._dirty:
+            return
+        os.makedirs(path, exist_ok=True)
+        if DATASET_SAMPLES_FILE in self._dirty:
+            atomic_write(
+                os.path.join(path, DATASET_SAMPLES_FILE),
+                lambda f: np.save(f, np.ascontiguousarray(self.samples), allow_pickle=False),
+            )
+        if DATASET_LABELS_FILE in self._dirty:
+            atomic_write(
+                os.path.join(path, DATASET_LABELS_FILE),
+                lambda f: np.save(f, np.ascontiguousarray(self.codes), allow_pickle=False),
+            )
+        # Metadata goes last and always, since it holds the sample count the arrays are checked
+        # against on load.
+        metadata = {
+            "format_version": DATASET_FORMAT_VERSION,
+            "dim": self.dim,
+            "samples": len(self),
+            "labels": list(self.table),
+        }
+        atomic_write(
+            os.path.join(path, DATASET_METADATA_FILE),
+            lambda f: json.dump(metadata, f, indent=2),
+            binary=False,
+        )
+        self._dirty.clear()
+
+    def load(self, path, legacy_path=None):
+        # Returns False, leaving the dataset as it is, when there is nothing valid to load.
+        metadata_path = os.path.join(path, DATASET_METADATA_FILE)
+        if not os.path.exists(metadata_path):
+            if legacy_path and os.path.exists(legacy_path):
+                return self._migrate_legacy(legacy_path, path)
+            return False
+
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        if int(metadata.get("format_version", 0)) != DATASET_FORMAT_VERSION:
+            return False
+        try:
+            samples = np.load(os.path.join(path, DATASET_SAMPLES_FILE), allow_pickle=False)
+            codes = np.load(os.path.join(path, DATASET_LABELS_FILE), allow_pickle=False)
+        except (OSError, ValueError):
+            return False
+        table = [_label(label) for label in metadata.get("labels", [])]
+        if (
+            samples.ndim != 2
+            or samples.shape[1] != self.dim
+            or len(samples) != len(codes)
+            or len(samples) != int(metadata.get("samples", -1))
+            or len(set(table)) != len(table)
+            or (len(codes) and (int(codes.min()) < 0 or int(codes.max()) >= len(table)))
+        ):
+            return False
+        self._set(samples.astype(np.float32, copy=False), codes.astype(np.int32, copy=False), table)
+        self._dirty.clear()
+        return True
+
+    def _migrate_legacy(self, legacy_path, path):
+        # One-time conversion of the old JSON file of per-sample lists.
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        samples = payload.get("samples", [])
+        labels = payload.get("labels", [])
+        if not isinstance(samples, list) or not isinstance(labels, list) or len(samples) != len(labels):
+            return False
+        # The signature the old format gave these samples and labels: models trained on them
+        # still carry it.
+        lowered = [_label(label) for label in labels]
+        serialized = json.dumps({"samples": samples, "labels": lowered}, separators=(",", ":"), sort_keys=True)
+        legacy_signature = hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+        table, codes = np.unique(np.asarray(lowered, dtype=str), return_inverse=True)
+        self._set(
+            np.asarray(samples, dtype=np.float32).reshape(len(samples), self.dim),
+            codes.astype(np.int32).reshape(-1),
+            [str(label) for label in table],
+        )
+        self.migrated_signature = (legacy_signature, self.signature())
+        self.save(path)
+        os.replace(legacy_path, f"{legacy_path}.migrated")
+        return True
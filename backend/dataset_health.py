@@ -0,0 +1,240 @@
+import numpy as np
+
+import augment
+
+# Dataset analysis and class balancing over the (N, 63) training matrix. Pairwise distances are
+# computed in row x column blocks, so memory stays at block^2 floats whatever N is. Time is
+# still quadratic, so above `max_queries` samples only a seeded random subset of rows is
+# compared against the full matrix, and the report says so.
+
+REPORT_BLOCK = 2048
+REPORT_MAX_QUERIES = 10000
+# Upper bound on stored near-duplicate pairs, so a degenerate dataset cannot exhaust memory.
+MAX_DUPLICATE_PAIRS = 5_000_000
+
+
+def _as_arrays(samples, labels):
+    X = np.ascontiguousarray(np.asarray(samples, dtype=np.float32).reshape(len(samples), -1))
+    classes, codes = np.unique(np.asarray([str(label) for label in labels]), return_inverse=True)
+    return X, [str(c) for c in classes], codes.astype(np.int32)
+
+
+def _nearest_neighbours(X, codes, query_idx, duplicate_distance, block):
+    # Samples are sorted by label so that, for a block of query rows of one label, the
+    # same-label columns are a contiguous slice. Splitting same/other then costs one slice
+    # assignment per block instead of building label masks over the whole block.
+    order = np.argsort(codes, kind="stable")
+    Xs = X[order]
+    sorted_codes = codes[order]
+    norms = np.einsum("ij,ij->i", Xs, Xs)
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(sorted_codes))])
+    position = np.empty(len(X), dtype=np.int64)
+    position[order] = np.arange(len(X))
+
+    q = len(query_idx)
+    query_pos = position[query_idx]
+    nearest_same = np.full(q, np.inf, dtype=np.float32)
+    nearest_other = np.full(q, np.inf, dtype=np.float32)
+    nearest_other_pos = np.full(q, -1, dtype=np.int64)
+    dup_threshold = float(duplicate_distance) ** 2
+    dup_rows = []
+    dup_cols = []
+    dup_count = 0
+
+    for code in np.unique(codes[query_idx]):
+        lo, hi = bounds[code], bounds[code + 1]
+        slots = np.flatnonzero(codes[query_idx] == code)
+        for qs in range(0, len(slots), block):
+            slot = slots[qs : qs + block]
+            rows = query_pos[slot]
+            A = Xs[rows]
+            row_norms = norms[rows][:, None]
+            local = np.arange(len(rows))
+            for cs in range(0, len(Xs), block):
+                ce = min(cs + block, len(Xs))
+                d = row_norms + norms[cs:ce][None, :] - 2.0 * (A @ Xs[cs:ce].T)
+                np.maximum(d, 0.0, out=d)
+                own = (rows >= cs) & (rows < ce)
+                d[local[own], rows[own] - cs] = np.inf
+
+                ii, jj = np.nonzero(d < dup_threshold)
+                if len(ii) and dup_count < MAX_DUPLICATE_PAIRS:
+                    dup_rows.append(order[rows[ii]])
+                    dup_cols.append(order[cs + jj])
+                    dup_count += len(ii)
+
+                same_lo, same_hi = max(lo, cs) - cs, min(hi, ce) - cs
+                if same_lo < same_hi:
+                    same = d[:, same_lo:same_hi]
+                    nearest_same[slot] = np.minimum(nearest_same[slot], same.min(axis=1))
+                    same[:] = np.inf
+
+                arg = d.argmin(axis=1)
+                best = d[local, arg]
+                better = best < nearest_other[slot]
+                nearest_other[slot[better]] = best[better]
+                nearest_other_pos[slot[better]] = cs + arg[better]
+
+    pairs = (
+        (np.concatenate(dup_rows), np.concatenate(dup_cols))
+        if dup_rows
+        else (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+    )
+    nearest_other_idx = np.where(nearest_other_pos >= 0, order[np.maximum(nearest_other_pos, 0)], -1)
+    return np.sqrt(nearest_same), np.sqrt(nearest_other), nearest_other_idx, pairs
+
+
+def _duplicate_clusters(n, pairs):
+    # Connected components of the near-duplicate graph, as a union-find over all pairs at
+    # once: every round hooks the larger root of each pair onto the smaller one, then
+    # shortens the paths until every node points at its root. A root is always the smallest
+    # node of its component, so parents only decrease and the loop ends.
+    rows, cols = pairs
+    if len(rows) == 0:
+        return np.arange(n), np.ones(n, dtype=np.int64)
+    parent = np.arange(n)
+    while True:
+        root_rows, root_cols = parent[rows], parent[cols]
+        split = root_rows != root_cols
+        if not split.any():
+            break
+        root_rows, root_cols = root_rows[split], root_cols[split]
+        np.minimum.at(parent, np.maximum(root_rows, root_cols), np.minimum(root_rows, root_cols))
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+    _, component = np.unique(parent, return_inverse=True)
+    return component, np.bincount(component)
+
+
+def dataset_report(
+    samples,
+    labels,
+    duplicate_distance=0.014,
+    max_queries=REPORT_MAX_QUERIES,
+    block=REPORT_BLOCK,
+    seed=0,
+):
+    if len(samples) == 0:
+        return {"total_samples": 0, "labels": [], "summary": {}}
+
+    X, classes, codes = _as_arrays(samples, labels)
+    n = len(X)
+    if n > max_queries:
+        query_idx = np.sort(np.random.default_rng(seed).choice(n, max_queries, replace=False))
+    else:
+        query_idx = np.arange(n)
+
+    nearest_same, nearest_other, nearest_other_idx, pairs = _nearest_neighbours(
+        X, codes, query_idx, duplicate_distance, block
+    )
+    component, component_sizes = _duplicate_clusters(n, pairs)
+    cross_label = int(np.count_nonzero(codes[pairs[0]] != codes[pairs[1]]))
+    query_codes = codes[query_idx]
+
+    counts = np.bincount(codes, minlength=len(classes))
+    per_label = []
+    for code, label in enumerate(classes):
+        members = np.flatnonzero(codes == code)
+        points = X[members]
+        centroid = points.mean(axis=0)
+        spread = np.linalg.norm(points - centroid, axis=1)
+        in_query = query_codes == code
+        other = nearest_other[in_query]
+        same = nearest_same[in_query]
+        finite_other = other[np.isfinite(other)]
+
+        nearest_label = None
+        if len(finite_other):
+            closest = nearest_other_idx[in_query][np.argmin(other)]
+            nearest_label = classes[codes[closest]]
+
+        # Samples beyond the first in each near-duplicate cluster add weight, not information.
+        member_components = component[members]
+        redundant = int(len(members) - len(np.unique(member_components)))
+
+        per_label.append(
+            {
+                "label": label,
+                "count": int(counts[code]),
+                "spread_mean": float(spread.mean()),
+                "spread_max": float(spread.max()),
+                "nearest_other_label": nearest_label,
+                "margin_min": float(finite_other.min()) if len(finite_other) else None,
+                "margin_median": float(np.median(finite_other)) if len(finite_other) else None,
+                # Share of samples whose nearest neighbour belongs to another label.
+                "overlap_ratio": float(np.mean(other < same)) if len(other) else 0.0,
+                "near_duplicates": redundant,
+            }
+        )
+
+    return {
+        "total_samples": n,
+        "labels": per_label,
+        "summary": {
+            "classes": len(classes),
+            "min_count": int(counts.min()),
+            "max_count": int(counts.max()),
+            "median_count": int(np.median(counts)),
+            "imbalance_ratio": float(counts.max() / max(1, counts.min())),
+            "duplicate_distance": float(duplicate_distance),
+            "duplicate_clusters": int(np.count_nonzero(component_sizes > 1)),
+            "largest_duplicate_cluster": int(component_sizes.max()),
+            "cross_label_duplicate_pairs": cross_label // 2 if len(query_idx) == n else cross_label,
+            "queried_samples": int(len(query_idx)),
+            "sampled": bool(len(query_idx) < n),
+        },
+    }
+
+
+def balance_dataset(samples, labels, target=None, seed=0, duplicate_distance=0.014):
+    # Brings every label to `target` samples (default: the median class size). Large labels
+    # drop near-duplicates first and are then subsampled; small labels are topped up with
+    # mild augmentations of their own samples. Seeded, so retraining is reproducible.
+    X, classes, codes = _as_arrays(samples, labels)
+    counts = np.bincount(codes, minlength=len(classes))
+    target = int(target) if target else int(np.median(counts))
+    target = max(1, target)
+    rng = np.random.default_rng(seed)
+
+    parts = []
+    out_labels = []
+    after = {}
+    for code, label in enumerate(classes):
+        idx = np.flatnonzero(codes == code)
+        if len(idx) > target:
+            distinct = idx[augment.dedupe_mask(X[idx], duplicate_distance)]
+            if len(distinct) >= target:
+                chosen = rng.choice(distinct, target, replace=False)
+            else:
+                rest = np.setdiff1d(idx, distinct)
+                chosen = np.concatenate([distinct, rng.choice(rest, target - len(distinct), replace=False)])
+            part = X[np.sort(chosen)]
+        elif len(idx) < target:
+            bases, per_base = np.unique(rng.choice(idx, target - len(idx)), return_counts=True)
+            variants = [
+                augment.augment_landmarks(
+                    X[b],
+                    c + 1,
+                    seed=int(rng.integers(2**32)),
+                    max_rotation=0.15,
+                    noise=0.01,
+                    finger_jitter=0.05,
+                )[1:]
+                for b, c in zip(bases, per_base)
+            ]
+            part = np.concatenate([X[idx]] + variants)
+        else:
+            part = X[idx]
+        parts.append(part)
+        out_labels.extend([label] * len(part))
+        after[label] = len(part)
+
+    summary = {
+        "target": target,
+        "before": {label: int(counts[code]) for code, label in enumerate(classes)},
+        "after": after,
+    }
+    return np.concatenate(parts), out_labels, summary
@@ -1,59 +1,188 @@
-import cv2
-import mediapipe as mp
+import json
 import numpy as np
 import os
 import pickle
 import time
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
+
+from features import DEFAULT_FEATURE_SET, FEATURE_SETS, extract_features, feature_set_name
+from knn_index import QuantizedIndex
+from storage import atomic_write
+# OpenCV, MediaPipe and scikit-learn take seconds to import, so they are imported on first
+# use instead of here. That keeps `import engine` (and the API server boot) fast.
+
+
+class TrackedHand:
+    __slots__ = ("handedness", "landmarks", "hand_landmarks")
+
+    def __init__(self, handedness, landmarks, hand_landmarks):
+        # "left" or "right" as seen by the user (the frame is mirrored before detection).
+        self.handedness = handedness
+        # Normalized (63,) float32 array for this hand alone.
+        self.landmarks = landmarks
+        # MediaPipe landmark list, or a raw (21, 3) array for hands sent by landmark clients.
+        self.hand_landmarks = hand_landmarks
+
 
 class HandTracker:
-    def __init__(self):
+    def __init__(
+        self,
+        max_hands=2,
+        static_image_mode=False,
+        draw_landmarks=True,
+        model_complexity=1,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.5,
+        input_scale=1.0,
+    ):
+        import mediapipe as mp
+
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=1,
-            min_detection_confidence=0.7
-        )
+        # With more than one hand allowed, palm detection keeps running until every slot is
+        # filled, so single-hand setups can pass max_hands=1 to save that work.
+        self.max_hands = max_hands
+        self.static_image_mode = static_image_mode
+        self.model_complexity = model_complexity
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+        # Frames are downscaled by this factor before detection. Landmarks are in normalized
+        # image coordinates, so they do not change with it.
+        self.input_scale = input_scale
+        self.hands = self._build_hands()
         self.mp_draw = mp.solutions.drawing_utils
+        self.draw_landmarks = draw_landmarks
+        # Landmark protos are read into this buffer every frame instead of a fresh Python list.
+        self._points = np.empty((21, 3), dtype=np.float32)
+
+    def _build_hands(self):
+        return self.mp_hands.Hands(
+            static_image_mode=self.static_image_mode,
+            max_num_hands=self.max_hands,
+            model_complexity=self.model_complexity,
+            min_detection_confidence=self.min_detection_confidence,
+            min_tracking_confidence=self.min_tracking_confidence,
+        )
+
+    def configure(self, model_complexity=None, min_detection_confidence=None, min_tracking_confidence=None, input_scale=None):
+        # Used by the quality controller. The input scale applies from the next frame; the other
+        # settings rebuild the MediaPipe graph, which restarts tracking, so only when they change.
+        if input_scale is not None:
+            self.input_scale = float(input_scale)
+        graph = (self.model_complexity, self.min_detection_confidence, self.min_tracking_confidence)
+        if model_complexity is not None:
+            self.model_complexity = int(model_complexity)
+        if min_detection_confidence is not None:
+            self.min_detection_confidence = float(min_detection_confidence)
+        if min_tracking_confidence is not None:
+            self.min_tracking_confidence = float(min_tracking_confidence)
+        if graph != (self.model_complexity, self.min_detection_confidence, self.min_tracking_confidence):
+            self.hands.close()
+            self.hands = self._build_hands()
+
+    def detect_hands(self, frame):
+        import cv2
 
-    def process_frame(self, frame):
         frame = cv2.flip(frame, 1)
 
-        img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        small = frame
+        if self.input_scale < 1.0:
+            small = cv2.resize(frame, None, fx=self.input_scale, fy=self.input_scale, interpolation=cv2.INTER_AREA)
+        img_rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
         results = self.hands.process(img_rgb)
-        
-        landmarks_list = []
-        
+
+        hands = []
         if results.multi_hand_landmarks:
-            for hand_lms in results.multi_hand_landmarks:
+            handedness = results.multi_handedness or []
+            for idx, hand_lms in enumerate(results.multi_hand_landmarks):
+                if self.draw_landmarks:
+                    self.mp_draw.draw_landmarks(frame, hand_lms, self.mp_hands.HAND_CONNECTIONS)
+                side = handedness[idx].classification[0].label.lower() if idx < len(handedness) else ""
+                hands.append(TrackedHand(side, self._read_landmarks(hand_lms), hand_lms))
 
-                self.mp_draw.draw_landmarks(frame, hand_lms, self.mp_hands.HAND_CONNECTIONS)
-                for lm in hand_lms.landmark:
-                    landmarks_list.extend([lm.x, lm.y, lm.z])
+        return frame, hands
 
-        if landmarks_list:
-            landmarks_list = self.normalize_landmarks(landmarks_list)
+    def _read_landmarks(self, hand_lms):
+        points = self._points
+        for row, lm in enumerate(hand_lms.landmark):
+            points[row, 0] = lm.x
+            points[row, 1] = lm.y
+            points[row, 2] = lm.z
+        # The normalized output is a new array: it leaves the capture thread with the frame's
+        # result, while the scratch buffer is refilled for the next frame.
+        return self.normalize_landmarks(points)
 
-        return frame, landmarks_list, results.multi_hand_landmarks
+    def process_frame(self, frame):
+        # Single-hand view for callers that work on one hand at a time (image uploads,
+        # stream recording). Each hand is normalized on its own, never concatenated.
+        # Landmarks are None when no hand was found.
+        frame, hands = self.detect_hands(frame)
+        if not hands:
+            return frame, None, None
+        return frame, hands[0].landmarks, [hands[0].hand_landmarks]
 
     @staticmethod
-    def normalize_landmarks(landmarks_list):
-        points = np.array(landmarks_list, dtype=np.float32).reshape(-1, 3)
-        wrist = points[0]
-        points = points - wrist
-        scales = np.linalg.norm(points, axis=1)
-        max_scale = np.max(scales)
+    def normalize_landmarks(landmarks, out=None):
+        # Wrist-relative and scaled so the farthest landmark is at distance 1. Returns a (63,)
+        # float32 array, written into `out` when given.
+        points = np.asarray(landmarks, dtype=np.float32).reshape(-1, 3)
+        if out is None:
+            out = np.empty(points.size, dtype=np.float32)
+        view = out.reshape(-1, 3)
+        np.subtract(points, points[0], out=view)
+        max_scale = np.sqrt(np.max(np.einsum("ij,ij->i", view, view)))
         if max_scale > 1e-6:
-            points = points / max_scale
-        return points.flatten().tolist()
-    
+            view /= max_scale
+        return out
+
+
+# Versioned on-disk model format: a directory holding plain arrays plus JSON metadata.
+# Nothing in it is unpickled, so loading a model never executes code from the file.
+MODEL_FORMAT_VERSION = 3
+MODEL_METADATA_FILE = "model.json"
+MODEL_SAMPLES_FILE = "samples.npy"
+MODEL_LABELS_FILE = "labels.npy"
+# int8 copy of the samples searched by knn_index.py; its offset and scale are in the metadata.
+MODEL_CODES_FILE = "codes.npy"
+# Squared norm of every quantized row; loading it skips a pass over the codes.
+MODEL_NORMS_FILE = "norms.npy"
+
+
+# Samples recorded from idle hands (resting, typing, reaching for the mouse). The classifier
+# learns them like any class, and predicting it means "no gesture".
+BACKGROUND_LABEL = "__background__"
+
+# Per-class rejection radii, calibrated when training: for every fitted sample, the mean
+# distance to its 3 nearest same-class samples (the same statistic predict_batch returns),
+# then a high percentile of those values with some headroom.
+REJECTION_NEIGHBOURS = 3
+REJECTION_PERCENTILE = 95.0
+REJECTION_MARGIN = 1.25
+MIN_REJECTION_RADIUS = 0.05
+CALIBRATION_MAX_QUERIES = 2000
+# Bounds the (rows x class size) distance block to roughly 16 MB of float32.
+CALIBRATION_BLOCK_ELEMENTS = 4_000_000
+
+# Share of every class held out to measure validation accuracy when training.
+VALIDATION_FRACTION = 0.2
+
+
+def _stratified_split(codes, fraction, seed):
+    # Train and validation row indices, holding out `fraction` of every class so both sides
+    # keep the class balance. A class always keeps at least one training sample.
+    order = np.random.default_rng(seed).permutation(len(codes))
+    ordered_codes = codes[order]
+    held_out = []
+    for code in np.unique(codes):
+        rows = order[ordered_codes == code]
+        held_out.append(rows[: min(len(rows) - 1, int(round(len(rows) * fraction)))])
+    val_rows = np.sort(np.concatenate(held_out))
+    train_rows = np.setdiff1d(np.arange(len(codes)), val_rows, assume_unique=True)
+    return train_rows, val_rows
 
 
 class GestureModel:
     def __init__(self):
-        self.model = KNeighborsClassifier(n_neighbors=3, weights="distance")
+        self.index = None
+        self.n_neighbors = 0
         self.is_trained = False
         self.classes = []
         self.validation_accuracy = None
@@ -61,29 +190,90 @@ class GestureModel:
         self.last_trained_at = None
         self.last_neighbor_distance = None
         self.dataset_signature = None
+        self.fit_samples = None
+        self.fit_label_codes = None
+        self.rejection_radii = {}
+        # Feature set the model is fitted on (features.py); queries are converted to it too.
+        self.feature_set = DEFAULT_FEATURE_SET
 
-    def train(self, X_data, y_labels):
+    def _fit(self, samples, label_codes, quantized=None):
+        # A distance-weighted k-NN over integer class codes; `self.classes` maps them back to
+        # labels. Fitting only builds the search index, and a loaded model passes the
+        # persisted (codes, offset, scale) so the memory-mapped samples are not read at all.
+        self.n_neighbors = max(1, min(5, len(samples)))
+        if quantized is None:
+            self.index = QuantizedIndex.build(samples)
+        else:
+            self.index = QuantizedIndex(samples, *quantized)
+        self.fit_samples = samples
+        self.fit_label_codes = label_codes
+
+    def _calibrate_rejection_radii(self, samples, label_codes):
+        samples = np.asarray(samples, dtype=np.float32)
+        label_codes = np.asarray(label_codes)
+        rng = np.random.default_rng(0)
+        radii = {}
+        for code, label in enumerate(self.classes):
+            members = samples[label_codes == code]
+            # Needs at least one sample plus its neighbours; smaller classes keep the global distance.
+            if label == BACKGROUND_LABEL or len(members) <= REJECTION_NEIGHBOURS:
+                continue
+            query = np.arange(len(members))
+            if len(query) > CALIBRATION_MAX_QUERIES:
+                query = np.sort(rng.choice(len(members), CALIBRATION_MAX_QUERIES, replace=False))
+            member_norms = np.einsum("ij,ij->i", members, members)
+            rows_per_block = max(1, CALIBRATION_BLOCK_ELEMENTS // len(members))
+            spreads = []
+            for start in range(0, len(query), rows_per_block):
+                rows = query[start : start + rows_per_block]
+                d = member_norms[rows][:, None] + member_norms[None, :] - 2.0 * (members[rows] @ members.T)
+                np.maximum(d, 0.0, out=d)
+                # Leave-one-out: a sample is not its own neighbour.
+                d[np.arange(len(rows)), rows] = np.inf
+                nearest = np.partition(d, REJECTION_NEIGHBOURS - 1, axis=1)[:, :REJECTION_NEIGHBOURS]
+                spreads.append(np.sqrt(nearest).mean(axis=1))
+            radius = float(np.percentile(np.concatenate(spreads), REJECTION_PERCENTILE)) * REJECTION_MARGIN
+            radii[label] = round(max(MIN_REJECTION_RADIUS, radius), 4)
+        self.rejection_radii = radii
+
+    def train(self, X_data, y_labels, feature_set=None, balance=None):
+        # `balance(samples, labels)`, if given, returns the samples and labels to fit on. It
+        # only sees the training rows after the validation split, so synthetic top-ups are
+        # never scored against the samples they were made from, and validation and the
+        # rejection radii only use recorded samples.
         if len(X_data) < 1:
             return "No data to train"
 
+        if feature_set is not None:
+            self.feature_set = feature_set_name(feature_set)
         self.training_samples = len(X_data)
         self.classes = sorted(list(set(y_labels)))
 
-        can_validate = len(self.classes) > 1 and len(X_data) >= 12
-        if can_validate:
-            X_train, X_val, y_train, y_val = train_test_split(
-                X_data, y_labels, test_size=0.2, random_state=42, stratify=y_labels
-            )
-            k = max(1, min(5, len(X_train)))
-            self.model = KNeighborsClassifier(n_neighbors=k, weights="distance")
-            self.model.fit(X_train, y_train)
-            y_pred = self.model.predict(X_val)
-            self.validation_accuracy = float(accuracy_score(y_val, y_pred))
+        raw = np.asarray(X_data, dtype=np.float32)
+        X = extract_features(raw, self.feature_set)
+        if not np.isfinite(X).all():
+            raise ValueError("Training samples contain NaN or infinite values")
+        class_index = {label: idx for idx, label in enumerate(self.classes)}
+        codes = np.array([class_index[label] for label in y_labels], dtype=np.int32)
+
+        train_rows = np.arange(len(codes))
+        val_rows = train_rows[:0]
+        if len(self.classes) > 1 and len(X_data) >= 12:
+            train_rows, val_rows = _stratified_split(codes, VALIDATION_FRACTION, seed=42)
+
+        fit_X, fit_codes = X[train_rows], codes[train_rows]
+        if balance is not None:
+            balanced_samples, balanced_labels = balance(raw[train_rows], [y_labels[idx] for idx in train_rows])
+            fit_X = extract_features(np.asarray(balanced_samples, dtype=np.float32), self.feature_set)
+            fit_codes = np.array([class_index[label] for label in balanced_labels], dtype=np.int32)
+        self._fit(fit_X, fit_codes)
+
+        if len(val_rows):
+            codes_pred, _, _ = self._predict_features(X[val_rows])
+            self.validation_accuracy = float(np.mean(codes_pred == codes[val_rows]))
         else:
-            k = max(1, min(5, len(X_data)))
-            self.model = KNeighborsClassifier(n_neighbors=k, weights="distance")
-            self.model.fit(X_data, y_labels)
             self.validation_accuracy = None
+        self._calibrate_rejection_radii(X[train_rows], codes[train_rows])
 
         self.last_trained_at = int(time.time())
         self.is_trained = True
@@ -92,84 +282,218 @@ class GestureModel:
         return f"Training Complete (validation accuracy: {self.validation_accuracy:.2%})"
 
     def save(self, path):
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "wb") as f:
-            pickle.dump(
-                {
-                    "version": 2,
-                    "estimator": self.model,
-                    "metadata": {
-                        "classes": self.classes,
-                        "validation_accuracy": self.validation_accuracy,
-                        "training_samples": self.training_samples,
-                        "last_trained_at": self.last_trained_at,
-                        "dataset_signature": self.dataset_signature,
-                    },
-                },
-                f,
-            )
-
-    def load(self, path):
-        if not os.path.exists(path):
+        if not self.is_trained or self.fit_samples is None:
+            return
+        os.makedirs(path, exist_ok=True)
+        samples = np.ascontiguousarray(self.fit_samples, dtype=np.float32)
+        codes = np.ascontiguousarray(self.fit_label_codes, dtype=np.int32)
+        quantized_codes = np.ascontiguousarray(self.index.codes)
+        samples_path = os.path.join(path, MODEL_SAMPLES_FILE)
+        atomic_write(samples_path, lambda f: np.save(f, samples, allow_pickle=False))
+        atomic_write(
+            os.path.join(path, MODEL_LABELS_FILE), lambda f: np.save(f, codes, allow_pickle=False)
+        )
+        atomic_write(
+            os.path.join(path, MODEL_CODES_FILE), lambda f: np.save(f, quantized_codes, allow_pickle=False)
+        )
+        norms = np.ascontiguousarray(self.index.norms, dtype=np.float32)
+        atomic_write(os.path.join(path, MODEL_NORMS_FILE), lambda f: np.save(f, norms, allow_pickle=False))
+        # Metadata goes last so a reader never sees a manifest pointing at half-written arrays.
+        metadata = {
+            "format_version": MODEL_FORMAT_VERSION,
+            "estimator": "knn",
+            "n_neighbors": int(self.n_neighbors),
+            "weights": "distance",
+            "quantization": {
+                "offset": [float(v) for v in self.index.offset],
+                "scale": [float(v) for v in self.index.scale],
+            },
+            "features": self.feature_set,
+            "feature_dim": int(samples.shape[1]),
+            "fit_samples": int(samples.shape[0]),
+            "classes": [str(c) for c in self.classes],
+            "validation_accuracy": self.validation_accuracy,
+            "training_samples": self.training_samples,
+            "last_trained_at": self.last_trained_at,
+            "dataset_signature": self.dataset_signature,
+            "rejection_radii": self.rejection_radii,
+        }
+        atomic_write(
+            os.path.join(path, MODEL_METADATA_FILE),
+            lambda f: json.dump(metadata, f, indent=2),
+            binary=False,
+        )
+        # From now on the exact rows are only read for re-ranking; map them instead of keeping
+        # the float32 matrix in memory.
+        self.fit_samples = np.load(samples_path, mmap_mode="r", allow_pickle=False)
+        self.index.samples = self.fit_samples
+
+    def restamp(self, path, dataset_signature):
+        # Records a new dataset signature for the model saved at `path`, without rewriting
+        # its arrays.
+        self.dataset_signature = dataset_signature
+        metadata_path = os.path.join(path, MODEL_METADATA_FILE)
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        metadata["dataset_signature"] = dataset_signature
+        atomic_write(metadata_path, lambda f: json.dump(metadata, f, indent=2), binary=False)
+
+    def load(self, path, legacy_path=None):
+        metadata_path = os.path.join(path, MODEL_METADATA_FILE)
+        if not os.path.exists(metadata_path):
+            if legacy_path and os.path.exists(legacy_path):
+                return self._migrate_legacy(legacy_path, path)
+            return False
+
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        if int(metadata.get("format_version", 0)) != MODEL_FORMAT_VERSION:
+            return False
+
+        samples = np.load(os.path.join(path, MODEL_SAMPLES_FILE), mmap_mode="r", allow_pickle=False)
+        codes = np.load(os.path.join(path, MODEL_LABELS_FILE), mmap_mode="r", allow_pickle=False)
+        classes = [str(c) for c in metadata.get("classes", [])]
+        # Models saved before feature sets existed were fitted on raw landmarks.
+        feature_set = str(metadata.get("features", "landmarks"))
+        if (
+            feature_set not in FEATURE_SETS
+            or samples.ndim != 2
+            or len(samples) != len(codes)
+            or len(samples) != int(metadata.get("fit_samples", -1))
+            or not classes
+            or (len(codes) and int(np.max(codes)) >= len(classes))
+        ):
             return False
-        with open(path, "rb") as f:
+
+        self._fit(samples, codes, quantized=self._load_quantized(path, metadata, samples.shape))
+        self.is_trained = True
+        self.classes = classes
+        self.feature_set = feature_set
+        self.validation_accuracy = metadata.get("validation_accuracy")
+        self.training_samples = int(metadata.get("training_samples", 0))
+        self.last_trained_at = metadata.get("last_trained_at")
+        self.dataset_signature = metadata.get("dataset_signature")
+        # Models saved before calibration existed have no radii and use the global distance.
+        self.rejection_radii = {
+            str(label): float(radius) for label, radius in (metadata.get("rejection_radii") or {}).items()
+        }
+        return True
+
+    @staticmethod
+    def _load_quantized(path, metadata, shape):
+        # Persisted (codes, offset, scale, norms), or None to quantize the samples again
+        # (models saved before the codes were stored, or with a mismatched file). Norms are
+        # None, and recomputed, for models saved before they were stored.
+        quantization = metadata.get("quantization") or {}
+        codes_path = os.path.join(path, MODEL_CODES_FILE)
+        if not quantization or not os.path.exists(codes_path):
+            return None
+        codes = np.load(codes_path, mmap_mode="r", allow_pickle=False)
+        offset = np.asarray(quantization.get("offset", []), dtype=np.float32)
+        scale = np.asarray(quantization.get("scale", []), dtype=np.float32)
+        if codes.shape != shape or codes.dtype != np.int8 or offset.shape != (shape[1],) or scale.shape != (shape[1],):
+            return None
+        norms = None
+        norms_path = os.path.join(path, MODEL_NORMS_FILE)
+        if os.path.exists(norms_path):
+            norms = np.load(norms_path, mmap_mode="r", allow_pickle=False)
+            if norms.shape != (shape[0],) or norms.dtype != np.float32:
+                norms = None
+        return codes, offset, scale, norms
+
+    def _migrate_legacy(self, legacy_path, path):
+        # One-time conversion of the old pickle formats. This is the only place a pickle is
+        # still read; once converted, the pickle is renamed and never loaded again.
+        with open(legacy_path, "rb") as f:
             loaded = pickle.load(f)
 
+        estimator = None
+        metadata = {}
         if isinstance(loaded, dict) and "estimator" in loaded:
             estimator = loaded.get("estimator")
             metadata = loaded.get("metadata", {})
-            if hasattr(estimator, "predict_proba"):
-                self.model = estimator
-                self.is_trained = True
-                self.classes = metadata.get("classes", [])
-                self.validation_accuracy = metadata.get("validation_accuracy")
-                self.training_samples = int(metadata.get("training_samples", 0))
-                self.last_trained_at = metadata.get("last_trained_at")
-                self.dataset_signature = metadata.get("dataset_signature")
-                return True
-
-        # Backward compatibility:
-        # 1) New format: raw sklearn estimator
-        # 2) Old format: serialized GestureModel wrapper with `.model`
-        if hasattr(loaded, "predict_proba"):
-            self.model = loaded
-            self.is_trained = True
-            self.classes = list(getattr(self.model, "classes_", []))
-            self.validation_accuracy = None
-            self.training_samples = 0
-            self.last_trained_at = None
-            self.dataset_signature = None
-            return True
-
-        if hasattr(loaded, "model") and hasattr(loaded.model, "predict_proba"):
-            self.model = loaded.model
-            self.is_trained = bool(getattr(loaded, "is_trained", True))
-            self.classes = list(getattr(loaded, "classes", [])) or list(getattr(self.model, "classes_", []))
-            self.validation_accuracy = getattr(loaded, "validation_accuracy", None)
-            self.training_samples = int(getattr(loaded, "training_samples", 0))
-            self.last_trained_at = getattr(loaded, "last_trained_at", None)
-            self.dataset_signature = getattr(loaded, "dataset_signature", None)
-            return self.is_trained
-
-        return False
+        elif hasattr(loaded, "predict_proba"):
+            # Raw sklearn estimator.
+            estimator = loaded
+        elif hasattr(loaded, "model") and hasattr(loaded.model, "predict_proba"):
+            # Serialized GestureModel wrapper with `.model`.
+            estimator = loaded.model
+            metadata = {
+                "classes": list(getattr(loaded, "classes", [])),
+                "validation_accuracy": getattr(loaded, "validation_accuracy", None),
+                "training_samples": getattr(loaded, "training_samples", 0),
+                "last_trained_at": getattr(loaded, "last_trained_at", None),
+                "dataset_signature": getattr(loaded, "dataset_signature", None),
+            }
+
+        fit_X = getattr(estimator, "_fit_X", None)
+        fit_y = getattr(estimator, "_y", None)
+        estimator_classes = getattr(estimator, "classes_", None)
+        if fit_X is None or fit_y is None or estimator_classes is None:
+            return False
+
+        fit_labels = [str(c) for c in np.asarray(estimator_classes)[np.asarray(fit_y)]]
+        classes = sorted(set([str(c) for c in metadata.get("classes", [])] + fit_labels))
+        class_index = {label: idx for idx, label in enumerate(classes)}
+
+        self._fit(
+            np.asarray(fit_X, dtype=np.float32),
+            np.array([class_index[label] for label in fit_labels], dtype=np.int32),
+        )
+        self.is_trained = True
+        self.classes = classes
+        self.feature_set = "landmarks"
+        self.validation_accuracy = metadata.get("validation_accuracy")
+        self.training_samples = int(metadata.get("training_samples", 0) or len(fit_labels))
+        self.last_trained_at = metadata.get("last_trained_at")
+        self.dataset_signature = metadata.get("dataset_signature")
+        self._calibrate_rejection_radii(self.fit_samples, self.fit_label_codes)
+
+        self.save(path)
+        os.replace(legacy_path, f"{legacy_path}.migrated")
+        return True
+
+    def predict_codes(self, samples):
+        # Predicts every hand in a frame with one neighbour search. The class vote and the
+        # rejection distance both come from that search, so a second hand adds rows to one
+        # call instead of repeating predict/predict_proba/kneighbors. Returns arrays of class
+        # codes (indices into `self.classes`), confidences and mean neighbour distances.
+        return self._predict_features(extract_features(samples, self.feature_set))
+
+    def _predict_features(self, X):
+        distances, indices = self.index.search(X, self.n_neighbors)
+        codes = np.asarray(self.fit_label_codes)[indices]
+
+        # Same weighting as KNeighborsClassifier(weights="distance"): inverse distance, and an
+        # exact match outvotes everything else.
+        exact = distances == 0.0
+        with np.errstate(divide="ignore"):
+            weights = 1.0 / distances
+        exact_rows = exact.any(axis=1)
+        weights[exact_rows] = exact[exact_rows]
+
+        votes = np.zeros((len(X), len(self.classes)), dtype=np.float64)
+        np.add.at(votes, (np.arange(len(X))[:, None], codes), weights)
+        best = np.argmax(votes, axis=1)
+        rows = np.arange(len(X))
+        confidence = votes[rows, best] / votes.sum(axis=1)
+        nearest = distances[:, : min(REJECTION_NEIGHBOURS, distances.shape[1])].mean(axis=1)
+        return best, confidence, nearest
+
+    def predict_batch(self, samples):
+        if not self.is_trained or len(samples) == 0:
+            return []
+        codes, confidence, nearest = self.predict_codes(samples)
+        return [
+            (self.classes[int(code)], float(conf), float(dist))
+            for code, conf, dist in zip(codes, confidence, nearest)
+        ]
 
     def predict(self, landmarks):
         if not self.is_trained:
             return "Uncalibrated", 0.0
 
-        prediction = self.model.predict([landmarks])[0]
-
-        probs = self.model.predict_proba([landmarks])[0]
-        confidence = max(probs)
-
+        prediction, confidence, distance = self.predict_batch([landmarks])[0]
         # Distance from nearest neighbors is used by the API to reject unknown gestures.
-        try:
-            k = min(3, len(getattr(self.model, "_fit_X", []))) or 1
-            distances, _ = self.model.kneighbors([landmarks], n_neighbors=k)
-            self.last_neighbor_distance = float(np.mean(distances[0]))
-        except Exception:
-            self.last_neighbor_distance = None
-
+        self.last_neighbor_distance = distance
         return prediction, confidence
-    
-    
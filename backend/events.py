@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+# In-process fan-out of state changes (gesture fired, streak progress, recording progress,
+# training results, ...) to /ws/events subscribers. Events carry a sequence number so a
+# client can tell when it missed some, and can resume with `since` after a reconnect.
+#
+# Backpressure: every subscriber has a bounded queue. A subscriber that falls behind loses
+# its oldest events instead of growing memory or slowing the publisher, and is told how many
+# were dropped so it can resync from /api/model_status.
+#
+# publish() may be called from worker threads (warm-up, boot retraining); delivery to
+# subscribers always happens on the event loop thread.
+
+EVENT_HISTORY = 256
+SUBSCRIBER_QUEUE = 256
+
+
+class Subscriber:
+    def __init__(self, types=None, queue_size=SUBSCRIBER_QUEUE):
+        self.types = set(types) if types else None
+        self.queue = deque(maxlen=queue_size)
+        self.dropped = 0
+        self._ready = asyncio.Event()
+
+    def wants(self, event):
+        return self.types is None or event["type"] in self.types
+
+    def push(self, event):
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(event)
+        self._ready.set()
+
+    async def next(self):
+        while not self.queue:
+            self._ready.clear()
+            await self._ready.wait()
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            return {"type": "overflow", "dropped": dropped, "next_seq": self.queue[0]["seq"]}
+        return self.queue.popleft()
+
+
+class EventBus:
+    def __init__(self, history=EVENT_HISTORY):
+        self.seq = 0
+        self.history = deque(maxlen=history)
+        self.subscribers = set()
+        self._lock = threading.Lock()
+        self._loop = None
+
+    def publish(self, event_type, **data):
+        with self._lock:
+            self.seq += 1
+            event = {"seq": self.seq, "type": event_type, "time": round(time.time(), 3), **data}
+            self.history.append(event)
+        loop = self._loop
+        if loop is None or not self.subscribers:
+            return event
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._deliver(event)
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(self._deliver, event)
+        return event
+
+    def _deliver(self, event):
+        for subscriber in list(self.subscribers):
+            if subscriber.wants(event):
+                subscriber.push(event)
+
+    def subscribe(self, types=None, since=None):
+        # Called from the event loop.
+        self._loop = asyncio.get_running_loop()
+        subscriber = Subscriber(types)
+        with self._lock:
+            history = list(self.history)
+            seq = self.seq
+        if since is not None:
+            oldest = history[0]["seq"] if history else seq + 1
+            if since > seq or since + 1 < oldest:
+                # The requested events are no longer kept, or came from before a restart.
+                subscriber.push({"type": "resync", "oldest_seq": oldest})
+            for event in history:
+                if event["seq"] > since and subscriber.wants(event):
+                    subscriber.push(event)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
@@ -0,0 +1,107 @@
+import numpy as np
+
+# Classifier feature sets. Samples are always stored as normalized landmarks (63 values,
+# wrist-relative, farthest landmark at distance 1); a model converts them to its feature set
+# when it is fitted and for every query, and records the set in its metadata.
+#
+#   landmarks  the normalized landmarks as they are. The same pose at another hand roll or
+#              with the other hand is a different point, so it needs its own samples
+#              (augment.py generates rotated copies for that).
+#   invariant  the pose expressed in the palm's own frame, mirrored to one chirality, plus
+#              finger joint angles and fingertip distances. Hand roll, tilt and handedness
+#              no longer move the point, so a few samples per gesture cover what dozens of
+#              rotated copies did. The conversion costs about 100 us per query, mostly the
+#              fixed overhead of ~30 small array operations; the hands of a frame are
+#              converted in one call, so a second hand adds little. That is more than a
+#              smaller training set saves in the neighbour search, so queries are slower than
+#              with landmarks. `python bench_features.py` compares the two.
+
+FEATURE_SETS = ("landmarks", "invariant")
+DEFAULT_FEATURE_SET = "landmarks"
+
+# MediaPipe hand topology.
+WRIST = 0
+INDEX_MCP = 5
+MIDDLE_MCP = 9
+PINKY_MCP = 17
+FINGER_CHAINS = np.array(
+    [
+        [0, 1, 2, 3, 4],
+        [0, 5, 6, 7, 8],
+        [0, 9, 10, 11, 12],
+        [0, 13, 14, 15, 16],
+        [0, 17, 18, 19, 20],
+    ]
+)
+FINGERTIPS = np.array([4, 8, 12, 16, 20])
+_TIP_PAIRS = np.triu_indices(len(FINGERTIPS), k=1)
+
+# Joint angles are in radians, several times the range of a coordinate; this keeps the 15
+# angles from outweighing the 60 coordinates in the neighbour distance.
+ANGLE_WEIGHT = 0.25
+INVARIANT_DIM = 20 * 3 + FINGER_CHAINS.shape[0] * 3 + len(_TIP_PAIRS[0])
+
+
+def feature_set_name(value):
+    # Validated feature set name; unknown values fall back to the default.
+    value = str(value or "").strip().lower()
+    return value if value in FEATURE_SETS else DEFAULT_FEATURE_SET
+
+
+def is_hand_invariant(feature_set):
+    # True when a left and a right hand in the same pose give the same features.
+    return feature_set == "invariant"
+
+
+def extract_features(samples, feature_set):
+    # (n, 63) normalized landmarks -> (n, d) float32 features.
+    X = np.asarray(samples, dtype=np.float32).reshape(len(samples), -1)
+    if feature_set == "landmarks":
+        return X
+    if feature_set == "invariant":
+        return invariant_features(X)
+    raise ValueError(f"Unknown feature set: {feature_set}")
+
+
+def _unit(vectors):
+    norms = np.sqrt(np.einsum("...i,...i->...", vectors, vectors))[..., None]
+    return vectors / np.maximum(norms, 1e-6)
+
+
+def invariant_features(X):
+    # Written for one or two hands per call as much as for a training set: a handful of
+    # array operations over all samples, with no per-sample Python.
+    points = X.reshape(-1, 21, 3)
+    points = points - points[:, WRIST : WRIST + 1]
+    n = len(points)
+
+    # Palm frame: x from the wrist to the middle finger's base, y across the knuckles towards
+    # the index finger, z out of the palm.
+    frame = np.empty((n, 3, 3), dtype=np.float32)
+    axis_x = frame[:, 0] = _unit(points[:, MIDDLE_MCP])
+    across = points[:, INDEX_MCP] - points[:, PINKY_MCP]
+    axis_y = frame[:, 1] = _unit(across - np.einsum("ni,ni->n", across, axis_x)[:, None] * axis_x)
+    frame[:, 2, 0] = axis_x[:, 1] * axis_y[:, 2] - axis_x[:, 2] * axis_y[:, 1]
+    frame[:, 2, 1] = axis_x[:, 2] * axis_y[:, 0] - axis_x[:, 0] * axis_y[:, 2]
+    frame[:, 2, 2] = axis_x[:, 0] * axis_y[:, 1] - axis_x[:, 1] * axis_y[:, 0]
+    local = points @ frame.transpose(0, 2, 1)
+
+    # A left hand is the mirror image of a right one, so in the palm frame the two only differ
+    # by the sign of z. Fingers and thumb bend towards the palm, so flipping z to make that
+    # side positive mirrors either hand onto the same chirality. A flat hand has z near zero,
+    # where the choice does not matter.
+    local[:, :, 2] *= np.where(local[:, :, 2].sum(axis=1) < 0.0, -1.0, 1.0)[:, None]
+
+    # Angles between consecutive bones of each finger, three per finger.
+    bones = _unit(points[:, FINGER_CHAINS[:, 1:]] - points[:, FINGER_CHAINS[:, :-1]])
+    cosines = np.einsum("nfbi,nfbi->nfb", bones[:, :, :-1], bones[:, :, 1:])
+    angles = np.arccos(np.clip(cosines, -1.0, 1.0))
+
+    tips = points[:, FINGERTIPS]
+    tip_offsets = tips[:, _TIP_PAIRS[0]] - tips[:, _TIP_PAIRS[1]]
+
+    out = np.empty((n, INVARIANT_DIM), dtype=np.float32)
+    out[:, :60] = local[:, 1:].reshape(n, 60)
+    out[:, 60:75] = ANGLE_WEIGHT * angles.reshape(n, 15)
+    out[:, 75:] = np.sqrt(np.einsum("npi,npi->np", tip_offsets, tip_offsets))
+    return out
@@ -0,0 +1,121 @@
+import math
+
+import numpy as np
+
+# Landmark filtering before classification. MediaPipe landmarks jitter by a few thousandths
+# of the frame from one frame to the next even when the hand is still, which is enough to
+# flip a nearest-neighbour prediction between two close classes and reset the smoothing
+# streak. A One Euro filter (Casiez et al., CHI 2012) is a low-pass filter whose cutoff rises
+# with speed: a still hand is smoothed hard, a moving one is followed with little lag.
+#
+# Every landmark coordinate has its own filter state and its own adaptive cutoff, but all 63
+# are updated together with array operations on the raw (21, 3) points, before
+# normalize_landmarks. Points are in normalized image coordinates, so speeds are in frame
+# widths per second.
+#
+# Settings come from the `landmark_filter` entry of config/runtime.json.
+
+DEFAULT_FILTER_SETTINGS = {
+    "enabled": True,
+    # Cutoff (Hz) for a still hand. Lower smooths more.
+    "min_cutoff": 1.0,
+    # How fast the cutoff rises with speed. Higher follows fast movement with less lag.
+    "beta": 20.0,
+    # Cutoff (Hz) for the speed estimate itself.
+    "d_cutoff": 1.0,
+}
+# Frame interval assumed when two frames carry the same timestamp.
+FALLBACK_DT = 1.0 / 30.0
+
+
+def filter_settings(payload):
+    # Validated copy of a `landmark_filter` settings dict; missing or invalid values use the defaults.
+    payload = payload if isinstance(payload, dict) else {}
+    settings = dict(DEFAULT_FILTER_SETTINGS)
+    settings["enabled"] = bool(payload.get("enabled", settings["enabled"]))
+    for key, low, high in (("min_cutoff", 0.01, 30.0), ("beta", 0.0, 1000.0), ("d_cutoff", 0.01, 30.0)):
+        try:
+            settings[key] = max(low, min(high, float(payload.get(key, settings[key]))))
+        except (TypeError, ValueError):
+            pass
+    return settings
+
+
+def _alpha(cutoff, dt):
+    # Smoothing factor of an exponential filter with this cutoff frequency; `cutoff` may be an array.
+    tau = 1.0 / (2.0 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    def __init__(self, min_cutoff=1.0, beta=20.0, d_cutoff=1.0):
+        self.min_cutoff = float(min_cutoff)
+        self.beta = float(beta)
+        self.d_cutoff = float(d_cutoff)
+        self.reset()
+
+    def reset(self):
+        self._value = None
+        self._speed = None
+        self._time = 0.0
+
+    def __call__(self, points, timestamp):
+        # `points` is any float array (one hand's (21, 3) landmarks here), `timestamp` in
+        # seconds. Returns the filtered array; the filter keeps its own copy.
+        points = np.asarray(points, dtype=np.float32)
+        if self._value is None or self._value.shape != points.shape:
+            self._value = points.copy()
+            self._speed = np.zeros_like(points)
+            self._time = timestamp
+            return self._value.copy()
+
+        dt = timestamp - self._time
+        if dt <= 0.0:
+            dt = FALLBACK_DT
+        self._time = timestamp
+
+        speed = (points - self._value) / dt
+        self._speed += _alpha(self.d_cutoff, dt) * (speed - self._speed)
+        cutoff = self.min_cutoff + self.beta * np.abs(self._speed)
+        self._value += _alpha(cutoff, dt) * (points - self._value)
+        return self._value.copy()
+
+
+class HandLandmarkFilter:
+    # One OneEuroFilter per hand side ("left", "right", or "" when unknown). A side that is
+    # not seen in a frame starts over when it comes back, so a hand entering the frame is
+    # not blended with where the last one left.
+    def __init__(self, min_cutoff=1.0, beta=20.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self._filters = {}
+
+    def reset(self):
+        self._filters.clear()
+
+    def filter_hands(self, sides_points, timestamp):
+        # `sides_points` is a list of (side, (21, 3) points). Returns the filtered points in
+        # the same order.
+        # Two hands reported with the same side get separate filters, in detection order.
+        keys = []
+        for side, _ in sides_points:
+            keys.append((side, sum(1 for key in keys if key[0] == side)))
+        for key in list(self._filters):
+            if key not in keys:
+                del self._filters[key]
+        filtered = []
+        for key, (_, points) in zip(keys, sides_points):
+            one_euro = self._filters.get(key)
+            if one_euro is None:
+                one_euro = self._filters[key] = OneEuroFilter(self.min_cutoff, self.beta, self.d_cutoff)
+            filtered.append(one_euro(points, timestamp))
+        return filtered
+
+
+def build_landmark_filter(settings):
+    # None when filtering is disabled.
+    settings = filter_settings(settings)
+    if not settings["enabled"]:
+        return None
+    return HandLandmarkFilter(settings["min_cutoff"], settings["beta"], settings["d_cutoff"])
@@ -0,0 +1,35 @@
+# The configuration the frame loop reads, as one immutable snapshot: the compiled gesture
+# table (registry, action map, thresholds, rejection limits), the classifier and motion
+# matcher, whether monitoring is on, and the smoothing and landmark filter settings.
+#
+# Handlers never modify a snapshot. They change ServerState, build a new snapshot from it and
+# publish it with one reference assignment (publish_frame_config() in main.py). The frame loop
+# reads that reference once per frame and uses the same snapshot for the whole frame, so a
+# frame never mixes two configurations, and neither side takes a lock: reading or assigning
+# one reference is atomic, also across threads. Models follow the same rule: training and
+# loading build a new model object and publish it instead of refitting the shared one, and a
+# gesture table is always published with the model it was compiled from.
+#
+# Per-source state built from the settings (smoother, landmark filter, adaptive thresholds)
+# is rebuilt by the frame loop when it sees a snapshot whose settings object differs from the
+# one that state was built from. Unchanged settings keep their object across publishes, so
+# that check is an identity comparison.
+
+
+class FrameConfig:
+    __slots__ = ("version", "table", "model", "motion_model", "control_active", "smoothing", "landmark_filter")
+
+    def __init__(self, version, table, model, motion_model, control_active, smoothing, landmark_filter):
+        # `smoothing` holds build_smoother()'s arguments and `landmark_filter` the filter
+        # settings (see filters.py); both are read-only once published.
+        for name, value in zip(
+            self.__slots__, (version, table, model, motion_model, control_active, smoothing, landmark_filter)
+        ):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FrameConfig is immutable; publish a new one instead")
+
+    @property
+    def required_frames(self):
+        return self.smoothing["required_frames"]
@@ -0,0 +1,338 @@
+import base64
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from capture import LatestFrameCapture
+
+# Optional multi-process pipeline for a video source (runtime setting `inference_workers`).
+#
+# In the default mode a source's hand detection, drawing and JPEG encoding share one
+# process with the API server, so a busy server and several sources compete for the GIL.
+# Here instead:
+#   - a capture process decodes frames straight into a shared-memory ring (FrameRing),
+#   - N worker processes each claim the newest frame, run hand detection and JPEG encoding on
+#     the shared buffer in place, and send back only the result: the encoded image and, per
+#     hand, its handedness, normalized landmarks and raw points,
+#   - the API process classifies the hands as usual; the model, smoothing and recording state
+#     stay in one place.
+#
+# Frames never go through a pipe. A worker marks the slot it claimed as busy until it is done
+# reading it, and the capture process never decodes into a busy slot or the one holding the
+# newest frame, so workers + 2 slots always leave one free to write. Each slot also carries
+# the sequence number of its frame, checked again after detection as a safety net.
+
+RING_SPARE_SLOTS = 2
+START_TIMEOUT = 60.0
+
+
+class FrameRing:
+    # Per slot: int64 sequence number (0 while being written), float64 capture time, int64
+    # busy flag (set while a worker reads the slot), and the frame itself.
+    def __init__(self, shm, slots, shape):
+        self.shm = shm
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.seqs = np.ndarray((slots,), dtype=np.int64, buffer=shm.buf, offset=0)
+        self.times = np.ndarray((slots,), dtype=np.float64, buffer=shm.buf, offset=slots * 8)
+        self.busy = np.ndarray((slots,), dtype=np.int64, buffer=shm.buf, offset=slots * 16)
+        self.frames = np.ndarray((slots, *self.shape), dtype=np.uint8, buffer=shm.buf, offset=slots * 24)
+
+    @classmethod
+    def create(cls, slots, shape):
+        size = slots * 24 + slots * int(np.prod(shape))
+        ring = cls(shared_memory.SharedMemory(create=True, size=size), slots, shape)
+        ring.seqs[:] = 0
+        ring.busy[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name, slots, shape):
+        return cls(shared_memory.SharedMemory(name=name), slots, shape)
+
+    def close(self):
+        # The numpy views must go before the mapping can be closed.
+        del self.seqs, self.times, self.busy, self.frames
+        self.shm.close()
+
+
+class RingCapture(LatestFrameCapture):
+    # LatestFrameCapture that decodes into a free ring slot and announces it through `latest`
+    # and `latest_slot` (shared values guarded by the shared condition `ready`).
+    def __init__(self, uri, settings, loop_video, slots, ready, latest, latest_slot):
+        super().__init__(uri, settings, loop_video)
+        self.slots = slots
+        self.ring = None
+        self._ready = ready
+        self._latest = latest
+        self._latest_slot = latest_slot
+        self._write_seq = 0
+        self._write_slot = 0
+
+    def open(self):
+        self._open_device()
+        # The ring is sized from the first frame; drivers do not always report their size.
+        ret, frame = self._cap.read()
+        if not ret:
+            self._cap.release()
+            raise RuntimeError(f"No frames from source {self.uri!r}")
+        self.ring = FrameRing.create(self.slots, frame.shape)
+        self.ring.frames[0] = frame
+        self._store(frame, time.perf_counter())
+        self._start()
+
+    def _free_slot(self):
+        # Workers only ever claim the newest frame's slot, which is skipped here, so a slot
+        # found free cannot be claimed while it is being written.
+        latest = self._latest_slot.value
+        for step in range(1, self.slots + 1):
+            slot = (latest + step) % self.slots
+            if slot != latest and not self.ring.busy[slot]:
+                return slot
+        return (latest + 1) % self.slots
+
+    def _decode(self, cap):
+        slot = self._free_slot()
+        self.ring.seqs[slot] = 0
+        target = self.ring.frames[slot]
+        ret, frame = cap.read(target)
+        if not ret:
+            return ret, frame
+        self._write_slot = slot
+        if not np.shares_memory(frame, target):
+            if frame.shape != target.shape:
+                raise RuntimeError(f"Frame size changed from {target.shape} to {frame.shape}")
+            target[...] = frame
+        return ret, target
+
+    def _store(self, frame, captured_at):
+        self._write_seq += 1
+        slot = self._write_slot
+        self.ring.times[slot] = captured_at
+        self.ring.seqs[slot] = self._write_seq
+        with self._ready:
+            self._latest.value = self._write_seq
+            self._latest_slot.value = slot
+            self._ready.notify_all()
+
+
+def _capture_main(uri, settings, loop_video, slots, status, ready, latest, latest_slot, stop, idle):
+    capture = RingCapture(uri, settings, loop_video, slots, ready, latest, latest_slot)
+    try:
+        capture.open()
+    except Exception as e:
+        status.put(("error", str(e)))
+        return
+    ring = capture.ring
+    try:
+        status.put(("ready", ring.shm.name, ring.shape, capture.actual))
+        while not stop.wait(0.02):
+            capture.idle = idle.is_set()
+            if capture.ended:
+                break
+        status.put(("ended", capture.error))
+    finally:
+        capture.close()
+        with ready:
+            ready.notify_all()
+        shm = ring.shm
+        ring.close()
+        shm.unlink()
+
+
+def _worker_main(ring_name, slots, shape, tracker_options, ready, latest, latest_slot, claimed, results, options, stop):
+    import cv2
+
+    from engine import HandTracker
+    from motion import landmark_points
+
+    ring = FrameRing.attach(ring_name, slots, shape)
+    tracker = HandTracker(**tracker_options)
+    try:
+        while not stop.is_set():
+            try:
+                kind, values = options.get_nowait()
+            except queue.Empty:
+                pass
+            else:
+                if kind == "tracker":
+                    tracker = HandTracker(**values)
+                else:
+                    tracker.configure(**values)
+
+            with ready:
+                if not ready.wait_for(lambda: latest.value > claimed.value or stop.is_set(), timeout=0.5):
+                    continue
+                if stop.is_set():
+                    break
+                seq = claimed.value = latest.value
+                slot = latest_slot.value
+                ring.busy[slot] = 1
+
+            try:
+                captured_at = float(ring.times[slot])
+                started_at = time.perf_counter()
+                frame_age_ms = round((started_at - captured_at) * 1000.0, 2)
+                frame, hands = tracker.detect_hands(ring.frames[slot])
+                intact = ring.seqs[slot] == seq
+            finally:
+                ring.busy[slot] = 0
+            if not intact:
+                continue
+            _, buffer = cv2.imencode(".jpg", frame)
+            results.put(
+                (
+                    seq,
+                    captured_at,
+                    frame_age_ms,
+                    (time.perf_counter() - started_at) * 1000.0,
+                    base64.b64encode(buffer).decode("utf-8"),
+                    [(hand.handedness, hand.landmarks, landmark_points(hand.hand_landmarks)) for hand in hands],
+                )
+            )
+    finally:
+        ring.close()
+
+
+class ProcessPipeline:
+    # API-process side: starts the capture process, then the workers once the ring exists.
+    def __init__(self, uri, settings, loop_video, workers, tracker_options):
+        self.uri = uri
+        self.settings = settings
+        self.loop_video = loop_video
+        self.workers = max(1, int(workers))
+        self.tracker_options = tracker_options
+        self.actual = {}
+
+        # "spawn" so the processes do not inherit the server's threads and MediaPipe graphs.
+        ctx = multiprocessing.get_context("spawn")
+        self._ctx = ctx
+        self._stop = ctx.Event()
+        self._idle = ctx.Event()
+        self._ready = ctx.Condition()
+        self._latest = ctx.Value("q", 0, lock=False)
+        self._latest_slot = ctx.Value("q", 0, lock=False)
+        self._claimed = ctx.Value("q", 0, lock=False)
+        self._status = ctx.Queue()
+        self._results = ctx.Queue()
+        self._options = []
+        self._capture = None
+        self._processes = []
+        self._ring_name = None
+
+    def start(self, timeout=START_TIMEOUT):
+        slots = self.workers + RING_SPARE_SLOTS
+        self._capture = self._ctx.Process(
+            target=_capture_main,
+            args=(
+                self.uri,
+                self.settings,
+                self.loop_video,
+                slots,
+                self._status,
+                self._ready,
+                self._latest,
+                self._latest_slot,
+                self._stop,
+                self._idle,
+            ),
+            daemon=True,
+        )
+        self._capture.start()
+        deadline = time.perf_counter() + timeout
+        message = None
+        while message is None:
+            try:
+                message = self._status.get(timeout=0.5)
+            except queue.Empty:
+                if not self._capture.is_alive():
+                    raise RuntimeError(f"Capture process for {self.uri!r} exited with code {self._capture.exitcode}")
+                if time.perf_counter() > deadline:
+                    raise RuntimeError(f"Capture process for {self.uri!r} did not start")
+        if message[0] == "error":
+            raise RuntimeError(message[1])
+        _, self._ring_name, shape, self.actual = message
+
+        for _ in range(self.workers):
+            options = self._ctx.Queue()
+            process = self._ctx.Process(
+                target=_worker_main,
+                args=(
+                    self._ring_name,
+                    slots,
+                    shape,
+                    self.tracker_options,
+                    self._ready,
+                    self._latest,
+                    self._latest_slot,
+                    self._claimed,
+                    self._results,
+                    options,
+                    self._stop,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self._options.append(options)
+            self._processes.append(process)
+
+    @property
+    def running(self):
+        return self._capture is not None and self._capture.is_alive()
+
+    def set_idle(self, idle):
+        if idle:
+            self._idle.set()
+        else:
+            self._idle.clear()
+
+    def set_tracker_options(self, tracker_options):
+        # Workers build a new tracker with these HandTracker arguments.
+        self.tracker_options = tracker_options
+        for options in self._options:
+            options.put(("tracker", tracker_options))
+
+    def set_quality(self, settings):
+        # Workers reconfigure their tracker (see HandTracker.configure).
+        for options in self._options:
+            options.put(("quality", settings))
+
+    def take_error(self):
+        # Why the capture process ended ("" when it was stopped or a file finished).
+        try:
+            message = self._status.get(timeout=0.5)
+        except queue.Empty:
+            return ""
+        return message[1] if message[0] == "ended" else ""
+
+    def get(self, timeout=0.5):
+        # (seq, captured_at, frame_age_ms, frame_ms, jpeg_base64, [(handedness, landmarks, points)]),
+        # or None on timeout. frame_ms is the worker's detection and encoding time.
+        try:
+            return self._results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._stop.set()
+        with self._ready:
+            self._ready.notify_all()
+        # Workers cannot exit while results they queued are unread.
+        deadline = time.perf_counter() + 3.0
+        processes = [p for p in [self._capture, *self._processes] if p is not None]
+        while any(p.is_alive() for p in processes) and time.perf_counter() < deadline:
+            while self.get(timeout=0.05) is not None:
+                pass
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout=1.0)
+        if self._capture is not None and self._capture.exitcode != 0 and self._ring_name:
+            # The capture process owns the ring; unlink it if it could not.
+            try:
+                shared_memory.SharedMemory(name=self._ring_name).unlink()
+            except FileNotFoundError:
+                pass
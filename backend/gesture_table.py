@@ -0,0 +1,75 @@
+import numpy as np
+
+from smoothing import NO_GESTURE
+
+# Runtime view of the gesture registry, compiled against the classifier's class order. Every
+# per-frame lookup (threshold, action, emoji, rejection radius, which gesture a per-hand class
+# belongs to) is an integer index into these arrays instead of lowercasing a label and looking
+# it up in several dicts.
+#
+# Gesture ids index `labels`, `actions`, `emojis` and `thresholds`. The last slot of each is
+# "none", so NO_GESTURE (-1) indexes it directly and needs no special case.
+#
+# A table is never modified after it is built: a registry, model or config change compiles a
+# new one and swaps the reference, so a frame always sees one consistent table.
+
+SIDE_NONE = 0
+SIDE_LEFT = 1
+SIDE_RIGHT = 2
+SIDES = {"left": SIDE_LEFT, "right": SIDE_RIGHT}
+
+
+class GestureTable:
+    def __init__(
+        self,
+        gestures,
+        classes,
+        default_threshold,
+        rejection_distance=0.0,
+        rejection_radii=None,
+        background_label=None,
+        hand_invariant=False,
+    ):
+        # `gestures` is a list of (label, action, emoji, threshold, kind) for active gestures;
+        # `classes` is the classifier's output order.
+        self.labels = [g[0] for g in gestures] + ["none"]
+        self.actions = [g[1] for g in gestures] + [""]
+        self.emojis = [g[2] for g in gestures] + [""]
+        self.kinds = [g[4] for g in gestures] + [""]
+        self.thresholds = np.array([g[3] for g in gestures] + [default_threshold], dtype=np.float64)
+        self.ids = {label: idx for idx, label in enumerate(self.labels[:-1])}
+
+        self.classes = list(classes)
+        self.class_labels = [str(c).lower() for c in self.classes]
+        self.class_gesture = np.full(len(self.classes), NO_GESTURE, dtype=np.int32)
+        self.class_side = np.zeros(len(self.classes), dtype=np.int8)
+        self.class_background = np.zeros(len(self.classes), dtype=bool)
+        # Rejection distance per class: the calibrated radius capped by the global distance.
+        # 0 disables rejection for that class.
+        self.rejection_limits = np.full(len(self.classes), float(rejection_distance), dtype=np.float64)
+        rejection_radii = rejection_radii or {}
+
+        for code, label in enumerate(self.class_labels):
+            if label == background_label:
+                self.class_background[code] = True
+                continue
+            base, sep, side = label.rpartition(":")
+            if sep and side in SIDES:
+                self.class_side[code] = SIDES[side]
+            else:
+                base = label
+            self.class_gesture[code] = self.ids.get(base, NO_GESTURE)
+            radius = rejection_radii.get(label)
+            if radius is not None and rejection_distance > 0:
+                self.rejection_limits[code] = min(float(rejection_distance), float(radius))
+
+        # A model on hand-invariant features cannot tell the left half of a two-hand gesture
+        # from the right one; the hand's own side is used instead (see features.py).
+        self.hand_invariant = bool(hand_invariant)
+
+        # Distance rejection only makes sense when there is something to confuse a pose with.
+        self.reject_unknown = len(self.classes) > 1
+
+    def new_dynamic_thresholds(self):
+        # Per-source adaptive thresholds start at each gesture's configured threshold.
+        return self.thresholds.copy()
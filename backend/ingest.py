@@ -0,0 +1,194 @@
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import augment
+from engine import HandTracker
+
+# Bulk import of training samples from a video file or a directory of images:
+#
+#   python ingest.py clips/thumbs_up.mp4 --label thumbs_up --action PLAY_PAUSE --stride 2
+#   python ingest.py photos/lock/ --label lock --action LOCK_SCREEN
+#
+# Frames are decoded inside the worker processes (each opens the video at its own frame range,
+# or reads its own image files), so only small landmark lists cross process boundaries.
+
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v"}
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+IMAGE_BATCH_SIZE = 32
+
+_worker_tracker = None
+
+
+def _init_worker(static_image_mode):
+    global _worker_tracker
+    _worker_tracker = HandTracker(max_hands=1, static_image_mode=static_image_mode, draw_landmarks=False)
+
+
+def _stack(samples):
+    # One (n, 63) float32 array per task pickles far smaller than n separate arrays or lists.
+    return np.asarray(samples, dtype=np.float32).reshape(len(samples), 21 * 3)
+
+
+def _video_chunk_landmarks(task):
+    import cv2
+
+    path, start, stop, stride = task
+    cap = cv2.VideoCapture(path)
+    frames = 0
+    samples = []
+    try:
+        if start:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        index = start
+        while stop is None or index < stop:
+            if (index - start) % stride:
+                # Skipped frames are only grabbed, never converted.
+                if not cap.grab():
+                    break
+            else:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                frames += 1
+                _, landmarks, _ = _worker_tracker.process_frame(frame)
+                if landmarks is not None:
+                    samples.append(landmarks)
+            index += 1
+    finally:
+        cap.release()
+    return frames, _stack(samples)
+
+
+def _image_batch_landmarks(paths):
+    import cv2
+
+    frames = 0
+    samples = []
+    for path in paths:
+        frame = cv2.imread(path)
+        if frame is None:
+            continue
+        frames += 1
+        _, landmarks, _ = _worker_tracker.process_frame(frame)
+        if landmarks is not None:
+            samples.append(landmarks)
+    return frames, _stack(samples)
+
+
+def _video_tasks(path, stride, workers):
+    import cv2
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {path}")
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    if total <= 0:
+        # Unknown length (some containers): one sequential pass.
+        return [(path, 0, None, stride)]
+    # Contiguous chunks keep MediaPipe's tracking useful inside each chunk; a few chunks per
+    # worker keep the pool busy when some chunks have more hands than others.
+    chunks = max(1, min(workers * 3, total // max(stride, 30)))
+    bounds = np.linspace(0, total, chunks + 1).astype(int)
+    # Chunk starts are aligned to the stride so the sampled frames match a single pass.
+    starts = [int(b - (b % stride)) for b in bounds[:-1]]
+    return [(path, s, int(e), stride) for s, e in zip(starts, list(starts[1:]) + [total]) if e > s]
+
+
+def _image_tasks(directory, stride):
+    files = sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+    )[::stride]
+    if not files:
+        raise ValueError(f"No images found in {directory}")
+    return [files[idx : idx + IMAGE_BATCH_SIZE] for idx in range(0, len(files), IMAGE_BATCH_SIZE)]
+
+
+def extract_landmarks(path, stride=1, workers=None):
+    path = str(path)
+    stride = max(1, int(stride))
+    workers = max(1, int(workers or os.cpu_count() or 1))
+    is_images = os.path.isdir(path)
+    if is_images:
+        tasks = _image_tasks(path, stride)
+        fn = _image_batch_landmarks
+    elif os.path.splitext(path)[1].lower() in VIDEO_EXTENSIONS:
+        tasks = _video_tasks(path, stride, workers)
+        fn = _video_chunk_landmarks
+    else:
+        raise ValueError(f"Expected a video file or an image directory: {path}")
+
+    start = time.perf_counter()
+    frames = 0
+    samples = []
+    # "spawn" so workers do not inherit the server's capture threads and MediaPipe graphs.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(tasks)),
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(is_images,),
+    ) as pool:
+        # map() keeps task order, so samples come back in frame order.
+        for task_frames, task_samples in pool.map(fn, tasks):
+            frames += task_frames
+            samples.extend(task_samples)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "samples": samples,
+        "frames": frames,
+        "hands": len(samples),
+        "seconds": round(elapsed, 3),
+        "fps": round(frames / elapsed, 1) if elapsed > 0 else 0.0,
+        "workers": min(workers, len(tasks)),
+    }
+
+
+def dedupe_samples(samples, existing=None, min_distance=0.014):
+    # Same novelty rule as live recording: a sample is kept only if it is at least
+    # `min_distance` away from every sample kept so far (and from `existing`).
+    if not samples:
+        return []
+    keep = augment.dedupe_mask(samples, min_distance, reference=existing)
+    return [sample for sample, kept in zip(samples, keep) if kept]
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Import training samples from a video or image directory.")
+    parser.add_argument("path", help="Video file or directory of images")
+    parser.add_argument("--label", required=True)
+    parser.add_argument("--action", required=True)
+    parser.add_argument("--emoji", default="")
+    parser.add_argument("--stride", type=int, default=1, help="Use every Nth frame or image")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    import main
+
+    main.load_runtime_config()
+    main.load_registry()
+    main.load_training_dataset()
+    main.load_motion_templates()
+    main.load_model()
+
+    result = main.import_gesture_source(
+        args.path, args.label, args.action, args.emoji, stride=args.stride, workers=args.workers
+    )
+    print(result["message"])
+    if "fps" in result:
+        print(
+            f"frames={result['frames']} hands={result['hands']} kept={result['count']} "
+            f"workers={result['workers']} {result['fps']:.1f} frames/s"
+        )
+
+
+if __name__ == "__main__":
+    run()
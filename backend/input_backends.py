@@ -0,0 +1,189 @@
+import sys
+from abc import ABC, abstractmethod
+from collections import deque
+
+# Key injection backends for controller.py. Keys use pyautogui's names ("volumeup", "ctrl",
+# "=", ...) so the action code is the same for every backend.
+#
+# pyautogui sleeps `pyautogui.PAUSE` (0.1 s) after every call and looks up the platform
+# layer each time, which blocks the frame loop for every fired gesture. On Linux the
+# backends below keep one connection open for the life of the process instead:
+#   uinput: a virtual keyboard through /dev/uinput (python-evdev). Works on X11 and Wayland,
+#           needs write access to /dev/uinput.
+#   xtest:  the X server's XTEST extension (python-xlib, already installed with pyautogui).
+# pyautogui stays as the fallback everywhere, and "null" only records calls, for tests and
+# dry runs.
+
+BACKEND_NAMES = ("auto", "uinput", "xtest", "pyautogui", "null")
+AUTO_ORDER = ("uinput", "xtest", "pyautogui") if sys.platform.startswith("linux") else ("pyautogui",)
+
+UINPUT_KEYS = {
+    "volumeup": "KEY_VOLUMEUP",
+    "volumedown": "KEY_VOLUMEDOWN",
+    "volumemute": "KEY_MUTE",
+    "playpause": "KEY_PLAYPAUSE",
+    "right": "KEY_RIGHT",
+    "left": "KEY_LEFT",
+    "ctrl": "KEY_LEFTCTRL",
+    "shift": "KEY_LEFTSHIFT",
+    "alt": "KEY_LEFTALT",
+    "win": "KEY_LEFTMETA",
+    "command": "KEY_LEFTMETA",
+    "=": "KEY_EQUAL",
+    "-": "KEY_MINUS",
+    "l": "KEY_L",
+    "q": "KEY_Q",
+}
+
+XTEST_KEYSYMS = {
+    "volumeup": "XF86AudioRaiseVolume",
+    "volumedown": "XF86AudioLowerVolume",
+    "volumemute": "XF86AudioMute",
+    "playpause": "XF86AudioPlay",
+    "right": "Right",
+    "left": "Left",
+    "ctrl": "Control_L",
+    "shift": "Shift_L",
+    "alt": "Alt_L",
+    "win": "Super_L",
+    "command": "Super_L",
+    "=": "equal",
+    "-": "minus",
+}
+
+
+class InputBackend(ABC):
+    name = ""
+
+    def press(self, key):
+        self.hotkey(key)
+
+    @abstractmethod
+    def hotkey(self, *keys):
+        pass
+
+    def close(self):
+        pass
+
+
+class NullBackend(InputBackend):
+    name = "null"
+
+    def __init__(self):
+        self.calls = deque(maxlen=100)
+
+    def hotkey(self, *keys):
+        self.calls.append(keys)
+
+
+class PyAutoGUIBackend(InputBackend):
+    name = "pyautogui"
+
+    def __init__(self):
+        # pyautogui is slow to import and needs a display, so it is only loaded when selected.
+        import pyautogui
+
+        pyautogui.FAILSAFE = True
+        # The default 0.1 s pause after each call is there for scripted mouse sequences; one
+        # key chord per gesture does not need it.
+        pyautogui.PAUSE = 0
+        self._gui = pyautogui
+
+    def press(self, key):
+        self._gui.press(key)
+
+    def hotkey(self, *keys):
+        self._gui.hotkey(*keys)
+
+
+class UInputBackend(InputBackend):
+    name = "uinput"
+
+    def __init__(self):
+        from evdev import UInput, ecodes
+
+        self._ecodes = ecodes
+        self._codes = {key: getattr(ecodes, code) for key, code in UINPUT_KEYS.items()}
+        # Every key the device may send has to be declared when it is created.
+        self._device = UInput({ecodes.EV_KEY: sorted(set(self._codes.values()))}, name="gesture-control")
+
+    def hotkey(self, *keys):
+        try:
+            codes = [self._codes[key] for key in keys]
+        except KeyError as e:
+            raise ValueError(f"Unsupported key for uinput: {e.args[0]}")
+        for code in codes:
+            self._device.write(self._ecodes.EV_KEY, code, 1)
+        for code in reversed(codes):
+            self._device.write(self._ecodes.EV_KEY, code, 0)
+        self._device.syn()
+
+    def close(self):
+        self._device.close()
+
+
+class XTestBackend(InputBackend):
+    name = "xtest"
+
+    def __init__(self):
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+
+        XK.load_keysym_group("xf86")
+        self._X = X
+        self._XK = XK
+        self._xtest = xtest
+        self._display = display.Display()
+        if not self._display.has_extension("XTEST"):
+            self._display.close()
+            raise RuntimeError("X server has no XTEST extension")
+        self._keycodes = {}
+
+    def _keycode(self, key):
+        code = self._keycodes.get(key)
+        if code is None:
+            keysym = self._XK.string_to_keysym(XTEST_KEYSYMS.get(key, key))
+            code = self._display.keysym_to_keycode(keysym) if keysym else 0
+            if not code:
+                raise ValueError(f"No X keycode for key: {key}")
+            self._keycodes[key] = code
+        return code
+
+    def hotkey(self, *keys):
+        codes = [self._keycode(key) for key in keys]
+        for code in codes:
+            self._xtest.fake_input(self._display, self._X.KeyPress, code)
+        for code in reversed(codes):
+            self._xtest.fake_input(self._display, self._X.KeyRelease, code)
+        # Flush without waiting for a round trip; the key events are already ordered.
+        self._display.flush()
+
+    def close(self):
+        self._display.close()
+
+
+BACKENDS = {
+    "uinput": UInputBackend,
+    "xtest": XTestBackend,
+    "pyautogui": PyAutoGUIBackend,
+    "null": NullBackend,
+}
+
+
+def open_backend(name):
+    # "auto" tries the low-latency backends first and falls back to pyautogui. A backend
+    # that was asked for by name is not replaced silently: its error is raised.
+    name = str(name or "auto").strip().lower()
+    if name not in BACKEND_NAMES:
+        raise ValueError(f"Unknown input backend: {name}")
+    if name != "auto":
+        return BACKENDS[name]()
+
+    errors = []
+    for candidate in AUTO_ORDER:
+        try:
+            return BACKENDS[candidate]()
+        except Exception as e:
+            print(f">>> Input backend '{candidate}' unavailable: {e}")
+            errors.append(f"{candidate}: {e}")
+    raise RuntimeError("No input backend available (" + "; ".join(errors) + ")")
@@ -1,19 +1,57 @@
+import time
+
+_IMPORT_STARTED_AT = time.perf_counter()
+
 import asyncio
 import base64
-import hashlib
 import json
+import shutil
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional, Set
+from typing import Dict, Optional
 
-import cv2
 import numpy as np
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 
+import augment
 import controller
-from engine import GestureModel, HandTracker
+import dataset_health
+from dataset import TrainingDataset
+from events import EventBus
+from frame_config import FrameConfig
+from features import FEATURE_SETS, feature_set_name, is_hand_invariant
+from filters import build_landmark_filter, filter_settings
+import ingest
+from input_backends import BACKEND_NAMES
+from capture import capture_settings
+from engine import BACKGROUND_LABEL, GestureModel, HandTracker, TrackedHand
+from gesture_table import SIDE_LEFT, SIDE_NONE, SIDE_RIGHT, SIDES, GestureTable
+from quality import DEFAULT_TARGET_MS, QualityController, quality_settings
+from motion import MotionClassifier, MotionSegmenter, landmark_points
+from smoothing import NO_GESTURE, SMOOTHING_MODES, build_smoother
+from sources import (
+    DEFAULT_SOURCE_ID,
+    LANDMARK_SOURCE_ID,
+    InferenceState,
+    LandmarkSource,
+    VideoSource,
+    parse_landmark_packet,
+    parse_source_uri,
+)
+
 
-app = FastAPI(title="JARVIS Gesture Engine")
+@asynccontextmanager
+async def lifespan(_app):
+    global warmup_task
+    state.startup_timings["import"] = round((time.perf_counter() - _IMPORT_STARTED_AT) * 1000.0, 1)
+    _timed_phase("config", _load_config_files)
+    # Heavy work runs in the background so the HTTP API answers (as "warming") right away.
+    warmup_task = asyncio.create_task(warm_up_backend())
+    yield
+
+
+app = FastAPI(title="JARVIS Gesture Engine", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,10 +60,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-MODEL_PATH = Path("models/gesture_model.pkl")
-TRAINING_DATA_PATH = Path("data/training_dataset.json")
+MODEL_PATH = Path("models/gesture_model")
+LEGACY_MODEL_PATH = Path("models/gesture_model.pkl")
+TRAINING_DATA_PATH = Path("data/training_dataset")
+LEGACY_TRAINING_DATA_PATH = Path("data/training_dataset.json")
+MOTION_TEMPLATES_PATH = Path("data/motion_templates.json")
 GESTURE_CONFIG_PATH = Path("config/gestures.json")
 RUNTIME_CONFIG_PATH = Path("config/runtime.json")
+SOURCES_CONFIG_PATH = Path("config/sources.json")
+GESTURE_KINDS = ("static", "motion", "two_hand")
+# Two-hand gestures train one class per hand ("zoom_in:left", "zoom_in:right") in the same
+# per-hand classifier, and fire only when both hands are predicted in the same frame.
+HAND_SIDES = ("left", "right")
+LANDMARK_DIM = 63
+# Minimum landmark distance between two recorded samples of the same gesture.
+RECORDING_NOVELTY_DISTANCE = 0.014
+# Samples per uploaded image when the classifier uses hand-invariant features.
+INVARIANT_UPLOAD_SAMPLES = 8
 
 
 class ServerState:
@@ -35,33 +86,71 @@ class ServerState:
         self.default_threshold = 0.82
         self.required_consecutive_frames = 2
         self.unknown_rejection_distance = 0.85
-        self.dynamic_thresholds = {}
-        self.last_predicted_gesture = "none"
-        self.consecutive_count = 0
-        self.last_effective_threshold = self.default_threshold
-
-        self.training_data = []
-        self.training_labels = []
+        # Use the per-class radii calibrated at training time; the global distance stays the upper bound.
+        self.calibrated_rejection = True
+        self.smoothing_mode = "streak"
+        self.evidence_decay = 0.7
+        self.evidence_threshold = 1.5
+        self.max_hands = 2
+        self.balance_classes = False
+        self.balance_target = 0
+        self.input_backend = "auto"
+        # Seconds a video source keeps its device open after the last client disconnects.
+        self.camera_keep_alive = 10.0
+        # Resolution, FPS, FOURCC and driver buffer size for camera sources (see capture.py).
+        self.camera_settings = capture_settings(None)
+        # Worker processes per video source for detection and encoding; 0 runs them on the
+        # source's own thread (see frame_ring.py).
+        self.inference_workers = 0
+        # Frame time budget for the adaptive tracker quality, and the tracker settings when
+        # they are pinned instead (see quality.py).
+        self.tracker_target_ms = DEFAULT_TARGET_MS
+        self.tracker_pinned = None
+        # One Euro filter on raw landmarks before classification (see filters.py).
+        self.landmark_filter = filter_settings(None)
+        # Feature set the next training fits the classifier on (see features.py).
+        self.feature_set = "landmarks"
+
+        # Recorded samples with categorical labels (see dataset.py).
+        self.dataset = TrainingDataset(LANDMARK_DIM)
         self.gesture_registry = []
 
         self.active_mappings = {}
         self.gesture_emojis = {}
         self.gesture_thresholds = {}
+        self.gesture_kinds = {}
+        # Everything the frame loop reads, published as one snapshot; see publish_frame_config().
+        self.frame_config = None
+        self.motion_segmenter = MotionSegmenter()
         self.recording_active = False
+        self.recording_source = DEFAULT_SOURCE_ID
+        self.recording_kind = "static"
         self.recording_label = ""
         self.recording_action = ""
         self.recording_emoji = ""
         self.recording_target = 0
         self.recording_samples = []
+        # Pose samples of the current session are rows of this buffer's float32 matrix.
+        self.recording_buffer = None
         self.recording_message = ""
 
+        self.backend_status = "warming"
+        self.backend_error = ""
+        self.startup_timings = {}
+
 
 state = ServerState()
-tracker = HandTracker()
+tracker: Optional[HandTracker] = None
 model = GestureModel()
-clients: Set[WebSocket] = set()
-camera_task: Optional[asyncio.Task] = None
-camera_task_lock = asyncio.Lock()
+motion_model = MotionClassifier()
+# Every source has its own capture thread, tracker and InferenceState; `model` is shared.
+sources: Dict[str, VideoSource] = {}
+# Sources fed by /ws/landmarks clients; not persisted, and gone when their last client leaves.
+landmark_sources: Dict[str, LandmarkSource] = {}
+source_task_lock = asyncio.Lock()
+events = EventBus()
+warmup_task: Optional[asyncio.Task] = None
+backend_warm = asyncio.Event()
 
 
 def _ensure_parent(path: Path):
@@ -82,17 +171,54 @@ def _write_json(path: Path, payload):
 
 
 def _current_dataset_signature() -> str:
-    payload = {
-        "samples": state.training_data,
-        "labels": [str(label).strip().lower() for label in state.training_labels],
-    }
-    serialized = json.dumps(payload, separators=(",", ":"), sort_keys=True)
-    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+    return state.dataset.signature()
 
 
 def _train_current_dataset():
-    model.dataset_signature = _current_dataset_signature()
-    return model.train(state.training_data, state.training_labels)
+    global model
+    samples, labels = state.dataset.samples, state.dataset.labels()
+    balance = None
+    if state.balance_classes and len(set(labels)) > 1:
+        # Balancing only shapes what the classifier is fitted on; the stored dataset (and its
+        # signature) stay as recorded. train() applies it after the validation split.
+        def balance(train_samples, train_labels):
+            balanced, balanced_labels, _ = dataset_health.balance_dataset(
+                train_samples,
+                train_labels,
+                target=state.balance_target or None,
+                duplicate_distance=RECORDING_NOVELTY_DISTANCE,
+            )
+            return balanced, balanced_labels
+
+    # Fitted as a new model and then published, so frames keep using the previous model until
+    # this one is complete (see frame_config.py).
+    trained = GestureModel()
+    try:
+        message = trained.train(samples, labels, feature_set=state.feature_set, balance=balance)
+    except Exception as e:
+        events.publish("training", success=False, message=str(e))
+        raise
+    if trained.is_trained:
+        trained.dataset_signature = _current_dataset_signature()
+        model = trained
+        compile_gesture_table()
+    events.publish(
+        "training",
+        success=True,
+        message=message,
+        classes=list(model.classes),
+        training_samples=model.training_samples,
+        validation_accuracy=model.validation_accuracy,
+    )
+    return message
+
+
+def _backend_not_ready_message():
+    if state.backend_status == "ready":
+        return ""
+    if state.backend_status == "failed":
+        return f"Backend warm-up failed: {state.backend_error}"
+    return "Backend is still warming up. Try again shortly."
 
 
 def _supported_actions():
@@ -102,6 +228,8 @@ def _supported_actions():
 def _recording_progress_payload():
     return {
         "recording_active": state.recording_active,
+        "recording_kind": state.recording_kind,
+        "recording_source": state.recording_source,
         "recording_label": state.recording_label,
         "recording_action": state.recording_action,
         "recording_target": state.recording_target,
@@ -110,24 +238,24 @@ def _recording_progress_payload():
     }
 
 
-def _finalize_recording_session():
-    label = state.recording_label
-    action = state.recording_action
-    emoji = state.recording_emoji
-    samples = list(state.recording_samples)
+def _gesture_kind(item):
+    kind = str(item.get("kind", "static")).strip().lower()
+    return kind if kind in GESTURE_KINDS else "static"
 
-    state.recording_active = False
-    state.recording_samples = []
 
-    if not label or not action or not samples:
-        state.recording_message = "Recording ended with no usable hand samples."
-        state.mode = "IDLE"
-        return
+def _hand_class(label, side):
+    return f"{label}:{side}"
+
+
+def _base_label(label):
+    # "zoom_in:left" -> "zoom_in"; labels without a hand suffix are returned unchanged.
+    label = str(label).strip().lower()
+    base, sep, side = label.rpartition(":")
+    return base if sep and side in HAND_SIDES else label
 
-    for sample in samples:
-        state.training_data.append(sample)
-        state.training_labels.append(label)
 
+def _upsert_registry_gesture(label, action, emoji, kind="static"):
+    # One gesture per action: returns the label previously mapped to `action`, if any.
     replaced_label = None
     for existing in state.gesture_registry:
         if str(existing.get("action", "")).upper() == action:
@@ -142,16 +270,66 @@ def _finalize_recording_session():
             "action": action,
             "emoji": emoji,
             "threshold": state.default_threshold,
+            "kind": kind,
         }
     )
+    return replaced_label
+
+
+def _finalize_recording_session():
+    _finalize_recording_samples()
+    _publish_recording()
+
+
+def _finalize_recording_samples():
+    label = state.recording_label
+    action = state.recording_action
+    emoji = state.recording_emoji
+    samples = list(state.recording_samples)
+
+    state.recording_active = False
+    state.recording_samples = []
+    state.motion_segmenter.reset()
+
+    if state.recording_kind == "background" and samples:
+        _finalize_background_recording(samples)
+        state.mode = "IDLE"
+        return
 
+    if not label or not action or not samples:
+        state.recording_message = "Recording ended with no usable hand samples."
+        state.mode = "IDLE"
+        return
+
+    if state.recording_kind == "motion":
+        _finalize_motion_recording(label, action, emoji, samples)
+        state.mode = "IDLE"
+        return
+
+    kind = state.recording_kind
     removed_for_old_label = 0
+    if state.gesture_kinds.get(label, kind) != kind:
+        # Switching between one- and two-hand: the old per-hand classes would compete.
+        removed_for_old_label += _remove_samples_by_label(label)
+
+    if kind == "two_hand":
+        rows = np.asarray(samples, dtype=np.float32)
+        state.dataset.append(rows[:, :LANDMARK_DIM], _hand_class(label, "left"))
+        state.dataset.append(rows[:, LANDMARK_DIM:], _hand_class(label, "right"))
+    else:
+        state.dataset.append(samples, label)
+
+    replaced_label = _upsert_registry_gesture(label, action, emoji, kind)
+    _remove_motion_templates_by_label(label)
+
     if replaced_label and replaced_label != label:
-        removed_for_old_label = _remove_samples_by_label(replaced_label)
+        removed_for_old_label += _remove_samples_by_label(replaced_label)
+        removed_for_old_label += _remove_motion_templates_by_label(replaced_label)
 
     build_runtime_maps_from_registry()
     save_registry()
     save_training_dataset()
+    save_motion_templates()
 
     try:
         train_message = _train_current_dataset()
@@ -166,10 +344,57 @@ def _finalize_recording_session():
     state.mode = "IDLE"
 
 
+def _finalize_background_recording(samples):
+    state.dataset.append(samples, BACKGROUND_LABEL)
+    save_training_dataset()
+
+    try:
+        train_message = _train_current_dataset()
+        save_model()
+        state.recording_message = f"Recorded {len(samples)} background samples. {train_message}"
+    except Exception as e:
+        state.recording_message = f"Recorded {len(samples)} background samples, but retraining failed: {e}"
+
+
+def _finalize_motion_recording(label, action, emoji, segments):
+    entries = [{"label": label, "duration": seg["duration"], "points": seg["points"]} for seg in segments]
+    _set_motion_templates(motion_model.to_entries() + entries)
+
+    replaced_label = _upsert_registry_gesture(label, action, emoji, "motion")
+    # Static samples under the same label would otherwise keep predicting it as a pose.
+    removed_static = _remove_samples_by_label(label)
+    removed_motion = 0
+    if replaced_label and replaced_label != label:
+        removed_static += _remove_samples_by_label(replaced_label)
+        removed_motion = _remove_motion_templates_by_label(replaced_label)
+
+    build_runtime_maps_from_registry()
+    save_registry()
+    save_motion_templates()
+
+    train_message = ""
+    if removed_static > 0:
+        save_training_dataset()
+        if state.dataset:
+            try:
+                train_message = f" {_train_current_dataset()}"
+                save_model()
+            except Exception as e:
+                train_message = f" Static model retraining failed: {e}"
+        else:
+            _reset_model_state()
+
+    state.recording_message = (
+        f"Recorded {len(segments)} motion samples for '{label}'. "
+        f"Removed old samples: {removed_static + removed_motion}.{train_message}"
+    )
+
+
 def build_runtime_maps_from_registry():
     state.active_mappings = {}
     state.gesture_emojis = {}
     state.gesture_thresholds = {}
+    state.gesture_kinds = {}
 
     for item in state.gesture_registry:
         label = str(item.get("label", "")).strip().lower()
@@ -183,6 +408,68 @@ def build_runtime_maps_from_registry():
         state.active_mappings[label] = action
         state.gesture_emojis[label] = emoji
         state.gesture_thresholds[label] = max(0.55, min(0.98, threshold))
+        state.gesture_kinds[label] = _gesture_kind(item)
+    compile_gesture_table()
+    events.publish("registry", gestures=len(state.active_mappings))
+
+
+def compile_gesture_table():
+    # Called whenever the registry, the classifier or the rejection/threshold settings change.
+    # The new table is built completely and then published with the rest of the frame config.
+    # The global model is read once: training or loading may replace it meanwhile, and the
+    # snapshot has to hold the model its table was compiled from.
+    current_model = model
+    gestures = [
+        (label, action, state.gesture_emojis[label], state.gesture_thresholds[label], state.gesture_kinds[label])
+        for label, action in state.active_mappings.items()
+    ]
+    table = GestureTable(
+        gestures,
+        current_model.classes if current_model.is_trained else [],
+        state.default_threshold,
+        rejection_distance=state.unknown_rejection_distance,
+        rejection_radii=current_model.rejection_radii if state.calibrated_rejection else None,
+        background_label=BACKGROUND_LABEL,
+        hand_invariant=current_model.is_trained and is_hand_invariant(current_model.feature_set),
+    )
+    publish_frame_config(table, current_model)
+
+
+def _smoothing_settings():
+    # build_smoother() arguments.
+    return {
+        "mode": state.smoothing_mode,
+        "required_frames": state.required_consecutive_frames,
+        "decay": state.evidence_decay,
+        "fire_threshold": state.evidence_threshold,
+    }
+
+
+def publish_frame_config(table=None, table_model=None):
+    # Swaps in a new snapshot of what the frame loop reads (see frame_config.py); call it after
+    # changing any of that. `table` is a newly compiled gesture table and `table_model` the
+    # classifier it was compiled from; without them the current pair is kept. Settings that did
+    # not change keep their object, so sources do not rebuild them.
+    current = state.frame_config
+    smoothing = _smoothing_settings()
+    landmark_filter = dict(state.landmark_filter)
+    if current is not None:
+        if table is None:
+            table, table_model = current.table, current.model
+        smoothing = current.smoothing if smoothing == current.smoothing else smoothing
+        landmark_filter = current.landmark_filter if landmark_filter == current.landmark_filter else landmark_filter
+    state.frame_config = FrameConfig(
+        current.version + 1 if current is not None else 0,
+        table,
+        table_model,
+        motion_model,
+        state.is_control_active,
+        smoothing,
+        landmark_filter,
+    )
+
+
+publish_frame_config(GestureTable([], [], state.default_threshold), model)
 
 
 def save_registry():
@@ -197,6 +484,82 @@ def load_registry():
     build_runtime_maps_from_registry()
 
 
+def _new_inference():
+    inference = InferenceState(None, state.default_threshold)
+    _follow_frame_config(inference, state.frame_config)
+    return inference
+
+
+def _follow_frame_config(inference, config):
+    # Rebuilds a source's smoother and landmark filter when the published settings changed.
+    # Runs on the frame loop, so handlers never touch per-source state.
+    if inference.smoothing is not config.smoothing:
+        inference.smoothing = config.smoothing
+        inference.smoother = build_smoother(**config.smoothing)
+        inference.last_evidence = 0.0
+    if inference.filter_settings is not config.landmark_filter:
+        inference.filter_settings = config.landmark_filter
+        inference.landmark_filter = build_landmark_filter(config.landmark_filter)
+
+
+def _all_sources():
+    return list(sources.values()) + list(landmark_sources.values())
+
+
+def _has_source(source_id):
+    return source_id in sources or source_id in landmark_sources
+
+
+def _tracker_options():
+    return {"max_hands": state.max_hands}
+
+
+def _new_source(source_id, uri, loop_video=True):
+    return VideoSource(
+        source_id,
+        uri,
+        tracker_factory=lambda: HandTracker(**_tracker_options()),
+        inference=_new_inference(),
+        loop_video=loop_video,
+        capture_settings=state.camera_settings,
+        tracker_options=_tracker_options,
+        workers=state.inference_workers,
+        quality=QualityController(state.tracker_target_ms, state.tracker_pinned),
+    )
+
+
+def _tracker_quality():
+    return {"target_ms": state.tracker_target_ms, "pinned": state.tracker_pinned}
+
+
+def _set_tracker_quality(payload):
+    state.tracker_target_ms = max(5.0, min(500.0, float(payload.get("target_ms", state.tracker_target_ms))))
+    pinned = payload.get("pinned", state.tracker_pinned)
+    state.tracker_pinned = quality_settings(pinned) if isinstance(pinned, dict) else None
+    for source in sources.values():
+        source.quality.configure(target_ms=state.tracker_target_ms, pinned=state.tracker_pinned)
+
+
+def save_sources():
+    _write_json(
+        SOURCES_CONFIG_PATH,
+        {"sources": [{"id": s.id, "uri": s.uri, "loop": s.loop_video} for s in sources.values()]},
+    )
+
+
+def load_sources():
+    payload = _read_json(SOURCES_CONFIG_PATH, {"sources": [{"id": DEFAULT_SOURCE_ID, "uri": 0}]})
+    entries = payload.get("sources", [])
+    sources.clear()
+    if isinstance(entries, list):
+        for entry in entries:
+            source_id = str(entry.get("id", "")).strip()
+            if source_id and str(entry.get("uri", "")).strip():
+                sources[source_id] = _new_source(source_id, entry["uri"], bool(entry.get("loop", True)))
+    if DEFAULT_SOURCE_ID not in sources:
+        sources[DEFAULT_SOURCE_ID] = _new_source(DEFAULT_SOURCE_ID, 0)
+
+
 def save_runtime_config():
     _write_json(
         RUNTIME_CONFIG_PATH,
@@ -204,6 +567,20 @@ def save_runtime_config():
             "default_threshold": state.default_threshold,
             "required_consecutive_frames": state.required_consecutive_frames,
             "unknown_rejection_distance": state.unknown_rejection_distance,
+            "calibrated_rejection": state.calibrated_rejection,
+            "smoothing_mode": state.smoothing_mode,
+            "evidence_decay": state.evidence_decay,
+            "evidence_threshold": state.evidence_threshold,
+            "max_hands": state.max_hands,
+            "balance_classes": state.balance_classes,
+            "balance_target": state.balance_target,
+            "input_backend": state.input_backend,
+            "camera_keep_alive": state.camera_keep_alive,
+            "camera": state.camera_settings,
+            "inference_workers": state.inference_workers,
+            "tracker_quality": _tracker_quality(),
+            "landmark_filter": state.landmark_filter,
+            "feature_set": state.feature_set,
         },
     )
 
@@ -215,6 +592,20 @@ def load_runtime_config():
             "default_threshold": state.default_threshold,
             "required_consecutive_frames": state.required_consecutive_frames,
             "unknown_rejection_distance": state.unknown_rejection_distance,
+            "calibrated_rejection": state.calibrated_rejection,
+            "smoothing_mode": state.smoothing_mode,
+            "evidence_decay": state.evidence_decay,
+            "evidence_threshold": state.evidence_threshold,
+            "max_hands": state.max_hands,
+            "balance_classes": state.balance_classes,
+            "balance_target": state.balance_target,
+            "input_backend": state.input_backend,
+            "camera_keep_alive": state.camera_keep_alive,
+            "camera": state.camera_settings,
+            "inference_workers": state.inference_workers,
+            "tracker_quality": _tracker_quality(),
+            "landmark_filter": state.landmark_filter,
+            "feature_set": state.feature_set,
         },
     )
     state.default_threshold = float(payload.get("default_threshold", state.default_threshold))
@@ -224,65 +615,101 @@ def load_runtime_config():
     state.unknown_rejection_distance = float(
         payload.get("unknown_rejection_distance", state.unknown_rejection_distance)
     )
+    state.calibrated_rejection = bool(payload.get("calibrated_rejection", state.calibrated_rejection))
+    smoothing_mode = str(payload.get("smoothing_mode", state.smoothing_mode)).strip().lower()
+    if smoothing_mode in SMOOTHING_MODES:
+        state.smoothing_mode = smoothing_mode
+    state.evidence_decay = float(payload.get("evidence_decay", state.evidence_decay))
+    state.evidence_threshold = float(payload.get("evidence_threshold", state.evidence_threshold))
+    state.max_hands = max(1, min(2, int(payload.get("max_hands", state.max_hands))))
+    state.balance_classes = bool(payload.get("balance_classes", state.balance_classes))
+    state.balance_target = max(0, min(5000, int(payload.get("balance_target", state.balance_target))))
+    input_backend = str(payload.get("input_backend", state.input_backend)).strip().lower()
+    if input_backend in BACKEND_NAMES:
+        state.input_backend = input_backend
+    controller.set_backend(state.input_backend)
+    state.camera_keep_alive = max(0.0, min(300.0, float(payload.get("camera_keep_alive", state.camera_keep_alive))))
+    state.camera_settings = capture_settings(payload.get("camera", state.camera_settings))
+    state.inference_workers = max(0, min(8, int(payload.get("inference_workers", state.inference_workers))))
+    for source in sources.values():
+        source.set_capture_settings(state.camera_settings)
+        source.set_workers(state.inference_workers)
+    tracker_quality = payload.get("tracker_quality")
+    if isinstance(tracker_quality, dict):
+        _set_tracker_quality(tracker_quality)
+    state.landmark_filter = filter_settings(payload.get("landmark_filter", state.landmark_filter))
+    state.feature_set = feature_set_name(payload.get("feature_set", state.feature_set))
+    compile_gesture_table()
 
 
 def save_training_dataset():
-    _write_json(
-        TRAINING_DATA_PATH,
-        {
-            "samples": state.training_data,
-            "labels": state.training_labels,
-        },
-    )
+    # Writes only the files that changed since the last save.
+    state.dataset.save(str(TRAINING_DATA_PATH))
 
 
 def load_training_dataset():
-    payload = _read_json(TRAINING_DATA_PATH, {"samples": [], "labels": []})
-    samples = payload.get("samples", [])
-    labels = payload.get("labels", [])
-    if isinstance(samples, list) and isinstance(labels, list) and len(samples) == len(labels):
-        state.training_data = samples
-        state.training_labels = labels
+    state.dataset.load(str(TRAINING_DATA_PATH), legacy_path=str(LEGACY_TRAINING_DATA_PATH))
+
+
+def save_motion_templates():
+    _write_json(MOTION_TEMPLATES_PATH, {"templates": motion_model.to_entries()})
+
+
+def load_motion_templates():
+    payload = _read_json(MOTION_TEMPLATES_PATH, {"templates": []})
+    templates = payload.get("templates", [])
+    if isinstance(templates, list):
+        _set_motion_templates(templates)
+
+
+def _set_motion_templates(entries):
+    # Published as a new matcher, like a retrained model (see frame_config.py).
+    global motion_model
+    matcher = MotionClassifier()
+    matcher.set_templates(entries)
+    motion_model = matcher
+    publish_frame_config()
+
+
+def _remove_motion_templates_by_label(label: str):
+    label = str(label).strip().lower()
+    entries = motion_model.to_entries()
+    kept = [entry for entry in entries if entry["label"] != label]
+    if len(kept) != len(entries):
+        _set_motion_templates(kept)
+    return len(entries) - len(kept)
+
+
+def _prune_motion_templates_to_registry():
+    motion_labels = {
+        str(item.get("label", "")).strip().lower()
+        for item in state.gesture_registry
+        if _gesture_kind(item) == "motion"
+    }
+    entries = motion_model.to_entries()
+    kept = [entry for entry in entries if entry["label"] in motion_labels]
+    if len(kept) != len(entries):
+        _set_motion_templates(kept)
+    return len(entries) - len(kept)
 
 
 def _remove_samples_by_label(label: str):
     if not label:
         return 0
     label = str(label).strip().lower()
-    kept_samples = []
-    kept_labels = []
-    removed = 0
-    for sample, sample_label in zip(state.training_data, state.training_labels):
-        if str(sample_label).strip().lower() == label:
-            removed += 1
-            continue
-        kept_samples.append(sample)
-        kept_labels.append(sample_label)
-    state.training_data = kept_samples
-    state.training_labels = kept_labels
-    return removed
+    return state.dataset.remove(lambda sample_label: _base_label(sample_label) == label)
 
 
 def _prune_dataset_to_registry():
     active_labels = {str(item.get("label", "")).strip().lower() for item in state.gesture_registry}
     active_labels.discard("")
     if not active_labels:
-        removed = len(state.training_labels)
-        state.training_data = []
-        state.training_labels = []
+        removed = len(state.dataset)
+        state.dataset.clear()
         return removed
-    kept_samples = []
-    kept_labels = []
-    removed = 0
-    for sample, sample_label in zip(state.training_data, state.training_labels):
-        if str(sample_label).strip().lower() in active_labels:
-            kept_samples.append(sample)
-            kept_labels.append(sample_label)
-        else:
-            removed += 1
-    state.training_data = kept_samples
-    state.training_labels = kept_labels
-    return removed
+    # Background samples do not belong to any gesture and survive registry changes.
+    active_labels.add(BACKGROUND_LABEL)
+    return state.dataset.remove(lambda sample_label: _base_label(sample_label) not in active_labels)
 
 
 def _is_model_dataset_synced():
@@ -293,28 +720,26 @@ def _is_model_dataset_synced():
         return False
     if model_signature != _current_dataset_signature():
         return False
+    if model.feature_set != state.feature_set:
+        return False
     model_classes = {str(c).strip().lower() for c in (model.classes or [])}
-    dataset_classes = {str(c).strip().lower() for c in state.training_labels}
+    dataset_classes = set(state.dataset.table)
     return bool(model_classes) and model_classes == dataset_classes
 
 
 def _reset_model_state():
-    model.is_trained = False
-    model.classes = []
-    model.validation_accuracy = None
-    model.training_samples = 0
-    model.last_trained_at = None
-    model.last_neighbor_distance = None
-    model.dataset_signature = None
-    state.dynamic_thresholds = {}
-    state.last_predicted_gesture = "none"
-    state.consecutive_count = 0
+    global model
+    model = GestureModel()
+    for source in _all_sources():
+        source.inference.reset()
     state.is_control_active = False
+    compile_gesture_table()
     state.recording_active = False
     state.recording_samples = []
     state.recording_message = ""
     if MODEL_PATH.exists():
-        MODEL_PATH.unlink(missing_ok=True)
+        shutil.rmtree(MODEL_PATH, ignore_errors=True)
+    LEGACY_MODEL_PATH.unlink(missing_ok=True)
 
 
 def save_model():
@@ -322,23 +747,62 @@ def save_model():
 
 
 def load_model():
-    loaded = model.load(str(MODEL_PATH))
+    global model
+    loaded_model = GestureModel()
+    loaded = loaded_model.load(str(MODEL_PATH), legacy_path=str(LEGACY_MODEL_PATH))
+    migrated = state.dataset.migrated_signature
+    if loaded and migrated and loaded_model.dataset_signature == migrated[0]:
+        # Trained on the dataset before it was converted to the array format: the samples and
+        # labels are the same, only the way they are hashed changed.
+        loaded_model.restamp(str(MODEL_PATH), migrated[1])
+    model = loaded_model
+    compile_gesture_table()
     if loaded:
         print(">>> JARVIS model loaded")
     else:
         print(">>> JARVIS model not found yet")
 
 
+def _decode_image_bytes(raw):
+    import cv2
+
+    if not raw:
+        return None
+    # frombuffer wraps the request bytes without copying; imdecode reads them in place.
+    arr = np.frombuffer(raw, dtype=np.uint8)
+    return cv2.imdecode(arr, cv2.IMREAD_COLOR)
+
+
 def _decode_base64_image(image_data: str):
     if not image_data:
         return None
     payload = image_data.split(",", 1)[1] if "," in image_data else image_data
-    raw = base64.b64decode(payload)
-    arr = np.frombuffer(raw, dtype=np.uint8)
-    return cv2.imdecode(arr, cv2.IMREAD_COLOR)
+    return _decode_image_bytes(base64.b64decode(payload))
+
+
+async def _read_binary_upload(request: Request):
+    # Accepts either a raw image body (Content-Type: image/jpeg, image/png, ...) with fields
+    # in the query string, or multipart/form-data with one or more file parts and optional
+    # form fields. Returns (fields, list of raw image bytes).
+    fields = dict(request.query_params)
+    images = []
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        form = await request.form()
+        for key, value in form.multi_items():
+            if hasattr(value, "read"):
+                images.append(await value.read())
+            else:
+                fields[key] = value
+    else:
+        body = await request.body()
+        if body:
+            images.append(body)
+    return fields, images
 
 
 def _extract_hand_crop(frame):
+    import cv2
+
     h, w = frame.shape[:2]
     img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
     results = tracker.hands.process(img_rgb)
@@ -375,6 +839,8 @@ def _extract_hand_crop(frame):
 
 
 def _assess_image_quality(frame, hand_crop_payload=None):
+    import cv2
+
     payload = hand_crop_payload if hand_crop_payload is not None else _extract_hand_crop(frame)
     if payload is None:
         return {
@@ -430,32 +896,6 @@ def _assess_image_quality(frame, hand_crop_payload=None):
     }
 
 
-def _augment_landmarks(landmarks, count=48):
-    base = np.array(landmarks, dtype=np.float32).reshape(-1, 3)
-    augmented = [base.flatten().tolist()]
-
-    for _ in range(max(1, count - 1)):
-        sample = base.copy()
-        angle = np.random.uniform(-0.20, 0.20)
-        scale = np.random.uniform(0.90, 1.12)
-        noise = np.random.normal(0.0, 0.014, sample.shape)
-
-        rot = np.array(
-            [
-                [np.cos(angle), -np.sin(angle), 0.0],
-                [np.sin(angle), np.cos(angle), 0.0],
-                [0.0, 0.0, 1.0],
-            ],
-            dtype=np.float32,
-        )
-
-        sample = (sample @ rot.T) * scale
-        sample = sample + noise
-        augmented.append(sample.flatten().tolist())
-
-    return augmented
-
-
 def _landmark_distance(a, b):
     va = np.array(a, dtype=np.float32)
     vb = np.array(b, dtype=np.float32)
@@ -463,6 +903,8 @@ def _landmark_distance(a, b):
 
 
 def _augment_frame_variants(frame, count=48):
+    import cv2
+
     h, w = frame.shape[:2]
     variants = [frame.copy()]
 
@@ -511,197 +953,579 @@ def _augment_frame_variants(frame, count=48):
     return variants
 
 
-def _effective_threshold(gesture_name: str, confidence: float):
-    key = gesture_name.lower()
-    base = float(state.gesture_thresholds.get(key, state.default_threshold))
-    prev_dyn = float(state.dynamic_thresholds.get(key, base))
+def _effective_threshold(inference: InferenceState, table: GestureTable, gesture_id: int, confidence: float):
+    base = table.thresholds[gesture_id]
     target = max(0.55, min(0.98, confidence - 0.08))
-    dyn = (0.90 * prev_dyn) + (0.10 * target)
-    state.dynamic_thresholds[key] = dyn
-    return max(0.55, min(0.98, (0.70 * base) + (0.30 * dyn)))
+    dyn = (0.90 * inference.dynamic_thresholds[gesture_id]) + (0.10 * target)
+    inference.dynamic_thresholds[gesture_id] = dyn
+    return float(max(0.55, min(0.98, (0.70 * base) + (0.30 * dyn))))
+
+
+def _screen_hand_prediction(table: GestureTable, code, neighbor_distance):
+    # Returns (gesture id, rejection reason) for one hand's predicted class code.
+    if table.class_background[code]:
+        # Closest to the recorded idle hands: a deliberate "no gesture".
+        return NO_GESTURE, "background"
+    # Reject out-of-distribution gestures so KNN does not force random known labels.
+    limit = table.rejection_limits[code]
+    if table.reject_unknown and limit > 0 and neighbor_distance > limit:
+        return NO_GESTURE, "unknown_distance"
+    gesture_id = int(table.class_gesture[code])
+    if gesture_id == NO_GESTURE:
+        # Do not surface stale labels that are no longer part of the active gesture registry.
+        return NO_GESTURE, "inactive_label"
+    return gesture_id, ""
+
+
+def _combine_hand_predictions(screened, per_hand):
+    # `screened` holds (gesture id, hand side of the predicted class) per hand, aligned with
+    # `per_hand`. Returns (gesture id, confidence, neighbour distance, rejection reason).
+    left = right = None
+    for (gesture_id, side), hand in zip(screened, per_hand):
+        if hand["handedness"] == "left":
+            left = (gesture_id, side, hand)
+        elif hand["handedness"] == "right":
+            right = (gesture_id, side, hand)
+    if (
+        left
+        and right
+        and left[0] != NO_GESTURE
+        and left[0] == right[0]
+        and left[1] == SIDE_LEFT
+        and right[1] == SIDE_RIGHT
+    ):
+        return (
+            left[0],
+            min(left[2]["confidence"], right[2]["confidence"]),
+            max(left[2]["neighbor_distance"], right[2]["neighbor_distance"]),
+            "",
+        )
+
+    best = None
+    for (gesture_id, side), hand in zip(screened, per_hand):
+        if gesture_id != NO_GESTURE and side == SIDE_NONE and (best is None or hand["confidence"] > best[1]["confidence"]):
+            best = (gesture_id, hand)
+    if best is not None:
+        return best[0], best[1]["confidence"], best[1]["neighbor_distance"], ""
+
+    first = per_hand[0]
+    if any(gesture_id != NO_GESTURE for gesture_id, _ in screened):
+        # One half of a two-hand gesture on its own is not a gesture.
+        return NO_GESTURE, 0.0, first["neighbor_distance"], "partial_two_hand"
+    return NO_GESTURE, 0.0, first["neighbor_distance"], first["rejection_reason"]
+
+
+def classify_hands(hands, inference: InferenceState, config: Optional[FrameConfig] = None):
+    # `hands` is a list of (handedness, landmarks) pairs, one per detected hand. `config` is
+    # the frame's snapshot, by default the latest one.
+    config = config or state.frame_config
+    table = config.table
+    inference.bind(table)
+    codes, confidences, distances = config.model.predict_codes([landmarks for _, landmarks in hands])
+    per_hand = []
+    screened = []
+    for (side, _), code, confidence, neighbor_distance in zip(hands, codes, confidences, distances):
+        gesture_id, rejection_reason = _screen_hand_prediction(table, code, neighbor_distance)
+        accepted = gesture_id != NO_GESTURE
+        class_side = table.class_side[code] if accepted else SIDE_NONE
+        if class_side != SIDE_NONE and table.hand_invariant and side in SIDES:
+            class_side = SIDES[side]
+        screened.append((gesture_id, class_side))
+        per_hand.append(
+            {
+                "handedness": side,
+                "gesture": table.class_labels[code] if accepted else "none",
+                "confidence": float(confidence) if accepted else 0.0,
+                "neighbor_distance": float(neighbor_distance),
+                "rejection_reason": rejection_reason,
+            }
+        )
+    inference.last_neighbor_distance = per_hand[0]["neighbor_distance"]
 
+    gesture_id, confidence, neighbor_distance, rejection_reason = _combine_hand_predictions(screened, per_hand)
+    eff = _effective_threshold(inference, table, gesture_id, confidence)
+    inference.last_effective_threshold = eff
+    decision = inference.smoother.update(gesture_id, confidence, eff)
+    inference.last_evidence = decision.evidence
 
-async def process_camera_frame(frame):
-    frame, landmarks, _ = tracker.process_frame(frame)
+    return {
+        "gesture": table.labels[gesture_id],
+        "gesture_id": gesture_id,
+        "emoji": table.emojis[gesture_id],
+        "action": table.actions[gesture_id],
+        "confidence": float(confidence),
+        "neighbor_distance": neighbor_distance,
+        "rejection_reason": rejection_reason,
+        "fire": decision.fire,
+        "hands": per_hand,
+    }
+
+
+def classify_landmarks(landmarks, inference: InferenceState):
+    return classify_hands([("", landmarks)], inference)
+
+
+def _two_hand_sample(hands):
+    by_side = {hand.handedness: hand for hand in hands}
+    if "left" not in by_side or "right" not in by_side:
+        return None
+    return np.concatenate([by_side["left"].landmarks, by_side["right"].landmarks])
+
+
+def _record_pose_sample(sample):
+    if not state.recording_samples:
+        # One buffer per session, sized to the target.
+        state.recording_buffer = augment.NoveltyBuffer(state.recording_target, len(sample), RECORDING_NOVELTY_DISTANCE)
+    row = state.recording_buffer.add(sample)
+    if row is None:
+        return
+    state.recording_samples.append(row)
+    _publish_recording()
+    if len(state.recording_samples) >= state.recording_target:
+        _finalize_recording_session()
+
+
+def _publish_frame_events(source, config, gesture, confidence, hand_detected, rejection_reason, fired_id, executed):
+    # Frames arrive at camera rate; the event bus only hears about changes. Streak progress
+    # is reported up to the number of frames needed to fire.
+    inference = source.inference
+    streak = min(inference.smoother.streak, config.required_frames)
+    key = (gesture, streak, hand_detected)
+    if key != inference.last_reported:
+        inference.last_reported = key
+        events.publish(
+            "prediction",
+            source=source.id,
+            gesture=gesture,
+            confidence=round(float(confidence), 4),
+            streak=streak,
+            hand_detected=hand_detected,
+            rejection_reason=rejection_reason,
+        )
+    if fired_id != inference.last_fired:
+        inference.last_fired = fired_id
+        if fired_id != NO_GESTURE:
+            table = config.table
+            events.publish(
+                "gesture",
+                source=source.id,
+                gesture=table.labels[fired_id],
+                action=table.actions[fired_id],
+                confidence=round(float(confidence), 4),
+                executed=executed,
+            )
+
+
+def _publish_recording():
+    events.publish("recording", **_recording_progress_payload())
+
+
+def _filter_hands(hands, landmark_filter, captured_at):
+    # Replaces each hand's raw points with filtered ones and renormalizes its landmarks in place.
+    filtered = landmark_filter.filter_hands(
+        [(hand.handedness, landmark_points(hand.hand_landmarks)) for hand in hands], captured_at
+    )
+    for hand, points in zip(hands, filtered):
+        hand.hand_landmarks = points
+        HandTracker.normalize_landmarks(points, out=hand.landmarks)
+
+
+def process_source_frame(source: VideoSource, hands, captured_at):
+    # Runs on the event loop: hand detection already happened on the source's capture thread.
+    # Configuration comes from one snapshot read here (see frame_config.py); the recording
+    # session and the controller are still shared state.
+    config = state.frame_config
+    inference = source.inference
+    _follow_frame_config(inference, config)
+    if inference.landmark_filter is not None:
+        _filter_hands(hands, inference.landmark_filter, captured_at)
+    recording_here = state.recording_active and state.recording_source == source.id
+    landmarks = hands[0].landmarks if hands else None
+    points = landmark_points(hands[0].hand_landmarks) if hands else None
     detected_gesture = "none"
     detected_emoji = ""
     confidence = 0.0
-    hand_detected = bool(landmarks)
+    hand_detected = bool(hands)
+    hand_payload = [{"handedness": hand.handedness, "gesture": "none", "confidence": 0.0} for hand in hands]
     neighbor_distance = None
     rejection_reason = ""
+    motion_gesture = "none"
+    motion_confidence = 0.0
+    fired_id = NO_GESTURE
+    executed = False
 
     try:
-        if state.recording_active and landmarks:
-            is_novel = True
-            for existing in state.recording_samples:
-                if _landmark_distance(existing, landmarks) < 0.014:
-                    is_novel = False
-                    break
-            if is_novel:
-                state.recording_samples.append(landmarks)
+        if recording_here and state.recording_kind == "motion":
+            segment = state.motion_segmenter.push(points, captured_at)
+            if segment is not None:
+                state.recording_samples.append(
+                    {"points": segment["points"].tolist(), "duration": round(segment["duration"], 3)}
+                )
+                _publish_recording()
                 if len(state.recording_samples) >= state.recording_target:
                     _finalize_recording_session()
-
-        if state.is_control_active and model.is_trained and landmarks:
-            detected_gesture, confidence = model.predict(landmarks)
-            detected_gesture = str(detected_gesture).lower()
-            neighbor_distance = model.last_neighbor_distance
-
-            # Reject out-of-distribution gestures so KNN does not force random known labels.
-            if (
-                state.unknown_rejection_distance > 0
-                and
-                neighbor_distance is not None
-                and len(model.classes) > 1
-                and neighbor_distance > state.unknown_rejection_distance
-            ):
-                detected_gesture = "none"
-                confidence = 0.0
-                rejection_reason = "unknown_distance"
-            elif detected_gesture not in state.active_mappings:
-                # Do not surface stale labels that are no longer part of the active gesture registry.
-                detected_gesture = "none"
-                confidence = 0.0
-                rejection_reason = "inactive_label"
-
-            detected_emoji = state.gesture_emojis.get(detected_gesture, "")
-
-            eff = _effective_threshold(detected_gesture, confidence)
-            state.last_effective_threshold = eff
-
-            if detected_gesture == state.last_predicted_gesture and confidence >= eff:
-                state.consecutive_count += 1
-            elif confidence >= eff:
-                state.last_predicted_gesture = detected_gesture
-                state.consecutive_count = 1
-            else:
-                state.last_predicted_gesture = detected_gesture
-                state.consecutive_count = 0
-
-            if state.consecutive_count >= state.required_consecutive_frames:
-                controller.execute_action(detected_gesture, state.active_mappings)
+        elif recording_here and state.recording_kind == "background":
+            # Every visible hand is an idle hand; each is a single-hand sample.
+            for hand in hands:
+                if not state.recording_active:
+                    break
+                _record_pose_sample(hand.landmarks)
+        elif recording_here and state.recording_kind == "two_hand":
+            sample = _two_hand_sample(hands)
+            if sample is not None:
+                _record_pose_sample(sample)
+        elif recording_here and landmarks is not None:
+            _record_pose_sample(landmarks)
+
+        table = config.table
+        motion_id = NO_GESTURE
+        if config.control_active and config.motion_model.is_trained and points is not None:
+            inference.motion_buffer.push(points, captured_at)
+            match_start = time.perf_counter()
+            motion_gesture, motion_confidence, _ = config.motion_model.match(inference.motion_buffer)
+            inference.last_motion_match_ms = (time.perf_counter() - match_start) * 1000.0
+            motion_id = table.ids.get(motion_gesture, NO_GESTURE)
+            if motion_id == NO_GESTURE:
+                motion_gesture = "none"
+
+        if motion_id != NO_GESTURE:
+            detected_gesture = motion_gesture
+            detected_emoji = table.emojis[motion_id]
+            confidence = motion_confidence
+            # Start the next motion from a clean window so one swipe fires once.
+            inference.motion_buffer.clear()
+            fired_id = motion_id
+            executed = controller.execute_mapped_action(motion_gesture, table.actions[motion_id])
+        elif config.control_active and config.model.is_trained and hands:
+            result = classify_hands([(hand.handedness, hand.landmarks) for hand in hands], inference, config)
+            hand_payload = [
+                {"handedness": hand["handedness"], "gesture": hand["gesture"], "confidence": hand["confidence"]}
+                for hand in result["hands"]
+            ]
+            detected_gesture = result["gesture"]
+            detected_emoji = result["emoji"]
+            confidence = result["confidence"]
+            neighbor_distance = result["neighbor_distance"]
+            rejection_reason = result["rejection_reason"]
+
+            if result["fire"]:
+                fired_id = result["gesture_id"]
+                executed = controller.execute_mapped_action(detected_gesture, result["action"])
     except Exception as e:
-        print(f"Frame processing error: {e}")
+        print(f"Frame processing error on source '{source.id}': {e}")
+
+    _publish_frame_events(source, config, detected_gesture, confidence, hand_detected, rejection_reason, fired_id, executed)
 
     if state.recording_active:
         ui_status = "RECORDING"
     else:
-        ui_status = "PREDICTING" if state.is_control_active else "IDLE"
-
-    _, buffer = cv2.imencode(".jpg", frame)
-    frame_base64 = base64.b64encode(buffer).decode("utf-8")
+        ui_status = "PREDICTING" if config.control_active else "IDLE"
 
     return {
-        "image": frame_base64,
+        "source": source.id,
         "status": ui_status,
         "gesture": detected_gesture,
         "emoji": detected_emoji,
         "confidence": float(confidence),
         "hand_detected": hand_detected,
+        "hands": hand_payload,
         "neighbor_distance": float(neighbor_distance) if neighbor_distance is not None else None,
         "rejection_reason": rejection_reason,
-        "required_streak": state.required_consecutive_frames,
-        "current_streak": state.consecutive_count,
-        "effective_threshold": state.last_effective_threshold,
+        "required_streak": config.required_frames,
+        "current_streak": inference.smoother.streak,
+        "effective_threshold": inference.last_effective_threshold,
+        "smoothing_mode": config.smoothing["mode"],
+        "evidence": inference.last_evidence,
+        "evidence_threshold": config.smoothing["fire_threshold"],
+        "motion_gesture": motion_gesture,
+        "motion_confidence": float(motion_confidence),
+        "motion_match_ms": inference.last_motion_match_ms,
         **_recording_progress_payload(),
     }
 
 
-async def camera_worker():
-    global camera_task
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        print(">>> Could not open camera")
-        camera_task = None
+async def source_worker(source: VideoSource):
+    await backend_warm.wait()
+    if tracker is None:
+        source.task = None
         return
 
+    if source.stopping:
+        await asyncio.to_thread(source.join)
+    source.start()
+    expired = False
     try:
-        while clients:
-            ret, frame = cap.read()
-            if not ret:
-                await asyncio.sleep(0.05)
-                continue
+        while True:
+            if not source.clients and not await source.wait_for_client(state.camera_keep_alive):
+                expired = True
+                break
+            result = await source.next_result()
+            if result is None:
+                break
+            image, hands, captured_at, frame_age_ms = result
 
-            payload = await process_camera_frame(frame)
+            payload = {"image": image, **process_source_frame(source, hands, captured_at)}
+            # Capture-to-detection and capture-to-decision age of this frame.
+            source.result_age_ms = round((time.perf_counter() - captured_at) * 1000.0, 2)
+            payload["frame_age_ms"] = frame_age_ms
+            payload["result_age_ms"] = source.result_age_ms
             stale = []
-            for ws in list(clients):
+            for ws in list(source.clients):
                 try:
                     await ws.send_json(payload)
                 except Exception:
                     stale.append(ws)
 
             for ws in stale:
-                clients.discard(ws)
-
-            await asyncio.sleep(0.01)
+                source.detach(ws)
     finally:
-        cap.release()
-        camera_task = None
+        source.stop()
+        source.task = None
+        if expired and source.clients:
+            # A client attached while this worker was giving up on its keep-alive; start
+            # over instead of leaving it connected to a stopped source.
+            asyncio.create_task(ensure_source_worker(source))
 
 
-async def ensure_camera_worker():
-    global camera_task
-    async with camera_task_lock:
-        if camera_task is None or camera_task.done():
-            camera_task = asyncio.create_task(camera_worker())
+async def ensure_source_worker(source: VideoSource):
+    async with source_task_lock:
+        if source.task is None or source.task.done():
+            source.task = asyncio.create_task(source_worker(source))
 
 
 @app.websocket("/ws/video")
 async def video_endpoint(websocket: WebSocket):
     await websocket.accept()
-    clients.add(websocket)
-    await ensure_camera_worker()
+    source_id = websocket.query_params.get("source", DEFAULT_SOURCE_ID)
+    source = sources.get(source_id)
+    if source is None:
+        await websocket.send_json({"status": "error", "message": f"Unknown source: {source_id}"})
+        await websocket.close()
+        return
+
+    source.attach(websocket)
+    await ensure_source_worker(source)
     try:
         while True:
             await websocket.receive_text()
     except WebSocketDisconnect:
-        print("Client disconnected")
+        print(f"Client disconnected from source '{source.id}'")
     finally:
-        clients.discard(websocket)
+        source.detach(websocket)
+
+
+def _landmark_hands(sides, points):
+    # Every hand is normalized exactly like a camera hand. The raw points stay attached for
+    # the motion matcher, which works in image coordinates.
+    return [
+        TrackedHand(side, HandTracker.normalize_landmarks(hand_points), hand_points)
+        for side, hand_points in zip(sides[: state.max_hands], points[: state.max_hands])
+    ]
+
+
+@app.websocket("/ws/landmarks")
+async def landmarks_endpoint(websocket: WebSocket):
+    await websocket.accept()
+    source_id = websocket.query_params.get("source", LANDMARK_SOURCE_ID)
+    if source_id in sources:
+        await websocket.send_json({"status": "error", "message": f"Source id is used by a video source: {source_id}"})
+        await websocket.close()
+        return
+
+    await backend_warm.wait()
+    source = landmark_sources.get(source_id)
+    if source is None:
+        source = LandmarkSource(source_id, _new_inference())
+        landmark_sources[source_id] = source
+    source.clients.add(websocket)
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            data = message.get("bytes")
+            if data is None:
+                await websocket.send_json({"status": "error", "message": "Expected a binary landmark packet"})
+                continue
+            try:
+                sides, points, captured_at = parse_landmark_packet(data)
+            except ValueError as e:
+                source.frames_rejected += 1
+                await websocket.send_json({"status": "error", "message": str(e)})
+                continue
+
+            source.frames_read += 1
+            hands = _landmark_hands(sides, points)
+            payload = process_source_frame(source, hands, captured_at or time.perf_counter())
+            await websocket.send_json(payload)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        source.clients.discard(websocket)
+        if not source.clients and landmark_sources.get(source_id) is source:
+            del landmark_sources[source_id]
+        print(f"Landmark client disconnected from source '{source_id}'")
+
+
+@app.websocket("/ws/events")
+async def events_endpoint(websocket: WebSocket):
+    # State changes only (predictions, fired gestures, recording, training, ...); see events.py.
+    # `since` resumes after a reconnect, `types` is a comma-separated filter.
+    await websocket.accept()
+    since = websocket.query_params.get("since")
+    types = [t.strip() for t in websocket.query_params.get("types", "").split(",") if t.strip()]
+    try:
+        since = int(since) if since is not None else None
+    except ValueError:
+        since = None
+
+    await websocket.send_json({"type": "hello", "seq": events.seq})
+    subscriber = events.subscribe(types or None, since)
+    # The client never needs to send anything; the receive task only notices a disconnect.
+    receiver = asyncio.create_task(websocket.receive())
+    # The sender task is only replaced once its event has been sent: a finished next() has
+    # already taken the event off the queue, so cancelling it would lose that event.
+    sender = asyncio.create_task(subscriber.next())
+    try:
+        while True:
+            done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if sender in done:
+                await websocket.send_json(sender.result())
+                sender = asyncio.create_task(subscriber.next())
+            if receiver in done:
+                message = receiver.result()
+                if message["type"] == "websocket.disconnect":
+                    break
+                receiver = asyncio.create_task(websocket.receive())
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        receiver.cancel()
+        sender.cancel()
+        events.unsubscribe(subscriber)
+
+
+@app.get("/api/sources")
+async def list_sources():
+    return {"sources": [source.describe() for source in _all_sources()]}
+
+
+@app.post("/api/sources")
+async def save_source(data: dict):
+    source_id = str(data.get("id", "")).strip()
+    uri = str(data.get("uri", "")).strip()
+    if not source_id:
+        return {"success": False, "message": "Missing source id"}
+    if not uri:
+        return {"success": False, "message": "Missing source uri"}
+    if source_id in landmark_sources:
+        return {"success": False, "message": "Source id is in use by landmark clients"}
+
+    existing = sources.get(source_id)
+    if existing is not None:
+        if existing.clients:
+            return {"success": False, "message": "Source has connected clients; disconnect them first"}
+        existing.stop()
+    sources[source_id] = _new_source(source_id, parse_source_uri(uri), bool(data.get("loop", True)))
+    save_sources()
+    return {"success": True, "source": sources[source_id].describe()}
+
+
+@app.post("/api/sources/remove")
+async def remove_source(data: dict):
+    source_id = str(data.get("id", "")).strip()
+    if source_id == DEFAULT_SOURCE_ID:
+        return {"success": False, "message": "The default source cannot be removed"}
+    source = sources.pop(source_id, None)
+    if source is None:
+        return {"success": False, "message": f"Unknown source: {source_id}"}
+    source.stop()
+    for ws in list(source.clients):
+        try:
+            await ws.close()
+        except Exception:
+            pass
+    save_sources()
+    return {"success": True, "sources": [s.describe() for s in sources.values()]}
 
 
 @app.post("/api/toggle_control")
 async def toggle_control(data: dict):
     target_active = bool(data.get("active", False))
+    not_ready = _backend_not_ready_message()
+    if target_active and not_ready:
+        return {"status": "error", "success": False, "message": not_ready}
     if target_active and state.recording_active:
         return {"status": "error", "success": False, "message": "Cannot monitor while recording gesture samples"}
     if target_active:
-        if not model.is_trained:
+        if not model.is_trained and not motion_model.is_trained:
             return {"status": "error", "success": False, "message": "Model is not trained yet"}
-        if not _is_model_dataset_synced():
+        if state.dataset and not _is_model_dataset_synced():
             return {
                 "status": "error",
                 "success": False,
                 "message": "Model and dataset are out of sync. Please retrain.",
             }
     state.is_control_active = target_active
+    publish_frame_config()
+    events.publish("control", active=state.is_control_active)
     return {"status": "success", "active": state.is_control_active}
 
 
 @app.post("/api/start_recording_gesture")
 async def start_recording_gesture(data: dict):
+    not_ready = _backend_not_ready_message()
+    if not_ready:
+        return {"success": False, "message": not_ready}
     if state.recording_active:
         return {"success": False, "message": "A recording session is already active"}
 
     label = str(data.get("label", "")).strip().lower()
     action = str(data.get("action", "")).strip().upper()
     emoji = str(data.get("emoji", "")).strip()
-    target_samples = max(20, min(120, int(data.get("target_samples", 50))))
+    kind = str(data.get("kind", "static")).strip().lower()
+    source_id = str(data.get("source", DEFAULT_SOURCE_ID)).strip()
+    if kind not in GESTURE_KINDS:
+        return {"success": False, "message": "Unsupported gesture kind"}
+    if not _has_source(source_id):
+        return {"success": False, "message": f"Unknown source: {source_id}"}
+    if kind == "motion":
+        # Each motion sample is a whole repetition, so far fewer are needed than static frames.
+        target_samples = max(5, min(30, int(data.get("target_samples", 10))))
+    else:
+        target_samples = max(20, min(120, int(data.get("target_samples", 50))))
 
     if not label:
         return {"success": False, "message": "Missing label"}
+    if label == BACKGROUND_LABEL:
+        return {"success": False, "message": "Reserved label"}
     if action not in _supported_actions():
         return {"success": False, "message": "Unsupported action"}
 
     state.is_control_active = False
+    publish_frame_config()
     state.mode = "RECORDING"
     state.recording_active = True
+    state.recording_kind = kind
+    state.recording_source = source_id
     state.recording_label = label
     state.recording_action = action
     state.recording_emoji = emoji
     state.recording_target = target_samples
     state.recording_samples = []
-    state.recording_message = f"Recording started for '{label}'. Keep your gesture visible and vary angles."
+    state.motion_segmenter.reset()
+    if kind == "motion":
+        state.recording_message = (
+            f"Recording started for '{label}'. Perform the motion {target_samples} times, "
+            "pausing briefly between repetitions."
+        )
+    elif kind == "two_hand":
+        state.recording_message = (
+            f"Recording started for '{label}'. Keep both hands visible and vary angles."
+        )
+    else:
+        state.recording_message = f"Recording started for '{label}'. Keep your gesture visible and vary angles."
+    _publish_recording()
 
     return {
         "success": True,
@@ -710,25 +1534,192 @@ async def start_recording_gesture(data: dict):
     }
 
 
-@app.post("/api/upload_gesture_image")
-async def upload_gesture_image(data: dict):
+@app.post("/api/start_recording_background")
+async def start_recording_background(data: dict):
+    not_ready = _backend_not_ready_message()
+    if not_ready:
+        return {"success": False, "message": not_ready}
+    if state.recording_active:
+        return {"success": False, "message": "A recording session is already active"}
+
+    source_id = str(data.get("source", DEFAULT_SOURCE_ID)).strip()
+    if not _has_source(source_id):
+        return {"success": False, "message": f"Unknown source: {source_id}"}
+    target_samples = max(20, min(300, int(data.get("target_samples", 100))))
+
+    state.is_control_active = False
+    publish_frame_config()
+    state.mode = "RECORDING"
+    state.recording_active = True
+    state.recording_kind = "background"
+    state.recording_source = source_id
+    state.recording_label = BACKGROUND_LABEL
+    state.recording_action = ""
+    state.recording_emoji = ""
+    state.recording_target = target_samples
+    state.recording_samples = []
+    state.motion_segmenter.reset()
+    state.recording_message = (
+        "Recording background. Move your hands naturally without making any gesture: "
+        "rest them, type, reach for the mouse."
+    )
+    _publish_recording()
+
+    return {
+        "success": True,
+        "message": state.recording_message,
+        **_recording_progress_payload(),
+    }
+
+
+@app.post("/api/clear_background")
+async def clear_background():
+    if state.recording_active:
+        return {"success": False, "message": "Cannot clear while recording"}
+    removed = _remove_samples_by_label(BACKGROUND_LABEL)
+    if not removed:
+        return {"success": True, "removed": 0, "message": "No background samples"}
+
+    save_training_dataset()
+    if not state.dataset:
+        _reset_model_state()
+        return {"success": True, "removed": removed, "message": "Removed background samples. Model is now untrained."}
+    try:
+        message = _train_current_dataset()
+        save_model()
+    except Exception as e:
+        message = f"Retraining failed: {e}"
+    return {"success": True, "removed": removed, "message": f"Removed {removed} background samples. {message}"}
+
+
+def _append_static_samples(label, action, emoji, samples):
+    # Adds single-hand samples for `label` and persists them; returns how many old samples
+    # were dropped. Retraining is left to the caller.
+    removed = 0
+    if state.gesture_kinds.get(label, "static") != "static":
+        removed += _remove_samples_by_label(label)
+
+    state.dataset.append(samples, label)
+
+    # Upsert gesture config by action: one gesture per action.
+    replaced_label = _upsert_registry_gesture(label, action, emoji, "static")
+    _remove_motion_templates_by_label(label)
+    # Replace old mapping data for that action to avoid stale class predictions.
+    if replaced_label and replaced_label != label:
+        removed += _remove_samples_by_label(replaced_label)
+        removed += _remove_motion_templates_by_label(replaced_label)
+
+    build_runtime_maps_from_registry()
+    save_registry()
+    save_training_dataset()
+    save_motion_templates()
+    return removed
+
+
+def _import_request_error(label, action, path):
+    if not label:
+        return "Missing label"
+    if label == BACKGROUND_LABEL:
+        return "Reserved label"
+    if action not in _supported_actions():
+        return "Unsupported action"
+    if not path:
+        return "Missing path"
+    if not Path(path).exists():
+        return f"Path not found: {path}"
+    return ""
+
+
+def _commit_imported_samples(label, action, emoji, extracted):
+    stats = {key: extracted[key] for key in ("frames", "hands", "seconds", "fps", "workers")}
+    existing = state.dataset.samples_for(label)
+    samples = ingest.dedupe_samples(extracted["samples"], existing, RECORDING_NOVELTY_DISTANCE)
+    if not samples:
+        return {
+            "success": False,
+            "message": f"No new hand samples found ({extracted['hands']} hands in {extracted['frames']} frames)",
+            "count": 0,
+            **stats,
+        }
+
+    removed = _append_static_samples(label, action, emoji, samples)
+    try:
+        train_message = _train_current_dataset()
+        save_model()
+    except Exception as e:
+        train_message = f"Retraining failed: {e}"
+
+    return {
+        "success": True,
+        "message": f"Imported {len(samples)} samples for '{label}'. {train_message}",
+        "label": label,
+        "count": len(samples),
+        "removed_replaced_samples": removed,
+        **stats,
+    }
+
+
+def import_gesture_source(path, label, action, emoji="", stride=1, workers=None):
+    # Blocking variant used by the `ingest.py` CLI when the server is not running.
+    label = str(label).strip().lower()
+    action = str(action).strip().upper()
+    error = _import_request_error(label, action, path)
+    if error:
+        return {"success": False, "message": error}
+    try:
+        extracted = ingest.extract_landmarks(path, stride, workers)
+    except (ValueError, OSError) as e:
+        return {"success": False, "message": str(e)}
+    return _commit_imported_samples(label, action, str(emoji).strip(), extracted)
+
+
+@app.post("/api/import_gesture_data")
+async def import_gesture_data(data: dict):
+    not_ready = _backend_not_ready_message()
+    if not_ready:
+        return {"success": False, "message": not_ready}
+    if state.recording_active:
+        return {"success": False, "message": "Cannot import while recording gesture samples"}
+
     label = str(data.get("label", "")).strip().lower()
     action = str(data.get("action", "")).strip().upper()
     emoji = str(data.get("emoji", "")).strip()
-    image_data = data.get("image", "")
-    augment_count = int(data.get("augment_count", 48))
+    path = str(data.get("path", "")).strip()
+    stride = max(1, min(30, int(data.get("stride", 1))))
+    workers = data.get("workers")
+    workers = max(1, int(workers)) if workers else None
+
+    error = _import_request_error(label, action, path)
+    if error:
+        return {"success": False, "message": error}
+
+    # Decoding and landmark extraction run in worker processes; the event loop keeps serving
+    # the live feed meanwhile. The dataset is only touched back on the loop.
+    try:
+        extracted = await asyncio.to_thread(ingest.extract_landmarks, path, stride, workers)
+    except (ValueError, OSError) as e:
+        return {"success": False, "message": str(e)}
 
+    state.mode = "TRAINING"
+    try:
+        return _commit_imported_samples(label, action, emoji, extracted)
+    finally:
+        state.mode = "IDLE"
+
+
+def _upload_request_error(label, action):
     if not label:
-        return {"success": False, "message": "Missing label"}
+        return "Missing label"
+    if label == BACKGROUND_LABEL:
+        return "Reserved label"
     if action not in _supported_actions():
-        return {"success": False, "message": "Unsupported action"}
-    if not image_data:
-        return {"success": False, "message": "Missing image"}
+        return "Unsupported action"
+    return ""
 
-    frame = _decode_base64_image(image_data)
-    if frame is None:
-        return {"success": False, "message": "Invalid image data"}
 
+def _gesture_samples_from_frame(frame, requested_count):
+    # Landmarks from one uploaded image plus augmented variants. Returns a dict with
+    # `samples` (None when no hand was found) and the quality assessment.
     hand_crop_payload = _extract_hand_crop(frame)
     quality = _assess_image_quality(frame, hand_crop_payload)
     quality_warning = None
@@ -738,26 +1729,22 @@ async def upload_gesture_image(data: dict):
 
     working_frame = hand_crop_payload["crop"] if hand_crop_payload else frame
     _, landmarks, _ = tracker.process_frame(working_frame)
-    if not landmarks:
+    if landmarks is None:
         # Fallback to full frame once before rejecting.
         _, landmarks, _ = tracker.process_frame(frame)
-        if not landmarks:
-            return {
-                "success": False,
-                "message": quality_warning or "No hand detected in image",
-                "quality_score": quality["score"],
-                "quality_details": quality["details"],
-            }
+        if landmarks is None:
+            return {"samples": None, "quality": quality, "quality_warning": quality_warning}
+
+    if requested_count <= 1:
+        return {"samples": [landmarks], "quality": quality, "quality_warning": quality_warning}
 
-    # Cap augmentation count to prevent overfitting from one captured image.
-    requested_count = max(8, min(40, augment_count))
     frame_variants = _augment_frame_variants(working_frame, requested_count)
     samples = []
     base_landmarks = landmarks
 
     for candidate in frame_variants:
         _, aug_landmarks, _ = tracker.process_frame(candidate)
-        if not aug_landmarks:
+        if aug_landmarks is None:
             continue
         # Keep only meaningful but realistic variations.
         dist_from_base = _landmark_distance(base_landmarks, aug_landmarks)
@@ -773,42 +1760,32 @@ async def upload_gesture_image(data: dict):
     min_target = max(10, requested_count // 2)
     if len(samples) < min_target:
         needed = requested_count - len(samples)
-        for lm in _augment_landmarks(landmarks, max(1, needed)):
-            if any(_landmark_distance(existing, lm) < 0.015 for existing in samples):
-                continue
-            samples.append(lm)
-            if len(samples) >= requested_count:
-                break
+        variants = augment.augment_landmarks(landmarks, max(1, needed))
+        variants = augment.dedupe(variants, 0.015, reference=samples)
+        samples.extend(variants[:needed])
 
-    for sample in samples:
-        state.training_data.append(sample)
-        state.training_labels.append(label)
+    return {"samples": samples, "quality": quality, "quality_warning": quality_warning}
 
-    replaced_label = None
-    for existing in state.gesture_registry:
-        if str(existing.get("action", "")).upper() == action:
-            replaced_label = str(existing.get("label", "")).strip().lower()
-            break
 
-    # Upsert gesture config by action: one gesture per action.
-    state.gesture_registry = [g for g in state.gesture_registry if str(g.get("action", "")).upper() != action]
-    state.gesture_registry.append(
-        {
-            "id": f"g_{len(state.gesture_registry) + 1}",
-            "label": label,
-            "action": action,
-            "emoji": emoji,
-            "threshold": state.default_threshold,
+def _upload_gesture_frame(label, action, emoji, frame, augment_count):
+    # Cap augmentation count to prevent overfitting from one captured image.
+    requested_count = max(8, min(40, augment_count))
+    if is_hand_invariant(state.feature_set):
+        # Most variants differ in hand roll, which invariant features ignore.
+        requested_count = INVARIANT_UPLOAD_SAMPLES
+    result = _gesture_samples_from_frame(frame, requested_count)
+    quality = result["quality"]
+    quality_warning = result["quality_warning"]
+    samples = result["samples"]
+    if samples is None:
+        return {
+            "success": False,
+            "message": quality_warning or "No hand detected in image",
+            "quality_score": quality["score"],
+            "quality_details": quality["details"],
         }
-    )
-    # Replace old mapping data for that action to avoid stale class predictions.
-    removed_for_old_label = 0
-    if replaced_label and replaced_label != label:
-        removed_for_old_label = _remove_samples_by_label(replaced_label)
 
-    build_runtime_maps_from_registry()
-    save_registry()
-    save_training_dataset()
+    removed_for_old_label = _append_static_samples(label, action, emoji, samples)
 
     return {
         "success": True,
@@ -823,8 +1800,125 @@ async def upload_gesture_image(data: dict):
     }
 
 
+@app.post("/api/upload_gesture_image")
+async def upload_gesture_image(data: dict):
+    not_ready = _backend_not_ready_message()
+    if not_ready:
+        return {"success": False, "message": not_ready}
+
+    label = str(data.get("label", "")).strip().lower()
+    action = str(data.get("action", "")).strip().upper()
+    emoji = str(data.get("emoji", "")).strip()
+    image_data = data.get("image", "")
+    augment_count = int(data.get("augment_count", 48))
+
+    error = _upload_request_error(label, action)
+    if error:
+        return {"success": False, "message": error}
+    if not image_data:
+        return {"success": False, "message": "Missing image"}
+
+    frame = _decode_base64_image(image_data)
+    if frame is None:
+        return {"success": False, "message": "Invalid image data"}
+
+    return _upload_gesture_frame(label, action, emoji, frame, augment_count)
+
+
+@app.post("/api/upload_gesture_image/binary")
+async def upload_gesture_image_binary(request: Request):
+    not_ready = _backend_not_ready_message()
+    if not_ready:
+        return {"success": False, "message": not_ready}
+
+    fields, images = await _read_binary_upload(request)
+    label = str(fields.get("label", "")).strip().lower()
+    action = str(fields.get("action", "")).strip().upper()
+    emoji = str(fields.get("emoji", "")).strip()
+    augment_count = int(fields.get("augment_count", 48))
+
+    error = _upload_request_error(label, action)
+    if error:
+        return {"success": False, "message": error}
+    if len(images) != 1:
+        return {"success": False, "message": "Expected exactly one image"}
+
+    frame = _decode_image_bytes(images[0])
+    if frame is None:
+        return {"success": False, "message": "Invalid image data"}
+
+    return _upload_gesture_frame(label, action, emoji, frame, augment_count)
+
+
+@app.post("/api/upload_gesture_images")
+async def upload_gesture_images(request: Request):
+    not_ready = _backend_not_ready_message()
+    if not_ready:
+        return {"success": False, "message": not_ready}
+
+    fields, images = await _read_binary_upload(request)
+    label = str(fields.get("label", "")).strip().lower()
+    action = str(fields.get("action", "")).strip().upper()
+    emoji = str(fields.get("emoji", "")).strip()
+    # Several photos already vary the pose, so each one gets far less augmentation by default.
+    requested_count = max(1, min(40, int(fields.get("augment_count", 1))))
+
+    error = _upload_request_error(label, action)
+    if error:
+        return {"success": False, "message": error}
+    if not images:
+        return {"success": False, "message": "Missing images"}
+
+    results = []
+    collected = []
+    for index, raw in enumerate(images):
+        frame = _decode_image_bytes(raw)
+        if frame is None:
+            results.append({"index": index, "count": 0, "error": "Invalid image data"})
+            continue
+        result = _gesture_samples_from_frame(frame, requested_count)
+        if result["samples"] is None:
+            results.append(
+                {
+                    "index": index,
+                    "count": 0,
+                    "quality_score": result["quality"]["score"],
+                    "error": result["quality_warning"] or "No hand detected in image",
+                }
+            )
+            continue
+        collected.extend(result["samples"])
+        results.append(
+            {
+                "index": index,
+                "count": len(result["samples"]),
+                "quality_score": result["quality"]["score"],
+                "quality_warning": result["quality_warning"],
+            }
+        )
+
+    # One dedupe across the whole batch and one dataset write, instead of one per image.
+    samples = ingest.dedupe_samples(collected, min_distance=RECORDING_NOVELTY_DISTANCE)
+    if not samples:
+        return {"success": False, "message": "No hand detected in any image", "images": results}
+
+    removed = _append_static_samples(label, action, emoji, samples)
+    return {
+        "success": True,
+        "message": f"Added {len(samples)} samples for '{label}' from {len(images)} images",
+        "label": label,
+        "count": len(samples),
+        "images": results,
+        "removed_replaced_samples": removed,
+    }
+
+
 @app.post("/api/assess_gesture_image")
 async def assess_gesture_image(data: dict):
+    not_ready = _backend_not_ready_message()
+    if not_ready:
+        return {"ok": False, "message": not_ready}
+
     image_data = data.get("image", "")
     if not image_data:
         return {"ok": False, "message": "Missing image"}
@@ -833,6 +1927,27 @@ async def assess_gesture_image(data: dict):
     if frame is None:
         return {"ok": False, "message": "Invalid image data"}
 
+    return _assess_frame(frame)
+
+
+@app.post("/api/assess_gesture_image/binary")
+async def assess_gesture_image_binary(request: Request):
+    not_ready = _backend_not_ready_message()
+    if not_ready:
+        return {"ok": False, "message": not_ready}
+
+    _, images = await _read_binary_upload(request)
+    if len(images) != 1:
+        return {"ok": False, "message": "Expected exactly one image"}
+
+    frame = _decode_image_bytes(images[0])
+    if frame is None:
+        return {"ok": False, "message": "Invalid image data"}
+
+    return _assess_frame(frame)
+
+
+def _assess_frame(frame):
     hand_crop_payload = _extract_hand_crop(frame)
     result = _assess_image_quality(frame, hand_crop_payload)
     return {
@@ -845,7 +1960,10 @@ async def assess_gesture_image(data: dict):
 
 @app.post("/api/train")
 async def train_model():
-    if not state.training_data:
+    not_ready = _backend_not_ready_message()
+    if not_ready:
+        return {"success": False, "message": not_ready}
+    if not state.dataset:
         return {"success": False, "message": "No data"}
 
     state.mode = "TRAINING"
@@ -860,6 +1978,25 @@ async def train_model():
         state.mode = "IDLE"
 
 
+@app.get("/api/dataset_report")
+async def get_dataset_report(duplicate_distance: float = RECORDING_NOVELTY_DISTANCE):
+    if not state.dataset:
+        return {"success": False, "message": "No data"}
+
+    samples = state.dataset.samples
+    labels = state.dataset.labels()
+    duplicate_distance = max(0.0, min(0.5, float(duplicate_distance)))
+    # Quadratic in the sample count, so it runs off the event loop on a snapshot.
+    report = await asyncio.to_thread(dataset_health.dataset_report, samples, labels, duplicate_distance)
+    return {
+        "success": True,
+        **report,
+        "balance_enabled": state.balance_classes,
+        # Every label is brought to this size when balancing is enabled.
+        "balance_target": state.balance_target or report["summary"]["median_count"],
+    }
+
+
 @app.get("/api/gestures")
 async def get_gestures():
     return {
@@ -870,24 +2007,35 @@ async def get_gestures():
 
 @app.post("/api/gestures")
 async def save_gestures(data: dict):
+    not_ready = _backend_not_ready_message()
+    if not_ready:
+        # The dataset may still be loading; rewriting the registry now would race the boot prune.
+        return {"success": False, "message": not_ready}
+
     gestures = data.get("gestures", [])
     if not isinstance(gestures, list):
         return {"success": False, "message": "Invalid gestures payload"}
 
     # One gesture per action, last wins.
     old_registry = list(state.gesture_registry)
+    old_kind_by_action = {
+        str(item.get("action", "")).strip().upper(): _gesture_kind(item) for item in old_registry
+    }
     dedup = {}
     for item in gestures:
         action = str(item.get("action", "")).strip().upper()
         label = str(item.get("label", "")).strip().lower()
         if action not in _supported_actions() or not label:
             continue
+        # Clients that do not know about gesture kinds keep the kind the gesture was recorded as.
+        kind = _gesture_kind(item) if "kind" in item else old_kind_by_action.get(action, "static")
         dedup[action] = {
             "id": str(item.get("id", f"g_{len(dedup) + 1}")),
             "label": label,
             "action": action,
             "emoji": str(item.get("emoji", "")).strip(),
             "threshold": max(0.55, min(0.98, float(item.get("threshold", state.default_threshold)))),
+            "kind": kind,
         }
 
     new_registry = list(dedup.values())
@@ -902,25 +2050,33 @@ async def save_gestures(data: dict):
         for item in new_registry
     }
 
-    relabeled = 0
-    relabeled_labels = []
-    for sample_label in state.training_labels:
-        old_label = str(sample_label).strip().lower()
-        action = old_label_to_action.get(old_label)
+    def renamed(old_label):
+        base_label = _base_label(old_label)
+        action = old_label_to_action.get(base_label)
         if action and action in new_action_to_label:
-            new_label = new_action_to_label[action]
-            if new_label != old_label:
-                relabeled += 1
-            relabeled_labels.append(new_label)
-        else:
-            relabeled_labels.append(old_label)
-    state.training_labels = relabeled_labels
+            # Two-hand samples keep their ":left"/":right" suffix under the new label.
+            return new_action_to_label[action] + old_label[len(base_label):]
+        return old_label
+
+    relabeled = state.dataset.relabel(renamed)
+
+    motion_entries = motion_model.to_entries()
+    motion_relabeled = 0
+    for entry in motion_entries:
+        action = old_label_to_action.get(entry["label"])
+        if action and action in new_action_to_label and new_action_to_label[action] != entry["label"]:
+            entry["label"] = new_action_to_label[action]
+            motion_relabeled += 1
+    if motion_relabeled:
+        _set_motion_templates(motion_entries)
 
     state.gesture_registry = new_registry
     build_runtime_maps_from_registry()
     removed = _prune_dataset_to_registry()
+    motion_removed = _prune_motion_templates_to_registry()
     save_registry()
     save_training_dataset()
+    save_motion_templates()
 
     auto_retrained = False
     retrain_message = "No retraining needed."
@@ -931,15 +2087,15 @@ async def save_gestures(data: dict):
         return {
             "success": True,
             "gestures": state.gesture_registry,
-            "pruned_samples": removed,
-            "relabeled_samples": relabeled,
+            "pruned_samples": removed + motion_removed,
+            "relabeled_samples": relabeled + motion_relabeled,
             "auto_retrained": False,
             "retrain_message": retrain_message,
         }
 
     # If dataset changed due to removal or relabeling, retrain automatically.
     if removed > 0 or relabeled > 0:
-        if state.training_data:
+        if state.dataset:
             try:
                 retrain_message = _train_current_dataset()
                 save_model()
@@ -954,8 +2110,8 @@ async def save_gestures(data: dict):
     return {
         "success": True,
         "gestures": state.gesture_registry,
-        "pruned_samples": removed,
-        "relabeled_samples": relabeled,
+        "pruned_samples": removed + motion_removed,
+        "relabeled_samples": relabeled + motion_relabeled,
         "auto_retrained": auto_retrained,
         "retrain_message": retrain_message,
     }
@@ -963,18 +2119,95 @@ async def save_gestures(data: dict):
 
 @app.post("/api/update_prediction_config")
 async def update_prediction_config(data: dict):
+    global tracker
+    # Warm-up loads the model and compiles its table on another thread; a table compiled here
+    # at the same time could be published after it, from the model it replaces.
+    if state.backend_status == "warming":
+        return {"status": "error", "message": _backend_not_ready_message()}
+    # Fields with a fixed set of values are checked before anything is applied, so a rejected
+    # update leaves the state, the published frame config and runtime.json as they were.
+    smoothing_mode = str(data.get("smoothing_mode", state.smoothing_mode)).strip().lower()
+    if smoothing_mode not in SMOOTHING_MODES:
+        return {"status": "error", "message": f"Unsupported smoothing mode: {smoothing_mode}"}
+    input_backend = str(data.get("input_backend", state.input_backend)).strip().lower()
+    if input_backend not in BACKEND_NAMES:
+        return {"status": "error", "message": f"Unsupported input backend: {input_backend}"}
+    feature_set = str(data.get("feature_set", state.feature_set)).strip().lower()
+    if feature_set not in FEATURE_SETS:
+        return {"status": "error", "message": f"Unsupported feature set: {feature_set}"}
+    # Opening the input backend is the one change that can still fail, so it goes first.
+    if input_backend != state.input_backend:
+        controller.set_backend(input_backend)
+        try:
+            await asyncio.to_thread(controller.warm_up)
+        except Exception as e:
+            controller.set_backend(state.input_backend)
+            return {"status": "error", "message": f"Input backend '{input_backend}' unavailable: {e}"}
+        state.input_backend = input_backend
+
     if "default_threshold" in data:
         state.default_threshold = max(0.55, min(0.98, float(data["default_threshold"])))
     if "required_consecutive_frames" in data:
         state.required_consecutive_frames = max(1, min(10, int(data["required_consecutive_frames"])))
     if "unknown_rejection_distance" in data:
         state.unknown_rejection_distance = max(0.0, min(2.0, float(data["unknown_rejection_distance"])))
+    if "calibrated_rejection" in data:
+        state.calibrated_rejection = bool(data["calibrated_rejection"])
+    state.smoothing_mode = smoothing_mode
+    if "evidence_decay" in data:
+        state.evidence_decay = max(0.30, min(0.95, float(data["evidence_decay"])))
+    if "evidence_threshold" in data:
+        state.evidence_threshold = max(0.5, min(5.0, float(data["evidence_threshold"])))
+    if "max_hands" in data:
+        max_hands = max(1, min(2, int(data["max_hands"])))
+        if max_hands != state.max_hands:
+            state.max_hands = max_hands
+            if tracker is not None:
+                tracker = await asyncio.to_thread(HandTracker, max_hands)
+            for source in sources.values():
+                source.request_tracker_rebuild()
+    if "balance_classes" in data:
+        state.balance_classes = bool(data["balance_classes"])
+    if "balance_target" in data:
+        state.balance_target = max(0, min(5000, int(data["balance_target"])))
+    if "camera_keep_alive" in data:
+        state.camera_keep_alive = max(0.0, min(300.0, float(data["camera_keep_alive"])))
+    if isinstance(data.get("camera"), dict):
+        camera_settings = capture_settings({**state.camera_settings, **data["camera"]})
+        if camera_settings != state.camera_settings:
+            state.camera_settings = camera_settings
+            for source in sources.values():
+                source.set_capture_settings(camera_settings)
+    if "inference_workers" in data:
+        state.inference_workers = max(0, min(8, int(data["inference_workers"])))
+        for source in sources.values():
+            source.set_workers(state.inference_workers)
+    if isinstance(data.get("tracker_quality"), dict):
+        _set_tracker_quality(data["tracker_quality"])
+    if isinstance(data.get("landmark_filter"), dict):
+        state.landmark_filter = filter_settings({**state.landmark_filter, **data["landmark_filter"]})
+    state.feature_set = feature_set
+    compile_gesture_table()
     save_runtime_config()
     return {
         "status": "success",
         "default_threshold": state.default_threshold,
         "required_consecutive_frames": state.required_consecutive_frames,
         "unknown_rejection_distance": state.unknown_rejection_distance,
+        "calibrated_rejection": state.calibrated_rejection,
+        "smoothing_mode": state.smoothing_mode,
+        "evidence_decay": state.evidence_decay,
+        "evidence_threshold": state.evidence_threshold,
+        "max_hands": state.max_hands,
+        "balance_classes": state.balance_classes,
+        "balance_target": state.balance_target,
+        "input_backend": state.input_backend,
+        "camera_keep_alive": state.camera_keep_alive,
+        "camera": state.camera_settings,
+        "inference_workers": state.inference_workers,
+        "tracker_quality": _tracker_quality(),
+        "landmark_filter": state.landmark_filter,
+        "feature_set": state.feature_set,
     }
 
 
@@ -983,31 +2216,115 @@ async def model_status():
     return {
         "is_trained": model.is_trained,
         "classes": model.classes,
-        "training_samples": len(state.training_data),
+        "training_samples": len(state.dataset),
         "validation_accuracy": model.validation_accuracy,
         "last_trained_at": model.last_trained_at,
+        "rejection_radii": model.rejection_radii,
+        "background_samples": state.dataset.counts().get(BACKGROUND_LABEL, 0),
         "default_threshold": state.default_threshold,
         "required_consecutive_frames": state.required_consecutive_frames,
         "unknown_rejection_distance": state.unknown_rejection_distance,
+        "calibrated_rejection": state.calibrated_rejection,
+        "smoothing_mode": state.smoothing_mode,
+        "evidence_decay": state.evidence_decay,
+        "evidence_threshold": state.evidence_threshold,
+        "max_hands": state.max_hands,
+        "balance_classes": state.balance_classes,
+        "balance_target": state.balance_target,
+        "camera_keep_alive": state.camera_keep_alive,
+        "camera": state.camera_settings,
+        "inference_workers": state.inference_workers,
+        "tracker_quality": _tracker_quality(),
+        "landmark_filter": state.landmark_filter,
+        "feature_set": state.feature_set,
+        "model_feature_set": model.feature_set if model.is_trained else None,
         "monitoring_active": state.is_control_active,
         "gestures_count": len(state.gesture_registry),
+        "motion_classes": motion_model.classes,
+        "motion_templates": len(motion_model.labels),
+        "backend_status": state.backend_status,
+        "backend_error": state.backend_error,
+        "startup_timings": state.startup_timings,
+        "input": controller.input_status(),
         **_recording_progress_payload(),
     }
 
 
-# Boot sequence
-load_runtime_config()
-load_registry()
-load_training_dataset()
-pruned_on_boot = _prune_dataset_to_registry()
-if pruned_on_boot > 0:
-    save_training_dataset()
-    print(f">>> Pruned {pruned_on_boot} stale samples not present in gesture registry")
-load_model()
-if pruned_on_boot > 0 and state.training_data:
+@app.get("/api/health")
+async def health():
+    return {
+        "status": state.backend_status,
+        "error": state.backend_error,
+        "startup_timings": state.startup_timings,
+    }
+
+
+def _timed_phase(name, fn):
+    start = time.perf_counter()
+    try:
+        return fn()
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        state.startup_timings[name] = round(elapsed_ms, 1)
+        print(f">>> Startup phase '{name}' took {elapsed_ms:.1f} ms")
+
+
+def _load_config_files():
+    load_runtime_config()
+    load_registry()
+    load_sources()
+
+
+def _load_and_prune_dataset():
+    load_training_dataset()
+    pruned = _prune_dataset_to_registry()
+    if pruned > 0:
+        save_training_dataset()
+        print(f">>> Pruned {pruned} stale samples not present in gesture registry")
+    load_motion_templates()
+    if _prune_motion_templates_to_registry() > 0:
+        save_motion_templates()
+    return pruned
+
+
+def _warm_up_input():
+    try:
+        controller.warm_up()
+    except Exception as e:
+        # Not fatal: the API and camera work without it, only action execution is affected.
+        print(f">>> Input control unavailable: {e}")
+
+
+def _retrain_after_boot_prune():
     try:
         msg = _train_current_dataset()
         save_model()
         print(f">>> Auto-retrained on boot after prune: {msg}")
     except Exception as e:
         print(f">>> Auto-retrain on boot failed: {e}")
+
+
+def _warm_up_backend():
+    global tracker
+    pruned = _timed_phase("dataset", _load_and_prune_dataset)
+    _timed_phase("model", load_model)
+    tracker = _timed_phase("tracker", lambda: HandTracker(state.max_hands))
+    _timed_phase("input", _warm_up_input)
+    if pruned > 0 and state.dataset:
+        _timed_phase("retrain", _retrain_after_boot_prune)
+
+
+async def warm_up_backend():
+    start = time.perf_counter()
+    try:
+        await asyncio.to_thread(_warm_up_backend)
+        state.backend_status = "ready"
+    except Exception as e:
+        state.backend_status = "failed"
+        state.backend_error = str(e)
+        print(f">>> Backend warm-up failed: {e}")
+    finally:
+        events.publish("backend", status=state.backend_status, error=state.backend_error)
+        state.startup_timings["warmup_total"] = round((time.perf_counter() - start) * 1000.0, 1)
+        print(f">>> Backend {state.backend_status} after {state.startup_timings['warmup_total']:.1f} ms warm-up")
+        backend_warm.set()
@@ -0,0 +1,335 @@
+import time
+
+import numpy as np
+
+# Dynamic (motion) gestures: swipes, circles, pinch-zoom.
+#
+# Frames are kept as raw image-space landmarks (21, 3) in a ring buffer. A window of frames is
+# reduced to a trajectory of RESAMPLE_STEPS points with FEATURE_DIM features each: palm
+# displacement (x, y) and thumb-index aperture change, all in units of hand size so distance
+# to the camera does not matter. Trajectories are matched against recorded templates with DTW,
+# pruned by an LB_Keogh lower bound and computed for all surviving templates in one batch.
+
+PALM_POINTS = [0, 5, 9, 13, 17]
+RESAMPLE_STEPS = 16
+FEATURE_DIM = 3
+DTW_BAND = 2
+MIN_MOTION_PATH = 0.6
+MAX_FRAME_GAP_SECONDS = 0.25
+DEFAULT_MATCH_RADIUS = 1.2
+MIN_MATCH_RADIUS = 0.6
+AMBIGUITY_RATIO = 1.15
+MAX_QUERY_WINDOWS = 4
+
+
+def landmark_points(hand_landmarks):
+    # A MediaPipe landmark list from the server's tracker, or a (21, 3) array already
+    # supplied by a landmark client.
+    if isinstance(hand_landmarks, np.ndarray):
+        return hand_landmarks
+    return np.array([[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark], dtype=np.float32)
+
+
+def _hand_sizes(points):
+    return np.linalg.norm(points[:, 9, :2] - points[:, 0, :2], axis=1)
+
+
+def _resample(values, times, steps=RESAMPLE_STEPS):
+    span = float(times[-1] - times[0])
+    if span <= 1e-6:
+        positions = np.linspace(0.0, 1.0, len(values))
+    else:
+        positions = (times - times[0]) / span
+    targets = np.linspace(0.0, 1.0, steps)
+    return np.stack([np.interp(targets, positions, values[:, d]) for d in range(values.shape[1])], axis=1)
+
+
+def _raw_trajectory(points):
+    size = max(float(np.median(_hand_sizes(points))), 1e-3)
+    palm = points[:, PALM_POINTS, :2].mean(axis=1)
+    displacement = (palm - palm[0]) / size
+    aperture = np.linalg.norm(points[:, 4, :2] - points[:, 8, :2], axis=1) / size
+    return np.column_stack([displacement, aperture - aperture[0]])
+
+
+def _path_length(raw):
+    if len(raw) < 2:
+        return 0.0
+    return float(np.sum(np.linalg.norm(np.diff(raw, axis=0), axis=1)))
+
+
+def motion_path_length(points):
+    return _path_length(_raw_trajectory(points))
+
+
+def trajectory_features(points, times):
+    return _resample(_raw_trajectory(points), np.asarray(times, dtype=np.float64)).astype(np.float32)
+
+
+def _keogh_envelope(query, band):
+    # Running max/min over a +-band window, edge-padded so every step sees a full window.
+    padded = np.pad(query, ((band, band), (0, 0)), mode="edge")
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * band + 1, axis=0)
+    return windows.max(axis=2), windows.min(axis=2)
+
+
+def lb_keogh(query, templates, band=DTW_BAND):
+    upper, lower = _keogh_envelope(query, band)
+    above = np.clip(templates - upper, 0.0, None)
+    below = np.clip(lower - templates, 0.0, None)
+    return np.sqrt(np.sum(above * above + below * below, axis=(1, 2)))
+
+
+def _band_diagonals(steps, band):
+    # Flat indices of the Sakoe-Chiba band cells grouped by anti-diagonal. Every cell on a
+    # diagonal only depends on the two previous diagonals, so each diagonal is one vectorised
+    # update across all templates.
+    width = steps + 1
+    diagonals = []
+    for d in range(2, 2 * steps + 1):
+        i = np.arange(max(1, d - steps), min(steps, d - 1) + 1)
+        j = d - i
+        keep = np.abs(i - j) <= band
+        i, j = i[keep], j[keep]
+        if len(i):
+            diagonals.append(
+                (
+                    i * width + j,
+                    (i - 1) * width + j,
+                    i * width + j - 1,
+                    (i - 1) * width + j - 1,
+                    (i - 1) * steps + j - 1,
+                )
+            )
+    return diagonals
+
+
+_DIAGONALS = _band_diagonals(RESAMPLE_STEPS, DTW_BAND)
+
+
+def dtw_batch(query, templates, band=DTW_BAND):
+    # templates: (K, S, D); query: (S, D) shared by all templates, or (K, S, D) for K pairs.
+    # Returns the banded DTW distance for each of the K pairs.
+    count, steps = templates.shape[0], templates.shape[1]
+    queries = query if query.ndim == 3 else query[None]
+    diagonals = _DIAGONALS if (steps, band) == (RESAMPLE_STEPS, DTW_BAND) else _band_diagonals(steps, band)
+    # Cell-major layout: each gather below reads whole contiguous rows of K values.
+    cost = np.sum((templates[:, :, None, :] - queries[:, None, :, :]) ** 2, axis=3).reshape(count, -1).T
+    acc = np.full(((steps + 1) * (steps + 1), count), np.inf, dtype=np.float64)
+    acc[0] = 0.0
+    for cell, up, left, diag, cost_cell in diagonals:
+        acc[cell] = cost[cost_cell] + np.minimum(np.minimum(acc[up], acc[left]), acc[diag])
+    return np.sqrt(acc[-1])
+
+
+class MotionClassifier:
+    def __init__(self):
+        self.templates = np.zeros((0, RESAMPLE_STEPS, FEATURE_DIM), dtype=np.float32)
+        self.labels = []
+        self.durations = np.zeros(0, dtype=np.float32)
+        self.radii = {}
+
+    @property
+    def is_trained(self):
+        return len(self.labels) > 0
+
+    @property
+    def classes(self):
+        return sorted(set(self.labels))
+
+    def set_templates(self, entries):
+        entries = [e for e in entries if e.get("label") and e.get("points") is not None and len(e["points"])]
+        self.labels = [str(e["label"]).strip().lower() for e in entries]
+        if entries:
+            self.templates = np.array([e["points"] for e in entries], dtype=np.float32)
+        else:
+            self.templates = np.zeros((0, RESAMPLE_STEPS, FEATURE_DIM), dtype=np.float32)
+        self.durations = np.array([float(e.get("duration", 0.6)) for e in entries], dtype=np.float32)
+        self._compute_radii()
+
+    def to_entries(self):
+        return [
+            {"label": label, "duration": round(float(duration), 3), "points": points.tolist()}
+            for label, duration, points in zip(self.labels, self.durations, self.templates)
+        ]
+
+    def _compute_radii(self):
+        # Per-label match radius: twice the median distance from each template to its nearest
+        # same-label neighbour, so tight classes reject loosely similar motions.
+        self.radii = {}
+        for label in set(self.labels):
+            idx = np.array([i for i, l in enumerate(self.labels) if l == label])
+            if len(idx) < 2:
+                self.radii[label] = DEFAULT_MATCH_RADIUS
+                continue
+            nearest = []
+            for i in idx:
+                others = idx[idx != i]
+                nearest.append(float(np.min(dtw_batch(self.templates[i], self.templates[others]))))
+            self.radii[label] = max(MIN_MATCH_RADIUS, 2.0 * float(np.median(nearest)))
+
+    def query_durations(self):
+        if not len(self.durations):
+            return []
+        rounded = sorted(set(np.round(self.durations, 1).tolist()))
+        if len(rounded) > MAX_QUERY_WINDOWS:
+            picks = np.linspace(0, len(rounded) - 1, MAX_QUERY_WINDOWS).round().astype(int)
+            rounded = [rounded[i] for i in picks]
+        return [max(0.2, float(d)) for d in rounded]
+
+    def _candidates(self, query):
+        # DTW can never be larger than the Euclidean (diagonal) path, so the best DTW distance
+        # is at most the best Euclidean one. A template can only win, or be a runner-up close
+        # enough to make the match ambiguous (see _decide), if its LB_Keogh bound is below that
+        # times AMBIGUITY_RATIO; pruning the rest leaves the decision unchanged.
+        upper_bound = float(np.min(np.sqrt(np.sum((self.templates - query) ** 2, axis=(1, 2)))))
+        return np.flatnonzero(lb_keogh(query, self.templates) <= upper_bound * AMBIGUITY_RATIO + 1e-9)
+
+    def _decide(self, candidates, distances):
+        order = np.argsort(distances)
+        best_label = self.labels[candidates[order[0]]]
+        best_distance = float(distances[order[0]])
+        runner_up = next(
+            (float(distances[k]) for k in order[1:] if self.labels[candidates[k]] != best_label), None
+        )
+
+        radius = self.radii.get(best_label, DEFAULT_MATCH_RADIUS)
+        if best_distance > radius:
+            return "none", 0.0, best_distance
+        if runner_up is not None and runner_up < best_distance * AMBIGUITY_RATIO:
+            return "none", 0.0, best_distance
+        confidence = max(0.0, min(1.0, 1.0 - best_distance / (2.0 * radius)))
+        return best_label, confidence, best_distance
+
+    def match_queries(self, queries):
+        # Matches several query trajectories with a single batched DTW over all surviving
+        # (query, template) pairs. Returns (label, confidence, distance) per query; label is
+        # "none" when nothing is close enough.
+        if not self.is_trained or not queries:
+            return [("none", 0.0, None) for _ in queries]
+        candidate_sets = [self._candidates(query) for query in queries]
+        pair_queries = np.concatenate(
+            [np.repeat(query[None], len(cands), axis=0) for query, cands in zip(queries, candidate_sets)]
+        )
+        distances = dtw_batch(pair_queries, self.templates[np.concatenate(candidate_sets)])
+
+        results = []
+        offset = 0
+        for cands in candidate_sets:
+            results.append(self._decide(cands, distances[offset: offset + len(cands)]))
+            offset += len(cands)
+        return results
+
+    def match(self, buffer):
+        queries = []
+        for duration in self.query_durations():
+            points, times = buffer.window(duration)
+            if len(points) < 4:
+                continue
+            raw = _raw_trajectory(points)
+            if _path_length(raw) >= MIN_MOTION_PATH:
+                queries.append(_resample(raw, times).astype(np.float32))
+
+        result = ("none", 0.0, None)
+        for label, confidence, distance in self.match_queries(queries):
+            if label != "none" and confidence > result[1]:
+                result = (label, confidence, distance)
+        return result
+
+
+class LandmarkRingBuffer:
+    def __init__(self, capacity=48):
+        self.points = np.zeros((capacity, 21, 3), dtype=np.float32)
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.capacity = capacity
+        self.head = 0
+        self.count = 0
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def push(self, points, t=None):
+        t = time.perf_counter() if t is None else t
+        if self.count and t - self.times[(self.head - 1) % self.capacity] > MAX_FRAME_GAP_SECONDS:
+            # The hand was lost for a while; do not stitch separate motions together.
+            self.clear()
+        self.points[self.head] = points
+        self.times[self.head] = t
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def ordered(self):
+        idx = (np.arange(self.head - self.count, self.head)) % self.capacity
+        return self.points[idx], self.times[idx]
+
+    def window(self, seconds):
+        points, times = self.ordered()
+        if not len(times):
+            return points, times
+        keep = times >= times[-1] - seconds
+        return points[keep], times[keep]
+
+
+class MotionSegmenter:
+    # Cuts a continuous landmark stream into single gesture repetitions for recording: a
+    # segment starts when the palm moves faster than `start_speed` (hand sizes per second)
+    # and ends after `settle_frames` slow frames or when the hand is lost.
+
+    def __init__(self, start_speed=1.2, stop_speed=0.5, settle_frames=3, min_duration=0.2, max_duration=2.0):
+        self.start_speed = start_speed
+        self.stop_speed = stop_speed
+        self.settle_frames = settle_frames
+        self.min_duration = min_duration
+        self.max_duration = max_duration
+        self.reset()
+
+    def reset(self):
+        self.frames = []
+        self.moving = False
+        self.slow_frames = 0
+
+    def _speed(self, points, t):
+        if not self.frames:
+            return 0.0
+        prev_points, prev_t = self.frames[-1]
+        dt = max(1e-3, t - prev_t)
+        size = max(float(np.linalg.norm(points[9, :2] - points[0, :2])), 1e-3)
+        shift = np.linalg.norm(points[PALM_POINTS, :2].mean(axis=0) - prev_points[PALM_POINTS, :2].mean(axis=0))
+        return float(shift / size / dt)
+
+    def _finish(self):
+        frames = self.frames
+        self.reset()
+        if len(frames) < 4:
+            return None
+        points = np.stack([p for p, _ in frames])
+        times = np.array([t for _, t in frames])
+        duration = float(times[-1] - times[0])
+        if duration < self.min_duration or motion_path_length(points) < MIN_MOTION_PATH:
+            return None
+        return {"points": trajectory_features(points, times), "duration": duration}
+
+    def push(self, points, t=None):
+        # Returns a finished segment ({"points", "duration"}) or None.
+        t = time.perf_counter() if t is None else t
+        if points is None:
+            if self.moving:
+                return self._finish()
+            self.reset()
+            return None
+
+        speed = self._speed(points, t)
+        if not self.moving:
+            # Keep a couple of lead-in frames so the start of the motion is not clipped.
+            self.frames = (self.frames + [(points, t)])[-3:]
+            if speed >= self.start_speed:
+                self.moving = True
+                self.slow_frames = 0
+            return None
+
+        self.frames.append((points, t))
+        self.slow_frames = self.slow_frames + 1 if speed < self.stop_speed else 0
+        if self.slow_frames >= self.settle_frames or t - self.frames[0][1] >= self.max_duration:
+            return self._finish()
+        return None
@@ -0,0 +1,126 @@
+import time
+from collections import deque
+
+# Adaptive hand tracker quality. Each video source measures how long a frame takes to process
+# (hand detection plus encoding) and steps through QUALITY_LEVELS to keep that under the
+# configured target: down to a cheaper level when it runs over budget, back up when there is
+# plenty of headroom. Settings can also be pinned, which turns the adaptation off.
+#
+# The input scale is free to change. Model complexity and the confidences rebuild the
+# MediaPipe graph and restart tracking, so the ladder lowers the scale first.
+
+# From best to cheapest. Level 0 is the tracker's default configuration.
+QUALITY_LEVELS = (
+    {"model_complexity": 1, "input_scale": 1.0, "min_detection_confidence": 0.7, "min_tracking_confidence": 0.5},
+    {"model_complexity": 1, "input_scale": 0.75, "min_detection_confidence": 0.7, "min_tracking_confidence": 0.5},
+    {"model_complexity": 0, "input_scale": 0.75, "min_detection_confidence": 0.7, "min_tracking_confidence": 0.5},
+    {"model_complexity": 0, "input_scale": 0.5, "min_detection_confidence": 0.7, "min_tracking_confidence": 0.5},
+    # A lower tracking confidence keeps following a hand instead of re-running palm detection.
+    {"model_complexity": 0, "input_scale": 0.5, "min_detection_confidence": 0.7, "min_tracking_confidence": 0.3},
+)
+
+DEFAULT_TARGET_MS = 33.0
+# Frames to wait after a change before judging the new level (the EMA has to catch up, and a
+# rebuilt graph is slow on its first frames).
+SETTLE_FRAMES = 30
+EMA_ALPHA = 0.1
+OVER_BUDGET = 1.15
+HEADROOM = 0.6
+# A level that was left for running over budget is not tried again for this long.
+RETRY_SECONDS = 30.0
+
+
+def quality_settings(payload):
+    # Validated tracker settings; missing or invalid values come from level 0.
+    payload = payload if isinstance(payload, dict) else {}
+    settings = dict(QUALITY_LEVELS[0])
+    try:
+        settings["model_complexity"] = 1 if int(payload.get("model_complexity", settings["model_complexity"])) else 0
+    except (TypeError, ValueError):
+        pass
+    for key, low, high in (
+        ("input_scale", 0.25, 1.0),
+        ("min_detection_confidence", 0.1, 0.95),
+        ("min_tracking_confidence", 0.1, 0.95),
+    ):
+        try:
+            settings[key] = max(low, min(high, float(payload.get(key, settings[key]))))
+        except (TypeError, ValueError):
+            pass
+    return settings
+
+
+class QualityController:
+    def __init__(self, target_ms=DEFAULT_TARGET_MS, pinned=None):
+        self.target_ms = float(target_ms)
+        self.pinned = quality_settings(pinned) if pinned else None
+        self.level = 0
+        self.frame_ms = 0.0
+        self.decisions = deque(maxlen=20)
+        self._frames = 0
+        self._left_at = {}
+        # Set when settings change outside observe() (pinning, unpinning); the source thread
+        # picks them up on its next frame.
+        self._changed = self.pinned is not None
+
+    @property
+    def settings(self):
+        return self.pinned if self.pinned is not None else QUALITY_LEVELS[self.level]
+
+    def configure(self, target_ms=None, pinned=None):
+        # `pinned` is a settings dict to pin, or None to adapt automatically.
+        if target_ms is not None:
+            self.target_ms = float(target_ms)
+        pinned = quality_settings(pinned) if pinned else None
+        if pinned != self.pinned:
+            self.pinned = pinned
+            self._frames = 0
+            self._changed = True
+            self._decide(self.level, "pinned" if pinned else "unpinned")
+
+    def observe(self, frame_ms):
+        # Called with each frame's processing time. Returns the settings to apply when they
+        # change, otherwise None.
+        self.frame_ms = frame_ms if self._frames == 0 else self.frame_ms + EMA_ALPHA * (frame_ms - self.frame_ms)
+        self._frames += 1
+        if self._changed:
+            self._changed = False
+            return self.settings
+        if self.pinned is not None or self._frames < SETTLE_FRAMES:
+            return None
+
+        if self.frame_ms > self.target_ms * OVER_BUDGET and self.level < len(QUALITY_LEVELS) - 1:
+            self._left_at[self.level] = time.monotonic()
+            return self._step(self.level + 1, "over budget")
+        if self.frame_ms < self.target_ms * HEADROOM and self.level > 0:
+            left_at = self._left_at.get(self.level - 1)
+            if left_at is None or time.monotonic() - left_at > RETRY_SECONDS:
+                return self._step(self.level - 1, "headroom")
+        return None
+
+    def _step(self, level, reason):
+        self._decide(level, reason)
+        self.level = level
+        self._frames = 0
+        return self.settings
+
+    def _decide(self, level, reason):
+        self.decisions.append(
+            {
+                "time": round(time.time(), 3),
+                "from_level": self.level,
+                "to_level": level,
+                "reason": reason,
+                "frame_ms": round(self.frame_ms, 2),
+            }
+        )
+
+    def describe(self):
+        return {
+            "mode": "pinned" if self.pinned is not None else "auto",
+            "level": self.level,
+            "settings": self.settings,
+            "target_ms": self.target_ms,
+            "frame_ms": round(self.frame_ms, 2),
+            "decisions": list(self.decisions),
+        }
@@ -0,0 +1,169 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+import main
+from engine import HandTracker
+from filters import build_landmark_filter
+from smoothing import SMOOTHING_MODES, build_smoother
+from sources import InferenceState
+
+# Recorded landmark streams let the prediction/smoothing path be evaluated offline:
+#
+#   python replay.py --record streams/up.json --label up --seconds 10
+#   python replay.py streams/up.json --compare
+#
+# Stream file: {"fps": 30, "frames": [{"t": 0.033, "landmarks": [63 floats] | null,
+#                                      "points": [21 x 3 floats] | null, "label": "up"}]}
+# `label` is the ground truth for that frame ("none" when no gesture is intended). `points`
+# are the raw image-space landmarks the landmark filter works on; streams recorded before
+# they were stored are filtered on `landmarks` instead.
+
+
+def record_stream(path, label, seconds, camera=0):
+    import cv2
+
+    from motion import landmark_points
+
+    tracker = HandTracker()
+    cap = cv2.VideoCapture(camera)
+    if not cap.isOpened():
+        raise SystemExit("Could not open camera")
+
+    frames = []
+    start = time.perf_counter()
+    try:
+        while time.perf_counter() - start < seconds:
+            ret, frame = cap.read()
+            if not ret:
+                continue
+            _, landmarks, hand_landmarks = tracker.process_frame(frame)
+            frames.append(
+                {
+                    "t": round(time.perf_counter() - start, 4),
+                    "landmarks": landmarks.tolist() if landmarks is not None else None,
+                    "points": landmark_points(hand_landmarks[0]).tolist() if landmarks is not None else None,
+                    "label": label if landmarks is not None else "none",
+                }
+            )
+    finally:
+        cap.release()
+
+    elapsed = max(1e-6, time.perf_counter() - start)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"fps": round(len(frames) / elapsed, 2), "frames": frames}, f)
+    print(f"Recorded {len(frames)} frames to {path}")
+
+
+def _segments(labels):
+    segments = []
+    start = 0
+    for idx in range(1, len(labels) + 1):
+        if idx == len(labels) or labels[idx] != labels[start]:
+            if labels[start] != "none":
+                segments.append((start, idx, labels[start]))
+            start = idx
+    return segments
+
+
+def replay_stream(frames, smoother, landmark_filter=None):
+    inference = InferenceState(smoother, main.state.default_threshold, landmark_filter=landmark_filter)
+
+    fired = []
+    for idx, frame in enumerate(frames):
+        landmarks = frame.get("landmarks")
+        if not landmarks:
+            if landmark_filter is not None:
+                landmark_filter.reset()
+            fired.append(None)
+            continue
+        if landmark_filter is not None:
+            points = np.asarray(frame.get("points") or landmarks, dtype=np.float32).reshape(21, 3)
+            (points,) = landmark_filter.filter_hands([("", points)], frame.get("t", idx / 30.0))
+            landmarks = HandTracker.normalize_landmarks(points)
+        result = main.classify_landmarks(landmarks, inference)
+        fired.append(result["gesture"] if result["fire"] else None)
+
+    labels = [str(frame.get("label", "none")).strip().lower() for frame in frames]
+    onsets = [idx for idx, gesture in enumerate(fired) if gesture and (idx == 0 or fired[idx - 1] != gesture)]
+    false_fires = sum(1 for idx in onsets if fired[idx] != labels[idx])
+
+    latencies = []
+    missed = 0
+    for start, end, label in _segments(labels):
+        hit = next((idx for idx in range(start, end) if fired[idx] == label), None)
+        if hit is None:
+            missed += 1
+        else:
+            latencies.append(hit - start + 1)
+
+    return {
+        "frames": len(frames),
+        "fires": len(onsets),
+        "false_fires": false_fires,
+        "missed_segments": missed,
+        "mean_latency_frames": (sum(latencies) / len(latencies)) if latencies else None,
+    }
+
+
+def _load_backend():
+    main.load_runtime_config()
+    main.load_registry()
+    main.load_model()
+    if not main.model.is_trained:
+        raise SystemExit("No trained model to replay against")
+
+
+def _smoother_for(mode):
+    state = main.state
+    return build_smoother(
+        mode,
+        required_frames=state.required_consecutive_frames,
+        decay=state.evidence_decay,
+        fire_threshold=state.evidence_threshold,
+    )
+
+
+def _print_report(name, report):
+    latency = report["mean_latency_frames"]
+    latency_text = f"{latency:.2f}" if latency is not None else "-"
+    print(
+        f"{name:<16} frames={report['frames']} fires={report['fires']} false={report['false_fires']} "
+        f"missed={report['missed_segments']} latency_frames={latency_text}"
+    )
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Record or replay landmark streams.")
+    parser.add_argument("stream", help="Stream JSON file")
+    parser.add_argument("--record", action="store_true", help="Record from the camera instead of replaying")
+    parser.add_argument("--label", default="none", help="Ground-truth label for a recording")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--mode", choices=SMOOTHING_MODES, help="Smoothing mode (default: runtime config)")
+    parser.add_argument("--compare", action="store_true", help="Replay with every smoothing mode, with and without the landmark filter")
+    parser.add_argument("--no-filter", action="store_true", help="Replay without the landmark filter")
+    args = parser.parse_args()
+
+    if args.record:
+        record_stream(args.stream, args.label.strip().lower(), args.seconds)
+        return
+
+    with open(args.stream, "r", encoding="utf-8") as f:
+        frames = json.load(f).get("frames", [])
+
+    _load_backend()
+    modes = SMOOTHING_MODES if args.compare else [args.mode or main.state.smoothing_mode]
+    # Filter parameters come from the runtime config; `--compare` runs with and without it.
+    filter_settings = {**main.state.landmark_filter, "enabled": True}
+    variants = (False, True) if args.compare else (main.state.landmark_filter["enabled"] and not args.no_filter,)
+    for mode in modes:
+        for filtered in variants:
+            landmark_filter = build_landmark_filter(filter_settings) if filtered else None
+            name = f"{mode}+filter" if filtered else mode
+            _print_report(name, replay_stream(frames, _smoother_for(mode), landmark_filter))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,81 @@
+import numpy as np
+
+SMOOTHING_MODES = ("streak", "evidence")
+# Smoothers track integer gesture ids from the compiled gesture table; -1 is "no gesture".
+NO_GESTURE = -1
+
+
+class SmoothingDecision:
+    __slots__ = ("gesture", "fire", "streak", "evidence")
+
+    def __init__(self, gesture, fire, streak, evidence):
+        self.gesture = gesture
+        self.fire = fire
+        self.streak = streak
+        self.evidence = evidence
+
+
+# Fires once the same label has passed its threshold N frames in a row. Any frame below the
+# threshold resets the streak.
+class StreakSmoother:
+    def __init__(self, required_frames=2):
+        self.required_frames = max(1, int(required_frames))
+        self.reset()
+
+    def reset(self):
+        self.last_gesture = NO_GESTURE
+        self.streak = 0
+
+    def update(self, gesture, confidence, threshold):
+        if gesture == self.last_gesture and confidence >= threshold:
+            self.streak += 1
+        elif confidence >= threshold:
+            self.last_gesture = gesture
+            self.streak = 1
+        else:
+            self.last_gesture = gesture
+            self.streak = 0
+        fire = gesture != NO_GESTURE and self.streak >= self.required_frames
+        return SmoothingDecision(gesture, fire, self.streak, float(self.streak))
+
+
+# Accumulates per-class confidence with exponential decay and fires on enough evidence.
+# Every frame all scores decay by `decay` and the predicted class gains its confidence if it
+# passed the threshold. A single noisy frame only decays the score instead of resetting it, and
+# confident frames reach `fire_threshold` sooner than borderline ones. A lower `fire_threshold`
+# or higher `decay` fires sooner at the cost of more false positives.
+# Scores live in one array indexed by gesture id, so the per-frame decay is a single in-place
+# multiply; the array only grows when a higher id first shows up.
+class EvidenceSmoother:
+    def __init__(self, decay=0.7, fire_threshold=1.5):
+        self.decay = float(decay)
+        self.fire_threshold = float(fire_threshold)
+        self.reset()
+
+    def reset(self):
+        self.scores = np.zeros(8, dtype=np.float64)
+        self.last_gesture = NO_GESTURE
+        self.streak = 0
+
+    def update(self, gesture, confidence, threshold):
+        self.scores *= self.decay
+
+        passed = gesture != NO_GESTURE and confidence >= threshold
+        if passed:
+            if gesture >= len(self.scores):
+                self.scores = np.concatenate([self.scores, np.zeros(gesture + 1, dtype=np.float64)])
+            self.scores[gesture] += float(confidence)
+            self.streak = self.streak + 1 if gesture == self.last_gesture else 1
+        else:
+            self.streak = 0
+        self.last_gesture = gesture
+
+        evidence = float(self.scores[gesture]) if gesture != NO_GESTURE and gesture < len(self.scores) else 0.0
+        fire = passed and evidence >= self.fire_threshold
+        return SmoothingDecision(gesture, fire, self.streak, evidence)
+
+
+def build_smoother(mode, required_frames=2, decay=0.7, fire_threshold=1.5):
+    if mode == "evidence":
+        return EvidenceSmoother(decay=decay, fire_threshold=fire_threshold)
+    return StreakSmoother(required_frames=required_frames)
@@ -0,0 +1,517 @@
+import asyncio
+import base64
+import struct
+import threading
+import time
+
+import numpy as np
+
+from capture import LatestFrameCapture
+from engine import TrackedHand
+from frame_ring import ProcessPipeline
+from motion import LandmarkRingBuffer
+from quality import QualityController
+
+DEFAULT_SOURCE_ID = "default"
+LANDMARK_SOURCE_ID = "remote"
+
+# Binary packet sent by landmark clients over /ws/landmarks, little-endian:
+#   uint8   version (1)
+#   uint8   hand count (0 to 2)
+#   uint8   handedness of hand 0 and of hand 1 (0 unknown, 1 left, 2 right)
+#   4 bytes padding
+#   float64 capture time in seconds on the client's monotonic clock (0: use receive time)
+#   then per hand 21 x (x, y, z) float32 landmarks, in MediaPipe image coordinates of the
+#   mirrored (selfie) view, the same view the server's own tracker uses.
+LANDMARK_PACKET_VERSION = 1
+LANDMARK_PACKET_HEADER = struct.Struct("<BBBBxxxxd")
+LANDMARK_HAND_FLOATS = 21 * 3
+LANDMARK_MAX_HANDS = 2
+HANDEDNESS_CODES = ("", "left", "right")
+
+
+def parse_source_uri(uri):
+    # Digits are a camera index; anything else (a video file path, rtsp:// or http:// URL)
+    # is handed to OpenCV as is.
+    if isinstance(uri, int):
+        return uri
+    text = str(uri).strip()
+    return int(text) if text.isdigit() else text
+
+
+def parse_landmark_packet(data):
+    # Returns (handedness list, (n, 21, 3) float32 points, capture time or None). The points
+    # are a read-only view of the packet bytes; raises ValueError on a malformed packet.
+    if len(data) < LANDMARK_PACKET_HEADER.size:
+        raise ValueError("Packet too short")
+    version, count, side0, side1, captured_at = LANDMARK_PACKET_HEADER.unpack_from(data)
+    if version != LANDMARK_PACKET_VERSION:
+        raise ValueError(f"Unsupported packet version: {version}")
+    if count > LANDMARK_MAX_HANDS:
+        raise ValueError(f"Too many hands: {count}")
+    expected = LANDMARK_PACKET_HEADER.size + count * LANDMARK_HAND_FLOATS * 4
+    if len(data) != expected:
+        raise ValueError(f"Expected {expected} bytes for {count} hands, got {len(data)}")
+    if side0 >= len(HANDEDNESS_CODES) or side1 >= len(HANDEDNESS_CODES):
+        raise ValueError("Invalid handedness")
+
+    points = np.frombuffer(
+        data, dtype="<f4", count=count * LANDMARK_HAND_FLOATS, offset=LANDMARK_PACKET_HEADER.size
+    ).reshape(count, 21, 3)
+    if not np.isfinite(points).all():
+        raise ValueError("Non-finite landmark values")
+    sides = [HANDEDNESS_CODES[side0], HANDEDNESS_CODES[side1]][:count]
+    return sides, points, (captured_at if captured_at > 0 else None)
+
+
+class InferenceState:
+    # Temporal state that belongs to one video source. The model and gesture registry are
+    # shared by every source; smoothing streaks and motion windows are not, or two stations
+    # would feed each other's evidence.
+    def __init__(self, smoother, default_threshold=0.82, landmark_filter=None):
+        self.smoother = smoother
+        # Per-hand landmark filter applied before classification (filters.py), or None.
+        self.landmark_filter = landmark_filter
+        # The published settings the smoother and filter were built from (see frame_config.py);
+        # None when the caller built them itself.
+        self.smoothing = None
+        self.filter_settings = None
+        # Adaptive thresholds indexed by gesture id of `table` (the compiled gesture table).
+        self.table = None
+        self.dynamic_thresholds = None
+        self.last_effective_threshold = default_threshold
+        self.last_evidence = 0.0
+        # Per-frame diagnostics. They live here rather than on the shared model and motion
+        # matcher, which every source reads at once.
+        self.last_neighbor_distance = None
+        self.last_motion_match_ms = 0.0
+        self.motion_buffer = LandmarkRingBuffer()
+        # Last prediction state and fired gesture id sent on the event bus, so only changes are published.
+        self.last_reported = None
+        self.last_fired = -1
+
+    def bind(self, table):
+        # Gesture ids only mean something within one table, so a newly compiled table restarts
+        # the adaptive thresholds and the smoother.
+        if self.table is not table:
+            self.table = table
+            self.dynamic_thresholds = table.new_dynamic_thresholds()
+            self.smoother.reset()
+
+    def reset(self):
+        self.table = None
+        self.dynamic_thresholds = None
+        self.smoother.reset()
+        if self.landmark_filter is not None:
+            self.landmark_filter.reset()
+        self.last_evidence = 0.0
+        self.last_neighbor_distance = None
+        self.last_motion_match_ms = 0.0
+        self.motion_buffer.clear()
+        self.last_reported = None
+        self.last_fired = -1
+
+
+# Capture lifecycle of a video source:
+#   closed    no capture thread
+#   opening   thread started, device being opened
+#   warm      device open, waiting for its first frame
+#   streaming frames are processed and sent to clients
+#   idle      no clients; the device stays open and drained, but frames are not processed.
+#             A client that reconnects within the keep-alive period resumes without
+#             reopening the device (0.5-2 s for a webcam) or losing the hand tracker.
+SOURCE_CLOSED = "closed"
+SOURCE_OPENING = "opening"
+SOURCE_WARM = "warm"
+SOURCE_STREAMING = "streaming"
+SOURCE_IDLE = "idle"
+
+
+class VideoSource:
+    # One capture thread per source reads frames, runs hand detection and JPEG-encodes the
+    # annotated frame. MediaPipe and OpenCV release the GIL for that work, so sources run on
+    # separate cores. The thread hands only its newest result to the event loop; stale
+    # results are dropped rather than queued, so a slow consumer never adds latency.
+    def __init__(
+        self,
+        source_id,
+        uri,
+        tracker_factory,
+        inference,
+        loop_video=True,
+        capture_settings=None,
+        tracker_options=None,
+        workers=0,
+        quality=None,
+    ):
+        self.id = source_id
+        self.uri = parse_source_uri(uri)
+        self.loop_video = bool(loop_video)
+        self.tracker_factory = tracker_factory
+        # HandTracker keyword arguments for worker processes, which cannot take a factory.
+        self.tracker_options = tracker_options or dict
+        # 0: detection runs on this source's thread. N > 0: N worker processes (frame_ring.py).
+        self.workers = workers
+        # Adapts the tracker's settings to the frame time budget (quality.py).
+        self.quality = quality or QualityController()
+        self.inference = inference
+        self.clients = set()
+        self.task = None
+        self.error = ""
+        self.frames_read = 0
+        self.frames_dropped = 0
+        # Frames the capture thread replaced before detection got to them (see capture.py).
+        self.frames_skipped = 0
+        # Age of the last frame when detection started, and at classification (set by the worker), in ms.
+        self.frame_age_ms = 0.0
+        self.result_age_ms = 0.0
+        self.capture_settings = capture_settings
+        self.capture_actual = {}
+        self.lifecycle = SOURCE_CLOSED
+        self.opens = 0
+        self.reconnects = 0
+        # Time from starting the thread to the first frame of the last open, in ms.
+        self.open_ms = 0.0
+
+        self._thread = None
+        self._idle = False
+        self._resumed = threading.Event()
+        self._client_joined = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._latest = None
+        self._ready = None
+        self._event_loop = None
+        self._rebuild_tracker = False
+        self._restart_capture = False
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def describe(self):
+        return {
+            "id": self.id,
+            "kind": "video",
+            "uri": self.uri,
+            "loop": self.loop_video,
+            "running": self.running,
+            "clients": len(self.clients),
+            "frames_read": self.frames_read,
+            "frames_dropped": self.frames_dropped,
+            "frames_skipped": self.frames_skipped,
+            "workers": self.workers,
+            "frame_age_ms": self.frame_age_ms,
+            "result_age_ms": self.result_age_ms,
+            "capture": self.capture_actual,
+            "quality": self.quality.describe(),
+            "state": self.lifecycle if self.running else SOURCE_CLOSED,
+            "opens": self.opens,
+            "reconnects": self.reconnects,
+            "open_ms": self.open_ms,
+            "error": self.error,
+        }
+
+    def attach(self, client):
+        self.clients.add(client)
+        if self._client_joined is not None:
+            self._client_joined.set()
+
+    def detach(self, client):
+        self.clients.discard(client)
+
+    async def wait_for_client(self, keep_alive):
+        # Called by the worker when the last client has left. Keeps the device open for up to
+        # `keep_alive` seconds; returns True if a client reconnected in that time.
+        if keep_alive <= 0 or not self.running:
+            return False
+        self._resumed.clear()
+        self._idle = True
+        self.lifecycle = SOURCE_IDLE
+        self._client_joined = asyncio.Event()
+        deadline = time.perf_counter() + keep_alive
+        try:
+            while not self.clients:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or not self.running:
+                    return False
+                try:
+                    await asyncio.wait_for(self._client_joined.wait(), timeout=min(remaining, 0.5))
+                except asyncio.TimeoutError:
+                    pass
+                self._client_joined.clear()
+        finally:
+            self._client_joined = None
+        self.reconnects += 1
+        with self._lock:
+            # The last frame before going idle is stale by now.
+            self._latest = None
+        self._idle = False
+        self._resumed.set()
+        self.lifecycle = SOURCE_STREAMING
+        return True
+
+    def request_tracker_rebuild(self):
+        self._rebuild_tracker = True
+
+    def set_workers(self, workers):
+        if workers != self.workers:
+            self.workers = workers
+            if self.running:
+                self._restart_capture = True
+
+    def set_capture_settings(self, settings):
+        # Applied on the next open; a running source reopens its device.
+        self.capture_settings = settings
+        if self.running:
+            self._restart_capture = True
+
+    @property
+    def stopping(self):
+        # The capture thread was told to stop but is still releasing the device.
+        return self.running and self._stop.is_set()
+
+    def join(self):
+        if self._thread is not None:
+            self._thread.join()
+
+    def start(self):
+        if self.stopping:
+            # A thread that is shutting down would leave `_stop` set and end the new session
+            # at once; wait for it (source_worker joins off the event loop first).
+            self.join()
+        if self.running:
+            return
+        self._event_loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+        self._stop.clear()
+        self._idle = False
+        self._restart_capture = False
+        self.error = ""
+        self.lifecycle = SOURCE_OPENING
+        self._thread = threading.Thread(target=self._capture_loop, name=f"source-{self.id}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._resumed.set()
+
+    async def next_result(self):
+        # Waits for the capture thread; returns None once it has stopped.
+        while True:
+            if not self.running and self._latest is None:
+                return None
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=0.5)
+            except asyncio.TimeoutError:
+                continue
+            self._ready.clear()
+            with self._lock:
+                result, self._latest = self._latest, None
+            if result is not None:
+                return result
+
+    def _publish(self, result):
+        with self._lock:
+            if self._latest is not None:
+                self.frames_dropped += 1
+            self._latest = result
+        self._event_loop.call_soon_threadsafe(self._ready.set)
+
+    def _open_capture(self):
+        capture = LatestFrameCapture(self.uri, self.capture_settings, self.loop_video)
+        capture.open()
+        self.capture_actual = capture.actual
+        return capture
+
+    def _capture_loop(self):
+        try:
+            # Each pass runs one pipeline until the source stops, or until a settings change
+            # needs a different one (switching to or from worker processes).
+            while not self._stop.is_set():
+                run = self._run_in_processes if self.workers > 0 else self._run_in_threads
+                if not run():
+                    break
+        except Exception as e:
+            self.error = str(e)
+            print(f">>> Source '{self.id}' stopped: {e}")
+        finally:
+            self.lifecycle = SOURCE_CLOSED
+            if self._event_loop is not None and not self._event_loop.is_closed():
+                self._event_loop.call_soon_threadsafe(self._ready.set)
+
+    def _first_frame(self, started):
+        self.opens += 1
+        self.open_ms = round((time.perf_counter() - started) * 1000.0, 1)
+        if not self._idle:
+            self.lifecycle = SOURCE_STREAMING
+        print(f">>> Source '{self.id}' opened in {self.open_ms:.1f} ms")
+
+    def _run_in_threads(self):
+        # Capture thread plus this one for detection and encoding. Returns True if the source
+        # should be restarted in process mode.
+        import cv2
+
+        capture = None
+        started = time.perf_counter()
+        opened = False
+        try:
+            tracker = self.tracker_factory()
+            tracker.configure(**self.quality.settings)
+            try:
+                capture = self._open_capture()
+            except RuntimeError as e:
+                self.error = str(e)
+                print(f">>> {self.error}")
+                return False
+            self.lifecycle = SOURCE_WARM
+
+            while not self._stop.is_set():
+                if self._restart_capture:
+                    self._restart_capture = False
+                    if self.workers > 0:
+                        return True
+                    # New camera settings: reopen the device, keep the tracker.
+                    self.frames_skipped += capture.frames_skipped
+                    capture.close()
+                    capture = None  # already counted if the reopen fails
+                    capture = self._open_capture()
+
+                capture.idle = self._idle
+                if self._idle:
+                    # The capture thread only drains the device; nothing to process until a
+                    # client is back.
+                    self._resumed.wait(timeout=0.5)
+                    if capture.ended:
+                        self.error = capture.error
+                        break
+                    continue
+                item = capture.read(timeout=0.5)
+                if item is None:
+                    if capture.ended:
+                        self.error = capture.error
+                        break
+                    continue
+                frame, captured_at = item
+
+                if not opened:
+                    opened = True
+                    self._first_frame(started)
+
+                if self._rebuild_tracker:
+                    self._rebuild_tracker = False
+                    tracker = self.tracker_factory()
+                    tracker.configure(**self.quality.settings)
+
+                # How old the frame is when hand detection starts on it.
+                started_at = time.perf_counter()
+                self.frame_age_ms = round((started_at - captured_at) * 1000.0, 2)
+                frame, hands = tracker.detect_hands(frame)
+                _, buffer = cv2.imencode(".jpg", frame)
+                settings = self.quality.observe((time.perf_counter() - started_at) * 1000.0)
+                if settings is not None:
+                    tracker.configure(**settings)
+                self.frames_read += 1
+                self._publish((base64.b64encode(buffer).decode("utf-8"), hands, captured_at, self.frame_age_ms))
+            return False
+        finally:
+            if capture is not None:
+                capture.close()
+                self.frames_skipped += capture.frames_skipped
+
+    def _run_in_processes(self):
+        # Capture and detection in worker processes (see frame_ring.py); this thread only
+        # collects their results. Returns True if the source should be restarted.
+        started = time.perf_counter()
+        opened = False
+        last_seq = 0
+        pipeline = ProcessPipeline(
+            self.uri,
+            self.capture_settings,
+            self.loop_video,
+            self.workers,
+            {**self.tracker_options(), **self.quality.settings},
+        )
+        try:
+            try:
+                pipeline.start()
+            except RuntimeError as e:
+                self.error = str(e)
+                print(f">>> {self.error}")
+                return False
+            self.capture_actual = pipeline.actual
+            self.lifecycle = SOURCE_WARM
+
+            while not self._stop.is_set():
+                if self._restart_capture:
+                    # New camera settings or worker count: start a new pipeline.
+                    self._restart_capture = False
+                    return True
+                if self._rebuild_tracker:
+                    self._rebuild_tracker = False
+                    pipeline.set_tracker_options({**self.tracker_options(), **self.quality.settings})
+
+                pipeline.set_idle(self._idle)
+                if self._idle:
+                    self._resumed.wait(timeout=0.5)
+                    if not pipeline.running:
+                        self.error = pipeline.take_error()
+                        break
+                    continue
+                result = pipeline.get(timeout=0.5)
+                if result is None:
+                    if not pipeline.running:
+                        self.error = pipeline.take_error()
+                        break
+                    continue
+                seq, captured_at, frame_age_ms, frame_ms, image, hands = result
+                settings = self.quality.observe(frame_ms)
+                if settings is not None:
+                    pipeline.set_quality(settings)
+
+                if not opened:
+                    opened = True
+                    self._first_frame(started)
+                    # Frames captured while the workers were still starting are not skips.
+                    last_seq = seq - 1
+                if seq <= last_seq:
+                    # A slower worker finished an older frame after a newer one was published.
+                    self.frames_dropped += 1
+                    continue
+                self.frames_skipped += seq - last_seq - 1
+                last_seq = seq
+
+                self.frame_age_ms = frame_age_ms
+                self.frames_read += 1
+                hands = [TrackedHand(side, landmarks, points) for side, landmarks, points in hands]
+                self._publish((image, hands, captured_at, frame_age_ms))
+            return False
+        finally:
+            pipeline.close()
+
+
+class LandmarkSource:
+    # A source whose hands arrive already tracked, from clients that run hand tracking
+    # themselves and send binary landmark packets. There is no capture thread, camera or
+    # frame encoding; each packet goes through the same classification, smoothing, recording
+    # and action path as a camera frame. Exists while at least one client is connected.
+    def __init__(self, source_id, inference):
+        self.id = source_id
+        self.inference = inference
+        self.clients = set()
+        self.frames_read = 0
+        self.frames_rejected = 0
+
+    @property
+    def running(self):
+        return bool(self.clients)
+
+    def describe(self):
+        return {
+            "id": self.id,
+            "kind": "landmarks",
+            "running": self.running,
+            "clients": len(self.clients),
+            "frames_read": self.frames_read,
+            "frames_rejected": self.frames_rejected,
+        }
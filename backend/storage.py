@@ -0,0 +1,10 @@
+import os
+
+
+def atomic_write(path, write_fn, binary=True):
+    # Writes through a temporary file and renames it over `path`, so a reader never sees a
+    # half-written file.
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") if binary else open(tmp_path, "w", encoding="utf-8") as f:
+        write_fn(f)
+    os.replace(tmp_path, path)
@@ -48,7 +48,7 @@ while True:
 
     # 3. Handle Recording Logic
     if mode == "RECORDING":
-        if landmarks:
+        if landmarks is not None:
             X_data.append(landmarks)
             y_data.append(target_label)
             record_counter += 1
@@ -62,7 +62,7 @@ while True:
 
     # 4. Handle Prediction Logic
     elif mode == "PREDICTING":
-        if landmarks:
+        if landmarks is not None:
             prediction, confidence = model.predict(landmarks)
             color = (0, 255, 0) if confidence > 0.7 else (0, 0, 255)
             cv2.putText(frame, f"Gesture: {prediction} ({confidence:.2f})", (10, 90), 
@@ -39,6 +39,7 @@ function App() {
 
   useEffect(() => {
     store.connect();
+    store.connectEvents();
     void store.loadGestures();
     void store.loadModelStatus();
   }, []);
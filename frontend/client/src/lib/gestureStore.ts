@@ -1,6 +1,7 @@
 import { create } from "zustand";
 
 const WS_URL = "ws://127.0.0.1:8000/ws/video";
+const EVENTS_WS_URL = "ws://127.0.0.1:8000/ws/events";
 const API_BASE_URL = "http://127.0.0.1:8000/api";
 
 export type DesktopAction =
@@ -14,12 +15,15 @@ export type DesktopAction =
   | "ZOOM_OUT"
   | "LOCK_SCREEN";
 
+export type GestureKind = "static" | "motion" | "two_hand";
+
 export interface GestureConfig {
   id: string;
   label: string;
   action: DesktopAction;
   emoji: string;
   threshold: number;
+  kind?: GestureKind;
 }
 
 export interface ModelStatusPayload {
@@ -60,6 +64,7 @@ interface StoreState {
   supportedActions: DesktopAction[];
   modelStatus: ModelStatusPayload | null;
   connect: () => void;
+  connectEvents: () => void;
   sendAction: (endpoint: string, data?: unknown) => Promise<Response>;
   loadGestures: () => Promise<void>;
   saveGestures: (gestures: GestureConfig[]) => Promise<boolean>;
@@ -68,6 +73,9 @@ interface StoreState {
 }
 
 let socket: WebSocket | null = null;
+let eventSocket: WebSocket | null = null;
+// Last event sequence number seen, so a reconnect resumes where the stream left off.
+let lastEventSeq: number | null = null;
 
 function log(set: any, type: "INFO" | "SUCCESS" | "ERROR", message: string) {
   set((state: StoreState) => ({
@@ -137,6 +145,58 @@ export const useStore = create<StoreState>((set, get) => ({
     };
   },
 
+  connectEvents: () => {
+    if (eventSocket && (eventSocket.readyState === WebSocket.OPEN || eventSocket.readyState === WebSocket.CONNECTING)) {
+      return;
+    }
+
+    const types = "gesture,recording,training,control,registry,backend";
+    const since = lastEventSeq === null ? "" : `&since=${lastEventSeq}`;
+    eventSocket = new WebSocket(`${EVENTS_WS_URL}?types=${types}${since}`);
+
+    eventSocket.onmessage = (message) => {
+      const event = JSON.parse(message.data);
+      if (typeof event.seq === "number") {
+        lastEventSeq = event.seq;
+      }
+
+      switch (event.type) {
+        case "gesture":
+          log(set, event.executed ? "SUCCESS" : "INFO", `Gesture ${String(event.gesture).toUpperCase()} -> ${event.action}`);
+          break;
+        case "recording":
+          set({
+            recordingActive: Boolean(event.recording_active),
+            recordingLabel: String(event.recording_label ?? ""),
+            recordingAction: String(event.recording_action ?? ""),
+            recordingTarget: Number(event.recording_target ?? 0),
+            recordingCount: Number(event.recording_count ?? 0),
+            recordingMessage: String(event.recording_message ?? ""),
+          });
+          break;
+        case "training":
+          log(set, event.success ? "SUCCESS" : "ERROR", String(event.message ?? "Training finished"));
+          void get().loadModelStatus();
+          break;
+        case "registry":
+          void get().loadGestures();
+          break;
+        case "control":
+        case "backend":
+        case "overflow":
+        case "resync":
+          // Missed events or a state change the status payload covers: refetch it.
+          void get().loadModelStatus();
+          break;
+      }
+    };
+
+    eventSocket.onclose = () => {
+      eventSocket = null;
+      setTimeout(() => get().connectEvents(), 2000);
+    };
+  },
+
   sendAction: async (endpoint, data = {}) => {
     return fetch(`${API_BASE_URL}/${endpoint}`, {
       method: "POST",
@@ -1,5 +1,5 @@
 import { useEffect, useRef, useState } from "react";
-import { useStore, type DesktopAction } from "@/lib/gestureStore";
+import { useStore, type DesktopAction, type GestureKind } from "@/lib/gestureStore";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Input } from "@/components/ui/input";
@@ -12,7 +12,9 @@ export default function LiveFeedPage() {
   const [selectedAction, setSelectedAction] = useState<DesktopAction | "">("");
   const [label, setLabel] = useState("my_new_gesture");
   const [emoji, setEmoji] = useState("🙂");
+  const [gestureKind, setGestureKind] = useState<GestureKind>("static");
   const [targetSamples, setTargetSamples] = useState(50);
+  const sampleBounds = gestureKind === "motion" ? { min: 5, max: 30, fallback: 10 } : { min: 20, max: 120, fallback: 50 };
   const [isSubmitting, setIsSubmitting] = useState(false);
   const wasRecordingRef = useRef(false);
 
@@ -47,6 +49,7 @@ export default function LiveFeedPage() {
         action: selectedAction,
         label,
         emoji,
+        kind: gestureKind,
         target_samples: targetSamples,
       });
       const payload = await response.json();
@@ -126,6 +129,25 @@ export default function LiveFeedPage() {
             </SelectContent>
           </Select>
 
+          <label className="block text-sm text-slate-300">Gesture Type</label>
+          <Select
+            value={gestureKind}
+            onValueChange={(v) => {
+              const kind = v as GestureKind;
+              setGestureKind(kind);
+              setTargetSamples(kind === "motion" ? 10 : 50);
+            }}
+          >
+            <SelectTrigger className="bg-slate-900/50">
+              <SelectValue />
+            </SelectTrigger>
+            <SelectContent>
+              <SelectItem value="static">Static pose</SelectItem>
+              <SelectItem value="motion">Motion (swipe, circle, pinch)</SelectItem>
+              <SelectItem value="two_hand">Two-hand pose</SelectItem>
+            </SelectContent>
+          </Select>
+
           <label className="block text-sm text-slate-300">Gesture Label</label>
           <Input value={label} onChange={(e) => setLabel(e.target.value.toLowerCase())} className="bg-slate-900/50" />
 
@@ -135,10 +157,14 @@ export default function LiveFeedPage() {
           <label className="block text-sm text-slate-300">Target Samples</label>
           <Input
             type="number"
-            min={20}
-            max={120}
+            min={sampleBounds.min}
+            max={sampleBounds.max}
             value={targetSamples}
-            onChange={(e) => setTargetSamples(Math.max(20, Math.min(120, Number(e.target.value || 50))))}
+            onChange={(e) =>
+              setTargetSamples(
+                Math.max(sampleBounds.min, Math.min(sampleBounds.max, Number(e.target.value || sampleBounds.fallback)))
+              )
+            }
             className="w-28 bg-slate-900/50"
           />
 